@@ -1,3 +1,18 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import CandidateProfile, RankingJob
+
+
+@admin.register(RankingJob)
+class RankingJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "processed", "total", "created_at", "finished_at")
+    list_filter = ("status",)
+    readonly_fields = ("created_at", "started_at", "finished_at")
+
+
+@admin.register(CandidateProfile)
+class CandidateProfileAdmin(admin.ModelAdmin):
+    list_display = ("content_hash", "email", "embedding_model", "created_at")
+    search_fields = ("content_hash", "email", "file_path")
+    readonly_fields = ("created_at", "updated_at")
+    exclude = ("embedding",)
@@ -1,5 +1,14 @@
+import os
+
 from django.apps import AppConfig
 
 
 class CoreConfig(AppConfig):
     name = "core"
+
+    def ready(self):
+        # Serving processes opt in; management commands stay fast
+        if os.getenv("WARMUP_MODELS_ON_STARTUP") == "1":
+            from core.services.warmup_service import start_background_warmup
+
+            start_background_warmup()
@@ -0,0 +1,35 @@
+"""
+Offline benchmarks, run with ``python manage.py benchmark <name>``.
+
+Each module in BENCHMARKS exposes:
+    add_arguments(parser)  - extra CLI options
+    run(**options) -> dict - machine-readable results; a result with
+                             "passed": False makes the command fail
+"""
+
+from pathlib import Path
+
+BENCHMARKS = {
+    "rasterization": "core.benchmarks.rasterization",
+    "ann_recall": "core.benchmarks.ann_recall",
+    "keywords": "core.benchmarks.keywords",
+    "import_time": "core.benchmarks.import_time",
+    "embedding_backends": "core.benchmarks.embedding_backends",
+    "vector_store": "core.benchmarks.vector_store",
+    "pipeline": "core.benchmarks.pipeline",
+}
+
+MEDIA_DIR = Path(__file__).resolve().parent.parent.parent / "media"
+
+
+def media_files(extensions=(".pdf",), limit=None):
+    """
+    Resume files shipped in media/ (top level and media/resumes).
+    """
+
+    files = sorted(
+        path for path in MEDIA_DIR.rglob("*")
+        if path.suffix.lower() in extensions
+    )
+
+    return files[:limit] if limit else files
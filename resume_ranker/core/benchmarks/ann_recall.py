@@ -0,0 +1,93 @@
+"""
+Recall and latency of the IVF index against exact brute-force search.
+
+Uses stored corpus embeddings when --source corpus is given,
+otherwise a synthetic clustered corpus of --size vectors.
+"""
+
+import time
+
+import numpy as np
+
+from core.services.ann_index import IVFIndex, default_n_lists
+
+
+def add_arguments(parser):
+    parser.add_argument("--source", choices=["synthetic", "corpus"], default="synthetic")
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def _synthetic(size, dim, rng, topics=200):
+    centers = rng.normal(size=(topics, dim)).astype(np.float32)
+    labels = rng.integers(0, topics, size=size)
+    vectors = centers[labels] + 0.8 * rng.normal(size=(size, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _corpus():
+    from core.models import CandidateProfile
+
+    blobs = CandidateProfile.objects.values_list("embedding", flat=True)
+    return np.vstack([np.frombuffer(bytes(b), dtype=np.float32) for b in blobs])
+
+
+def run(source="synthetic", size=50000, dim=384, queries=200, k=50,
+        n_lists=None, nprobe=(1, 4, 8, 16, 32), seed=0, **_):
+    rng = np.random.default_rng(seed)
+
+    vectors = _corpus() if source == "corpus" else _synthetic(size, dim, rng)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-8)
+    ids = np.arange(len(vectors))
+
+    # Queries: perturbed corpus vectors, like a JD close to some resumes
+    picks = rng.integers(0, len(vectors), size=queries)
+    query_vectors = vectors[picks] + 0.5 * rng.normal(size=(queries, vectors.shape[1])).astype(np.float32)
+
+    start = time.perf_counter()
+    index = IVFIndex(vectors.shape[1])
+    index.build(ids, vectors, n_lists=n_lists or default_n_lists(len(vectors)))
+    build_seconds = time.perf_counter() - start
+
+    # ---------------- Exact baseline ----------------
+    k = min(k, len(vectors))
+    start = time.perf_counter()
+    exact = []
+    for q in query_vectors:
+        scores = vectors @ (q / np.linalg.norm(q))
+        exact.append(set(np.argpartition(-scores, k - 1)[:k].tolist()))
+    exact_ms = 1000 * (time.perf_counter() - start) / queries
+
+    # ---------------- IVF at several nprobe values ----------------
+    results = []
+    for probe in nprobe:
+        start = time.perf_counter()
+        found = [index.search(q, k, nprobe=probe)[0] for q in query_vectors]
+        elapsed_ms = 1000 * (time.perf_counter() - start) / queries
+
+        recall = np.mean([
+            len(truth & set(ids_.tolist())) / k
+            for truth, ids_ in zip(exact, found)
+        ])
+        results.append({
+            "nprobe": probe,
+            "recall_at_k": round(float(recall), 4),
+            "ms_per_query": round(elapsed_ms, 3),
+            "speedup_vs_exact": round(exact_ms / elapsed_ms, 2) if elapsed_ms else None,
+        })
+
+    return {
+        "benchmark": "ann_recall",
+        "source": source,
+        "vectors": len(vectors),
+        "n_lists": len(index.centroids),
+        "k": k,
+        "build_seconds": round(build_seconds, 3),
+        "exact_ms_per_query": round(exact_ms, 3),
+        "results": results,
+    }
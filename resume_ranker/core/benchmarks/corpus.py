@@ -0,0 +1,174 @@
+"""
+Deterministic synthetic resume corpus for benchmarks.
+
+Each resume is random but plausible text (name, summary, skills,
+experience, education, projects) written as one of:
+
+    text    - PDF with a text layer
+    scanned - PDF whose pages are images only (forces the OCR path)
+    png/jpg - single image of the first page
+
+Files are generated once per (count, mix, pages, seed) under the
+cache directory and reused by later runs.
+"""
+
+import hashlib
+import json
+import os
+import random
+
+import fitz
+from PIL import Image, ImageDraw, ImageFont
+
+from core.services.cache_service import CACHE_DIR
+from core.services.genai_service import SKILL_KEYWORDS
+
+CORPUS_DIR = os.path.join(CACHE_DIR, "benchmark_corpus")
+KINDS = ("text", "scanned", "png", "jpg")
+
+PAGE_SIZE = (612, 792)  # points, US letter
+IMAGE_DPI = 150
+LINES_PER_PAGE = 45
+
+FIRST_NAMES = ["Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Sneha", "Arjun", "Meera",
+               "John", "Maria", "David", "Sarah", "Wei", "Fatima", "Carlos", "Emma"]
+LAST_NAMES = ["Sharma", "Patel", "Gupta", "Iyer", "Reddy", "Singh", "Khan", "Smith",
+              "Garcia", "Chen", "Johnson", "Williams", "Nair", "Das", "Rossi", "Kim"]
+ROLES = ["Data Scientist", "Software Engineer", "Data Analyst", "ML Engineer",
+         "Backend Developer", "DevOps Engineer", "Research Assistant", "Business Analyst"]
+COMPANIES = ["Infosys", "TCS", "Wipro", "Accenture", "Flipkart", "Zomato", "Google",
+             "Microsoft", "Amazon", "a fintech startup", "a healthcare startup"]
+DEGREES = ["B.Tech in Computer Science", "Bachelor of Science in Statistics",
+           "M.Tech in Data Science", "Master of Computer Applications", "MBA", "Ph.D in Physics"]
+VERBS = ["Built", "Designed", "Led", "Automated", "Optimized", "Deployed", "Analyzed", "Maintained"]
+OBJECTS = ["a recommendation engine", "ETL pipelines", "REST APIs", "dashboards",
+           "a fraud detection model", "CI/CD workflows", "a chatbot", "forecasting models"]
+
+
+def parse_mix(text):
+    """
+    "text=0.7,scanned=0.1,png=0.1,jpg=0.1" -> {"text": 0.7, ...}
+    """
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in KINDS:
+            raise ValueError(f"Unknown resume kind: {kind}")
+        mix[kind.strip()] = float(weight or 1)
+    return mix
+
+
+def resume_lines(rng, pages):
+    skills = rng.sample(sorted(SKILL_KEYWORDS), rng.randint(4, 12))
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    role = rng.choice(ROLES)
+    years = rng.randint(0, 15)
+
+    lines = [
+        name,
+        f"{name.split()[0].lower()}.{rng.randint(10, 999)}@example.com | +91 98{rng.randint(10000000, 99999999)}",
+        "",
+        "SUMMARY",
+        f"{role} with {years} years of experience in {', '.join(skills[:3])}.",
+        "",
+        "SKILLS",
+        ", ".join(skills),
+        "",
+        "EXPERIENCE",
+    ]
+
+    year = 2025
+    while len(lines) < pages * LINES_PER_PAGE - 8:
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(ROLES)}, {rng.choice(COMPANIES)} ({start} - {year})")
+        for _ in range(rng.randint(2, 4)):
+            lines.append(
+                f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using "
+                f"{rng.choice(skills)} and {rng.choice(skills)}."
+            )
+        lines.append("")
+        year = start
+
+    lines += [
+        "EDUCATION",
+        f"{rng.choice(DEGREES)}, {rng.randint(2005, 2022)}",
+        "",
+        "CERTIFICATIONS",
+        f"{rng.choice(['AWS Certified', 'Google Data Analytics', 'Azure Fundamentals'])}",
+    ]
+    return lines
+
+
+def _paginate(lines, pages):
+    per_page = max(len(lines) // pages + 1, 1)
+    return [lines[i:i + per_page] for i in range(0, len(lines), per_page)][:pages]
+
+
+def _page_image(lines):
+    width, height = (int(size * IMAGE_DPI / 72) for size in PAGE_SIZE)
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+
+    try:
+        font = ImageFont.load_default(size=22)
+    except TypeError:  # Pillow < 10.1
+        font = ImageFont.load_default()
+
+    y = 60
+    for line in lines:
+        draw.text((60, y), line, fill=0, font=font)
+        y += 32
+    return image
+
+
+def write_resume(path, kind, lines, pages):
+    page_lines = _paginate(lines, pages)
+
+    if kind in ("png", "jpg"):
+        image = _page_image(page_lines[0])
+        if kind == "jpg":
+            image.save(path, quality=85)
+        else:
+            image.save(path)
+        return
+
+    doc = fitz.open()
+    for chunk in page_lines:
+        page = doc.new_page(width=PAGE_SIZE[0], height=PAGE_SIZE[1])
+        if kind == "text":
+            page.insert_text((50, 60), "\n".join(chunk), fontsize=10)
+        else:
+            image_path = f"{path}.page.png"
+            _page_image(chunk).save(image_path)
+            page.insert_image(page.rect, filename=image_path)
+            os.remove(image_path)
+    doc.save(path)
+    doc.close()
+
+
+def generate_corpus(count, mix=None, pages=(1, 2), seed=0):
+    """
+    Return paths of `count` synthetic resumes, generating missing files.
+    """
+    mix = mix or {"text": 1.0}
+    params = json.dumps({"count": count, "mix": mix, "pages": list(pages), "seed": seed}, sort_keys=True)
+    directory = os.path.join(CORPUS_DIR, hashlib.sha256(params.encode()).hexdigest()[:12])
+    os.makedirs(directory, exist_ok=True)
+
+    rng = random.Random(seed)
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    paths = []
+
+    for i in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        page_count = rng.choice(list(pages))
+        lines = resume_lines(rng, page_count)
+
+        extension = "pdf" if kind in ("text", "scanned") else kind
+        path = os.path.join(directory, f"{i:05d}-{kind}-{page_count}p.{extension}")
+        if not os.path.exists(path):
+            write_resume(path, kind, lines, page_count)
+        paths.append(path)
+
+    return paths
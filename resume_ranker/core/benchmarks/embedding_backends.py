@@ -0,0 +1,123 @@
+"""
+Parity and throughput of the embedding backends (torch, onnx, onnx-int8).
+
+Texts are the cleaned text layers of the resumes in media/.
+Parity is the cosine agreement of each backend's vectors with the
+PyTorch vectors, plus how stable the ranking of those resumes is
+against a few sample job descriptions.
+"""
+
+import time
+
+import fitz
+import numpy as np
+from scipy.stats import spearmanr
+
+from core.benchmarks import media_files
+from core.services.cleaning_service import clean_text
+from core.services.embedding_service import (
+    EMBEDDING_BACKENDS,
+    _prepare_text,
+    get_model,
+    get_onnx_encoder,
+)
+
+SAMPLE_JOBS = [
+    "data scientist with python, machine learning, deep learning and nlp experience",
+    "backend software engineer java spring sql docker kubernetes aws",
+    "data analyst excel power bi tableau sql statistics reporting",
+]
+
+
+def add_arguments(parser):
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--backends", nargs="+", default=list(EMBEDDING_BACKENDS),
+                        choices=list(EMBEDDING_BACKENDS))
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--top-k", type=int, default=10)
+
+
+def _texts(limit):
+    texts = []
+    for path in media_files((".pdf",), limit):
+        with fitz.open(path) as doc:
+            text = _prepare_text(clean_text("".join(page.get_text() for page in doc)))
+        if text:
+            texts.append(text)
+    return texts
+
+
+def _encoder(backend):
+    if backend == "torch":
+        model = get_model()
+        return lambda batch: model.encode(
+            batch,
+            batch_size=len(batch),
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+    return get_onnx_encoder(backend).encode
+
+
+def _encode_all(encode, texts, batch_size):
+    return np.vstack([
+        encode(texts[i:i + batch_size])
+        for i in range(0, len(texts), batch_size)
+    ])
+
+
+def run(limit=None, backends=EMBEDDING_BACKENDS, batch_size=32, top_k=10, **_):
+    texts = _texts(limit)
+    if not texts:
+        return {"benchmark": "embedding_backends", "texts": 0}
+
+    top_k = min(top_k, len(texts))
+    reference = None
+    reference_rankings = None
+    results = []
+
+    for backend in ["torch"] + [b for b in backends if b != "torch"]:
+        encode = _encoder(backend)
+        encode(texts[:2])  # warm-up
+
+        start = time.perf_counter()
+        vectors = _encode_all(encode, texts, batch_size)
+        elapsed = time.perf_counter() - start
+        job_vectors = encode(SAMPLE_JOBS)
+
+        rankings = job_vectors @ vectors.T  # (jobs, texts)
+
+        entry = {
+            "backend": backend,
+            "texts_per_second": round(len(texts) / elapsed, 1),
+            "seconds": round(elapsed, 3),
+        }
+
+        if reference is None:
+            reference, reference_rankings = vectors, rankings
+        else:
+            agreement = np.sum(vectors * reference, axis=1)
+            overlaps = []
+            correlations = []
+            for ref_scores, scores in zip(reference_rankings, rankings):
+                ref_top = set(np.argsort(-ref_scores)[:top_k])
+                top = set(np.argsort(-scores)[:top_k])
+                overlaps.append(len(ref_top & top) / top_k)
+                correlations.append(spearmanr(ref_scores, scores).correlation)
+
+            entry.update({
+                "cosine_vs_torch_mean": round(float(agreement.mean()), 5),
+                "cosine_vs_torch_min": round(float(agreement.min()), 5),
+                f"top{top_k}_overlap_mean": round(float(np.mean(overlaps)), 3),
+                "rank_spearman_mean": round(float(np.mean(correlations)), 4),
+            })
+
+        if backend in backends:
+            results.append(entry)
+
+    return {
+        "benchmark": "embedding_backends",
+        "texts": len(texts),
+        "batch_size": batch_size,
+        "results": results,
+    }
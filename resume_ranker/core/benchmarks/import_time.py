@@ -0,0 +1,69 @@
+"""
+Import-time budget for non-serving commands.
+
+Starts fresh interpreters that set up Django and import the URL
+conf (what every manage.py command with system checks does) and
+checks that this stays under --budget seconds without loading
+the embedding or spaCy models.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent.parent
+
+HEAVY_MODULES = ["sentence_transformers", "torch", "spacy", "sklearn"]
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import django
+django.setup()
+import core.urls
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def add_arguments(parser):
+    parser.add_argument("--budget", type=float, default=1.5,
+                        help="Maximum median seconds for Django setup + URL import.")
+    parser.add_argument("--runs", type=int, default=5)
+
+
+def run(budget=1.5, runs=5, **_):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="resume_ranker.settings")
+    env.pop("WARMUP_MODELS_ON_STARTUP", None)
+
+    timings = []
+    heavy = set()
+
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(heavy=HEAVY_MODULES)],
+            cwd=PROJECT_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip().splitlines()[-1]
+
+        seconds, loaded = output.split(" ", 1) if " " in output else (output, "")
+        timings.append(float(seconds))
+        heavy.update(m for m in loaded.split(",") if m)
+
+    median = statistics.median(timings)
+
+    return {
+        "benchmark": "import_time",
+        "runs": runs,
+        "median_seconds": round(median, 3),
+        "max_seconds": round(max(timings), 3),
+        "budget_seconds": budget,
+        "heavy_modules_loaded": sorted(heavy),
+        "passed": median <= budget and not heavy,
+    }
@@ -0,0 +1,90 @@
+"""
+Single-pass keyword matcher vs the previous per-keyword substring scans
+for skills, aliases, education and certifications.
+
+Texts are the text layers of the PDFs in media/.
+"""
+
+import time
+
+import fitz
+
+from core.benchmarks import media_files
+from core.services.genai_service import (
+    CERT_KEYWORDS,
+    EDUCATION_LEVELS,
+    SKILL_ALIASES,
+    SKILL_KEYWORDS,
+    scan_keywords,
+)
+
+
+def add_arguments(parser):
+    parser.add_argument("--limit", type=int, default=None,
+                        help="Number of PDFs from media/ to use.")
+    parser.add_argument("--repeat", type=int, default=20)
+
+
+# --------------------------------------------------
+# Previous implementation (substring scans), for reference
+# --------------------------------------------------
+def _legacy_scan(text):
+    lower = text.lower()
+
+    skills = {skill for skill in SKILL_KEYWORDS if skill in lower}
+    skills |= {c for alias, c in SKILL_ALIASES.items() if alias in lower}
+
+    found = []
+    for label, rank, patterns in EDUCATION_LEVELS:
+        for p in patterns:
+            if p in lower:
+                found.append((label, rank))
+                break
+    education = max(found, key=lambda x: x[1])[0] if found else "Unknown"
+
+    certifications = [
+        line.strip()
+        for line in text.splitlines()
+        if any(k in line.lower() for k in CERT_KEYWORDS)
+    ]
+
+    return {"skills": skills, "education": education, "certifications": certifications}
+
+
+def _time(func, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+
+def run(limit=None, repeat=20, **_):
+    texts = []
+    for path in media_files((".pdf",), limit):
+        with fitz.open(path) as doc:
+            text = "".join(page.get_text() for page in doc)
+        if text.strip():
+            texts.append(text)
+
+    if not texts:
+        return {"benchmark": "keywords", "texts": 0}
+
+    legacy = _time(_legacy_scan, texts, repeat)
+    single_pass = _time(scan_keywords, texts, repeat)
+
+    # Where the two disagree (word boundaries, e.g. "r" inside words)
+    spurious = sum(
+        len(_legacy_scan(t)["skills"] - scan_keywords(t)["skills"])
+        for t in texts
+    )
+
+    return {
+        "benchmark": "keywords",
+        "texts": len(texts),
+        "avg_chars": round(sum(map(len, texts)) / len(texts)),
+        "legacy_us_per_text": round(legacy * 1e6, 1),
+        "single_pass_us_per_text": round(single_pass * 1e6, 1),
+        "speedup": round(legacy / single_pass, 2) if single_pass else None,
+        "legacy_only_skill_hits": spurious,
+    }
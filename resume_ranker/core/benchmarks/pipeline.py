@@ -0,0 +1,223 @@
+"""
+Stage and end-to-end timings of the ranking pipeline.
+
+The corpus is a synthetic set of resumes (see core.benchmarks.corpus)
+plus the PDFs shipped in media/. Every stage function is timed per
+resume on a sample of the corpus, and analyze_and_rank_resumes end
+to end at each --sizes value. Runs are cold: the OCR and embedding
+caches are bypassed and stored profiles are rolled back after each
+end-to-end run.
+
+With --baseline (a previous --output file) the run fails when a stage
+or end-to-end time is more than --max-slowdown slower.
+"""
+
+import json
+import time
+
+import numpy as np
+from django.db import transaction
+
+from core.benchmarks import media_files
+from core.benchmarks.corpus import generate_corpus, parse_mix
+from core.pipelines.resume_pipeline import analyze_and_rank_resumes
+from core.services import embedding_service, ocr_service
+from core.services.cleaning_service import clean_text
+from core.services.embedding_service import embed
+from core.services.explanation_service import generate_explanation
+from core.services.genai_service import extract_info
+from core.services.lexical_service import LEXICAL_SHORTLIST_SIZE
+from core.services.scoring_service import calculate_final_score
+from core.services.similarity_service import cosine_similarity
+
+JOB_DESCRIPTION = (
+    "Looking for a Data Scientist with 3+ years of experience in Python, "
+    "machine learning, deep learning and SQL. Experience with TensorFlow or "
+    "PyTorch, AWS and Docker is a plus. Will build NLP and forecasting models."
+)
+
+
+def add_arguments(parser):
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Resume counts for the end-to-end runs.")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("text=0.7,scanned=0.1,png=0.1,jpg=0.1"),
+                        help='Synthetic resume kinds and weights, e.g. "text=0.7,scanned=0.3".')
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--media", type=int, default=None,
+                        help="Number of media/ PDFs to include (default all).")
+    parser.add_argument("--stage-sample", type=int, default=50,
+                        help="Resumes timed stage by stage.")
+    parser.add_argument("--baseline", help="Previous results file to compare against.")
+    parser.add_argument("--max-slowdown", type=float, default=0.2,
+                        help="Allowed slowdown vs the baseline (0.2 = 20%%).")
+    parser.add_argument("--min-ms", type=float, default=0.5,
+                        help="Stages faster than this in the baseline are too noisy to fail on.")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def _summary(samples_ms):
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "count": int(len(samples)),
+        "mean_ms": round(float(samples.mean()), 3) if len(samples) else None,
+        "p50_ms": round(float(np.percentile(samples, 50)), 3) if len(samples) else None,
+        "p95_ms": round(float(np.percentile(samples, 95)), 3) if len(samples) else None,
+        "total_ms": round(float(samples.sum()), 3),
+    }
+
+
+def _timed(samples, stage, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    samples.setdefault(stage, []).append(1000 * (time.perf_counter() - start))
+    return result
+
+
+def time_stages(paths):
+    samples = {}
+    job_vector = embed(clean_text(JOB_DESCRIPTION))
+    job_skills = {skill.lower() for skill in extract_info(clean_text(JOB_DESCRIPTION)).get("skills", [])}
+
+    for path in paths:
+        raw = _timed(samples, "extract_text_from_file", ocr_service.extract_text_from_file, path)
+        cleaned = _timed(samples, "clean_text", clean_text, raw)
+        if not cleaned:
+            continue
+
+        info = _timed(samples, "extract_info", extract_info, cleaned)
+        vector = _timed(samples, "embed", embed, cleaned)
+        semantic = _timed(samples, "cosine_similarity", cosine_similarity, vector, job_vector)
+        if semantic is None:
+            continue
+
+        skills = {skill.lower() for skill in info.get("skills", [])}
+        overlap = len(job_skills & skills) / len(job_skills) if job_skills else 0.0
+        score = _timed(
+            samples, "calculate_final_score", calculate_final_score,
+            semantic_similarity=semantic / 10,
+            experience_years=info.get("experience_years", 0.0),
+            skill_overlap=overlap
+        )
+        _timed(
+            samples, "generate_explanation", generate_explanation,
+            job_description=clean_text(JOB_DESCRIPTION),
+            skills=info.get("skills", []),
+            experience_years=info.get("experience_years", 0.0),
+            match_score=score,
+            semantic_similarity=semantic,
+            skill_overlap=overlap
+        )
+
+    return {stage: _summary(values) for stage, values in samples.items()}
+
+
+def time_end_to_end(paths, size):
+    files = [paths[i % len(paths)] for i in range(size)]
+
+    with transaction.atomic():
+        start = time.perf_counter()
+        results = analyze_and_rank_resumes(files, JOB_DESCRIPTION)
+        elapsed = time.perf_counter() - start
+        transaction.set_rollback(True)  # keep every run cold
+
+    return {
+        "resumes": size,
+        "distinct_files": len(set(files)),
+        "ranked": len(results),
+        "seconds": round(elapsed, 3),
+        "resumes_per_second": round(size / elapsed, 2) if elapsed else None,
+    }
+
+
+def compare(results, baseline, max_slowdown, min_ms):
+    """
+    Ratios against the baseline and the list of regressions.
+    """
+    checks = []
+
+    for stage, stats in results["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if base and base.get("mean_ms"):
+            checks.append((f"stage:{stage}", stats["mean_ms"], base["mean_ms"],
+                           base["mean_ms"] >= min_ms))
+
+    base_runs = {run["resumes"]: run for run in baseline.get("end_to_end", [])}
+    for run in results["end_to_end"]:
+        base = base_runs.get(run["resumes"])
+        if base and base.get("seconds"):
+            checks.append((f"end_to_end:{run['resumes']}", 1000 * run["seconds"],
+                           1000 * base["seconds"], True))
+
+    comparisons = []
+    for name, current, base, enforced in checks:
+        ratio = current / base
+        comparisons.append({
+            "name": name,
+            "baseline_ms": round(base, 3),
+            "current_ms": round(current, 3),
+            "ratio": round(ratio, 3),
+            "regressed": enforced and ratio > 1 + max_slowdown,
+        })
+
+    return comparisons
+
+
+def run(sizes=(10, 100, 1000), mix=None, pages=(1, 2, 3), media=None,
+        stage_sample=50, baseline=None, max_slowdown=0.2, min_ms=0.5, seed=0, **_):
+    sizes = sorted(sizes)
+
+    # media/ holds many copies of the same resumes - keep one of each
+    real = []
+    seen = set()
+    for path in media_files((".pdf",), media):
+        content_hash = ocr_service.file_sha256(path)
+        if content_hash not in seen:
+            seen.add(content_hash)
+            real.append(str(path))
+
+    synthetic = generate_corpus(max(max(sizes) - len(real), 0), mix, pages, seed)
+    paths = real + synthetic
+
+    # Cold runs: no cached OCR text or embeddings
+    saved = ocr_service.OCR_CACHE_ENABLED, embedding_service.EMBEDDING_CACHE_ENABLED
+    ocr_service.OCR_CACHE_ENABLED = False
+    embedding_service.EMBEDDING_CACHE_ENABLED = False
+
+    try:
+        embed("warm up")  # model loading is not part of any stage
+        extract_info("warm up")
+
+        rng = np.random.default_rng(seed)
+        sample = rng.choice(len(paths), size=min(stage_sample, len(paths)), replace=False)
+        stages = time_stages([paths[i] for i in sorted(sample)])
+
+        end_to_end = [time_end_to_end(paths, size) for size in sizes]
+    finally:
+        ocr_service.OCR_CACHE_ENABLED, embedding_service.EMBEDDING_CACHE_ENABLED = saved
+
+    results = {
+        "benchmark": "pipeline",
+        "corpus": {
+            "media_files": len(real),
+            "synthetic_files": len(synthetic),
+            "mix": mix,
+            "pages": list(pages),
+            "seed": seed,
+            "lexical_shortlist_size": LEXICAL_SHORTLIST_SIZE,
+        },
+        "stages": stages,
+        "end_to_end": end_to_end,
+    }
+
+    if baseline:
+        with open(baseline) as f:
+            comparisons = compare(results, json.load(f), max_slowdown, min_ms)
+
+        results["baseline"] = {
+            "path": baseline,
+            "max_slowdown": max_slowdown,
+            "comparisons": comparisons,
+        }
+        results["passed"] = not any(c["regressed"] for c in comparisons)
+
+    return results
@@ -0,0 +1,75 @@
+"""
+Compare PDF page rasterization paths used by the OCR fallback:
+
+- fitz:      PyMuPDF pixmap wrapped as a grayscale PIL image in-process
+- pdf2image: poppler subprocess writing PNGs that are decoded again
+
+Each renderer runs in its own child process so peak RSS
+(including poppler grandchildren) is measured independently.
+"""
+
+import multiprocessing
+import resource
+import time
+
+import fitz
+
+from core.benchmarks import media_files
+from core.services.ocr_service import OCR_DPI, PDF_RENDERERS, preprocess_image
+
+
+def add_arguments(parser):
+    parser.add_argument("--limit", type=int, default=20,
+                        help="Number of PDFs from media/ to render.")
+    parser.add_argument("--dpi", type=int, default=OCR_DPI)
+    parser.add_argument("--renderers", nargs="+", default=list(PDF_RENDERERS),
+                        choices=list(PDF_RENDERERS))
+
+
+def _render_all(renderer, paths, dpi):
+    render = PDF_RENDERERS[renderer]
+    pages = 0
+
+    start = time.perf_counter()
+    for path in paths:
+        with fitz.open(path) as doc:
+            page_count = len(doc)
+        for page_number in range(1, page_count + 1):
+            preprocess_image(render(path, page_number, dpi))
+            pages += 1
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is KiB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    return {
+        "renderer": renderer,
+        "pages": pages,
+        "seconds": round(elapsed, 4),
+        "seconds_per_page": round(elapsed / pages, 4) if pages else None,
+        "peak_rss_mib": round(own / 1024, 1),
+        "peak_child_rss_mib": round(children / 1024, 1),
+    }
+
+
+def run(limit=20, dpi=OCR_DPI, renderers=None, **_):
+    paths = [str(path) for path in media_files((".pdf",), limit)]
+    results = []
+
+    ctx = multiprocessing.get_context("spawn")
+    for renderer in renderers or list(PDF_RENDERERS):
+        with ctx.Pool(1) as pool:
+            try:
+                results.append(
+                    pool.apply(_render_all, (renderer, paths, dpi))
+                )
+            except Exception as e:
+                results.append({"renderer": renderer, "error": str(e)})
+
+    return {
+        "benchmark": "rasterization",
+        "files": len(paths),
+        "dpi": dpi,
+        "results": results,
+    }
@@ -0,0 +1,64 @@
+"""
+Size, search latency and ranking drift of the compact vector store
+formats against full-precision float32 vectors.
+
+Uses stored corpus embeddings when --source corpus is given,
+otherwise a synthetic clustered corpus of --size vectors.
+"""
+
+import time
+
+import numpy as np
+
+from core.benchmarks.ann_recall import _corpus, _synthetic
+from core.services.vector_store import DTYPES, CompactVectorStore, drift_report
+
+
+def add_arguments(parser):
+    parser.add_argument("--source", choices=["synthetic", "corpus"], default="synthetic")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--dtypes", nargs="+", default=list(DTYPES), choices=list(DTYPES))
+    parser.add_argument("--pca-dims", type=int, nargs="+", default=[0, 128])
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def run(source="synthetic", size=100000, dim=384, queries=50, k=50,
+        dtypes=DTYPES, pca_dims=(0, 128), seed=0, **_):
+    rng = np.random.default_rng(seed)
+
+    vectors = _corpus() if source == "corpus" else _synthetic(size, dim, rng)
+    ids = np.arange(len(vectors))
+
+    # Queries: perturbed corpus vectors, like a JD close to some resumes
+    picks = rng.integers(0, len(vectors), size=queries)
+    query_vectors = vectors[picks] + 0.5 * rng.normal(size=(queries, vectors.shape[1])).astype(np.float32)
+
+    results = []
+    for pca_dim in pca_dims:
+        for dtype in dtypes:
+            start = time.perf_counter()
+            store = CompactVectorStore.build(ids, vectors, dtype=dtype, pca_dim=pca_dim)
+            build_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for q in query_vectors:
+                store.search(q, k)
+            ms_per_query = 1000 * (time.perf_counter() - start) / queries
+
+            report = drift_report(store, vectors, query_vectors, k=k)
+            report.update({
+                "pca_dim": pca_dim or None,
+                "build_seconds": round(build_seconds, 3),
+                "ms_per_query": round(ms_per_query, 3),
+            })
+            results.append(report)
+
+    return {
+        "benchmark": "vector_store",
+        "source": source,
+        "vectors": len(vectors),
+        "results": results,
+    }
@@ -0,0 +1,45 @@
+import importlib
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = "Run an offline performance benchmark and print JSON results."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+        for name, module_path in BENCHMARKS.items():
+            module = importlib.import_module(module_path)
+            subparser = subparsers.add_parser(
+                name,
+                help=(module.__doc__ or "").strip().splitlines()[0]
+            )
+            subparser.add_argument(
+                "--output",
+                help="Also write the JSON results to this file."
+            )
+            module.add_arguments(subparser)
+
+    def handle(self, *args, **options):
+        name = options.pop("benchmark")
+        if name not in BENCHMARKS:
+            raise CommandError(f"Unknown benchmark '{name}'.")
+
+        module = importlib.import_module(BENCHMARKS[name])
+        output = options.pop("output", None)
+        results = module.run(**options)
+
+        text = json.dumps(results, indent=2)
+        self.stdout.write(text)
+
+        if output:
+            with open(output, "w") as f:
+                f.write(text + "\n")
+
+        if results.get("passed") is False:
+            raise CommandError(f"Benchmark '{name}' failed its budget.")
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.services.ann_index import ANN_INDEX_PATH, sync_corpus_index
+
+
+class Command(BaseCommand):
+    help = "Build (or bring up to date) the ANN index over stored resume embeddings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Retrain the index from scratch instead of syncing the changes.",
+        )
+
+    def handle(self, *args, **options):
+        index = sync_corpus_index(rebuild=options["rebuild"])
+
+        if index is None:
+            self.stdout.write("No stored resumes to index.")
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(index)} vectors in {len(index.centroids)} buckets → {ANN_INDEX_PATH}"
+        ))
@@ -0,0 +1,67 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from core.services.vector_store import (
+    DTYPES,
+    VECTOR_STORE_DIR,
+    VECTOR_STORE_DTYPE,
+    VECTOR_STORE_PCA_DIM,
+    _stored_vectors,
+    drift_report,
+    sync_corpus_store,
+)
+
+
+class Command(BaseCommand):
+    help = "Build (or bring up to date) the compact vector store over stored resume embeddings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Rebuild from scratch (required to change --dtype or --pca-dim).",
+        )
+        parser.add_argument("--dtype", choices=DTYPES, default=VECTOR_STORE_DTYPE)
+        parser.add_argument(
+            "--pca-dim",
+            type=int,
+            default=VECTOR_STORE_PCA_DIM,
+            help="Reduce vectors to this many PCA components (0 = keep full size).",
+        )
+        parser.add_argument(
+            "--drift",
+            action="store_true",
+            help="Report ranking drift against the full-precision vectors.",
+        )
+        parser.add_argument("--queries", type=int, default=100)
+        parser.add_argument("--k", type=int, default=50)
+
+    def handle(self, *args, **options):
+        store = sync_corpus_store(
+            rebuild=options["rebuild"],
+            dtype=options["dtype"],
+            pca_dim=options["pca_dim"]
+        )
+
+        if store is None:
+            self.stdout.write("No stored resumes to index.")
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(store)} vectors ({store.dtype}, {store.dim}-d, "
+            f"{store.nbytes / 1024 / 1024:.1f} MB) → {VECTOR_STORE_DIR}"
+        ))
+
+        if options["drift"]:
+            ids, vectors = _stored_vectors()
+            if not np.array_equal(store.ids, ids):
+                self.stdout.write("Resumes changed while syncing; run again for a drift report.")
+                return
+
+            # Stored resumes serve as queries: "more candidates like this one"
+            rng = np.random.default_rng(0)
+            picks = rng.choice(len(ids), size=min(options["queries"], len(ids)), replace=False)
+            report = drift_report(store, vectors, vectors[picks], k=options["k"])
+
+            for key, value in report.items():
+                self.stdout.write(f"  {key}: {value}")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.services.embedding_service import MODEL_NAME, get_model
+from core.services.onnx_backend import export_model
+
+
+class Command(BaseCommand):
+    help = "Export the embedding model to ONNX (and an int8 quantized copy) for the onnx backends."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-quantize",
+            action="store_true",
+            help="Skip the int8 dynamic-quantized copy.",
+        )
+
+    def handle(self, *args, **options):
+        out_dir = export_model(
+            get_model(),
+            MODEL_NAME,
+            quantize=not options["no_quantize"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Exported {MODEL_NAME} to {out_dir}"))
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.services.corpus_service import ingest_files
+
+RESUME_EXTENSIONS = {".pdf", ".jpg", ".jpeg", ".png"}
+
+
+class Command(BaseCommand):
+    help = "Extract and store features for resume files in the candidate corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            help="Resume files or directories (default: MEDIA_ROOT/resumes).",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or [Path(settings.MEDIA_ROOT) / "resumes"]
+
+        file_paths = []
+        for path in map(Path, paths):
+            if path.is_dir():
+                file_paths.extend(
+                    str(p) for p in sorted(path.rglob("*"))
+                    if p.suffix.lower() in RESUME_EXTENSIONS
+                )
+            elif path.suffix.lower() in RESUME_EXTENSIONS:
+                file_paths.append(str(path))
+
+        def report(done, total):
+            if done % 25 == 0 or done == total:
+                self.stdout.write(f"{done}/{total} files processed")
+
+        profiles = ingest_files(file_paths, progress_callback=report)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(profiles)} candidate profiles available "
+            f"from {len(file_paths)} files."
+        ))
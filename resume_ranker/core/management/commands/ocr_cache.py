@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from core.services.ocr_service import ocr_cache
+
+
+class Command(BaseCommand):
+    help = "Inspect, trim or purge the extracted-text (OCR) cache."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Remove every cached entry.",
+        )
+        parser.add_argument(
+            "--evict-to",
+            type=int,
+            metavar="BYTES",
+            help="Evict least recently used entries until the cache fits BYTES.",
+        )
+
+    def handle(self, *args, **options):
+        if options["purge"]:
+            removed = ocr_cache.purge()
+            self.stdout.write(self.style.SUCCESS(f"Purged {removed} entries."))
+        elif options["evict_to"] is not None:
+            removed = ocr_cache.evict(options["evict_to"])
+            self.stdout.write(self.style.SUCCESS(f"Evicted {removed} entries."))
+
+        stats = ocr_cache.stats()
+        self.stdout.write(f"Path:      {stats['path']}")
+        self.stdout.write(f"Entries:   {stats['entries']}")
+        self.stdout.write(
+            f"Size:      {stats['total_bytes'] / 1024:.1f} KiB"
+            f" of {stats['max_bytes'] / 1024:.1f} KiB"
+        )
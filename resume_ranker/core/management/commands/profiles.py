@@ -0,0 +1,62 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.profiling_service import function_report, list_profiles, profiles_dir
+
+
+class Command(BaseCommand):
+    help = "List saved ranking profiles, or summarize one of them."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "name",
+            nargs="?",
+            help="Profile to summarize (base name or a unique prefix, e.g. a job id).",
+        )
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            choices=["cumulative", "tottime", "calls"],
+            help="Order of the function table.",
+        )
+        parser.add_argument("--limit", type=int, default=25)
+        parser.add_argument(
+            "--allocations",
+            action="store_true",
+            help="Also print the saved top-allocations report.",
+        )
+
+    def handle(self, *args, **options):
+        summaries = list_profiles()
+
+        if not options["name"]:
+            if not summaries:
+                self.stdout.write(f"No profiles in {profiles_dir()}.")
+                return
+
+            for summary in summaries:
+                self.stdout.write(
+                    f"{os.path.basename(summary['base']):60s} "
+                    f"{summary.get('seconds', 0):8.2f} s  "
+                    f"peak {summary.get('peak_bytes', 0) / 1024 / 1024:7.1f} MiB  "
+                    f"{summary.get('resumes', '?')} resumes  {summary.get('mode', '')}"
+                )
+            return
+
+        matches = [
+            summary for summary in summaries
+            if options["name"] in os.path.basename(summary["base"])
+        ]
+        if len(matches) != 1:
+            raise CommandError(f"{len(matches)} profiles match '{options['name']}'.")
+
+        base = matches[0]["base"]
+        self.stdout.write(function_report(f"{base}.prof", options["limit"], options["sort"]))
+
+        if options["allocations"]:
+            with open(f"{base}.txt") as f:
+                report = f.read()
+            # The allocations section is the last one in the report
+            self.stdout.write(report[report.rfind("\nTop ") + 1:])
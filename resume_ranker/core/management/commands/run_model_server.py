@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from core.services.model_client import MODEL_SERVER_SOCKET
+from core.services.model_server import (
+    MODEL_SERVER_MAX_BATCH,
+    MODEL_SERVER_MAX_WAIT_MS,
+    ModelServer,
+)
+from core.services.warmup_service import warmup_models
+
+
+class Command(BaseCommand):
+    help = "Serve the embedding and spaCy models to all local processes over a Unix socket."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--socket", default=MODEL_SERVER_SOCKET)
+        parser.add_argument("--max-batch", type=int, default=MODEL_SERVER_MAX_BATCH)
+        parser.add_argument("--max-wait-ms", type=float, default=MODEL_SERVER_MAX_WAIT_MS)
+
+    def handle(self, *args, **options):
+        server = ModelServer(
+            options["socket"],
+            max_batch=options["max_batch"],
+            max_wait_ms=options["max_wait_ms"],
+        )
+
+        warmup_models()
+        self.stdout.write(self.style.SUCCESS(
+            f"Model server listening on {options['socket']}"
+        ))
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services.ann_index import ANN_SYNC_INTERVAL, sync_corpus_index
+from core.services.job_service import claim_next_job, fail_stale_jobs, run_job
+from core.services.vector_store import (
+    VECTOR_STORE_ENABLED,
+    VECTOR_STORE_SYNC_INTERVAL,
+    sync_corpus_store,
+)
+
+
+class Command(BaseCommand):
+    help = "Process queued resume ranking jobs in the background."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait between polls when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as the queue is empty.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Ranking worker started.")
+
+        stale = fail_stale_jobs()
+        if stale:
+            self.stdout.write(f"Failed {stale} stale running job(s).")
+        last_sync = None
+        last_index_sync = None
+
+        while True:
+            job = claim_next_job()
+
+            if job is None:
+                # Keep the ANN index and compact vector store current while idle
+                if last_index_sync is None or time.monotonic() - last_index_sync >= ANN_SYNC_INTERVAL:
+                    self.sync_ann_index()
+                    last_index_sync = time.monotonic()
+
+                if VECTOR_STORE_ENABLED and (
+                    last_sync is None
+                    or time.monotonic() - last_sync >= VECTOR_STORE_SYNC_INTERVAL
+                ):
+                    self.sync_vector_store()
+                    last_sync = time.monotonic()
+
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Running job {job.pk} ({job.total} resumes)")
+            run_job(job)
+            last_sync = last_index_sync = None  # the job may have stored new resumes
+
+    def sync_ann_index(self):
+        try:
+            sync_corpus_index()
+        except Exception as e:
+            print("ANN index sync error:", e)
+
+    def sync_vector_store(self):
+        try:
+            sync_corpus_store()
+        except Exception as e:
+            print("Vector store sync error:", e)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.services.warmup_service import warmup_models
+
+
+class Command(BaseCommand):
+    help = "Load the embedding and spaCy models (and their caches) ahead of traffic."
+    requires_system_checks = []
+
+    def handle(self, *args, **options):
+        timings = warmup_models()
+
+        for name, seconds in timings.items():
+            self.stdout.write(f"{name}: {seconds:.2f}s")
+
+        self.stdout.write(self.style.SUCCESS("Models ready."))
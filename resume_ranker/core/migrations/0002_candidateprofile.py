@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-17 00:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('file_path', models.CharField(max_length=500)),
+                ('cleaned_text', models.TextField()),
+                ('email', models.CharField(blank=True, max_length=254)),
+                ('phone_numbers', models.JSONField(default=list)),
+                ('info', models.JSONField(default=dict)),
+                ('embedding', models.BinaryField()),
+                ('embedding_model', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
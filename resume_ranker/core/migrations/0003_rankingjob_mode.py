@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-17 00:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_candidateprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rankingjob',
+            name='mode',
+            field=models.CharField(choices=[('full', 'Full'), ('fast', 'Fast (lexical only)')], default='full', max_length=8),
+        ),
+    ]
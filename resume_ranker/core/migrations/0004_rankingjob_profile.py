@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-17 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_rankingjob_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rankingjob',
+            name='profile',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-17 00:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_rankingjob_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rankingjob',
+            name='unprocessed',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-17 00:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_rankingjob_unprocessed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidateprofile',
+            name='features_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
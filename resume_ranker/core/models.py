@@ -1,3 +1,96 @@
+import uuid
+
+import numpy as np
 from django.db import models
 
-# Create your models here.
+
+class RankingJob(models.Model):
+    """
+    A queued resume ranking request, processed by the
+    `run_ranking_worker` management command.
+    """
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    MODE_FULL = "full"
+    MODE_FAST = "fast"
+
+    MODE_CHOICES = [
+        (MODE_FULL, "Full"),
+        (MODE_FAST, "Fast (lexical only)"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    job_description = models.TextField()
+    file_paths = models.JSONField(default=list)
+    mode = models.CharField(max_length=8, choices=MODE_CHOICES, default=MODE_FULL)
+    profile = models.BooleanField(default=False)  # run under cProfile/tracemalloc
+
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        db_index=True,
+    )
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    results = models.JSONField(null=True, blank=True)
+    unprocessed = models.JSONField(default=list, blank=True)  # files cut off by the deadline
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"RankingJob {self.id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+
+class CandidateProfile(models.Model):
+    """
+    Features extracted from one resume file, stored once per
+    distinct file content so later rankings skip OCR, NLP and
+    embedding work for resumes that were already seen.
+    """
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    file_path = models.CharField(max_length=500)
+
+    cleaned_text = models.TextField()
+    email = models.CharField(max_length=254, blank=True)
+    phone_numbers = models.JSONField(default=list)
+    info = models.JSONField(default=dict)  # extract_info() output
+    features_version = models.PositiveIntegerField(default=0)  # corpus_service.FEATURES_VERSION
+
+    embedding = models.BinaryField()  # float32 bytes
+    embedding_model = models.CharField(max_length=100)  # blank until embedding succeeds
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"CandidateProfile {self.content_hash[:12]}"
+
+    @property
+    def vector(self):
+        return np.frombuffer(bytes(self.embedding), dtype=np.float32)
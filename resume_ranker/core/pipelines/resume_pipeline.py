@@ -1,33 +1,220 @@
-from core.services.ocr_service import extract_text_from_file
+import numpy as np
+
+from core.models import CandidateProfile
 from core.services.cleaning_service import clean_text
-from core.services.regex_service import (
-    extract_primary_email,
-    extract_phone_numbers,
-)
-from core.services.genai_service import extract_info
+from core.services.genai_service import extract_info, extract_info_fast
 from core.services.embedding_service import embed
-from core.services.similarity_service import cosine_similarity
-from core.services.scoring_service import calculate_final_score
+from core.services.corpus_service import (
+    PIPELINE_BATCH_SIZE,
+    complete_profiles,
+    ingest_files_staged,
+    read_files,
+    read_files_indexed,
+)
+from core.services.lexical_service import (
+    LEXICAL_SHORTLIST_SIZE,
+    lexical_shortlist,
+    lexical_similarity,
+)
+from core.services.ann_index import get_corpus_index
+from core.services.vector_store import VECTOR_STORE_ENABLED, get_corpus_store
+from core.services.similarity_service import batch_cosine_similarity
+from core.services.scoring_service import calculate_final_scores
 from core.services.explanation_service import generate_explanation
+from core.services.metrics_service import span
 
 
-def analyze_and_rank_resumes(file_paths, job_description):
+def analyze_and_rank_resumes(file_paths, job_description, progress_callback=None, deadline=None):
     """
     Analyze multiple resumes and rank them based on suitability
     for the given job description.
 
-    Fully offline, ATS-style NLP pipeline.
+    Fully offline, ATS-style NLP pipeline. Resume features are
+    stored in the candidate corpus, so files that were seen before
+    skip OCR, NLP extraction and embedding.
+
+    Ranking is a cascade: when there are more than
+    LEXICAL_SHORTLIST_SIZE resumes, a TF-IDF pass over the cleaned
+    texts keeps the best lexical matches, and only those go through
+    spaCy extraction, embedding and full scoring. Smaller batches
+    stream straight through the staged ingestion pipeline, so NLP
+    and embedding start while later files are still being OCR'd.
+
+    progress_callback(done, total), if given, is called after
+    each resume has been read. With a deadline
+    (admission_service.Deadline), resumes left when it expires are
+    recorded on it as not processed and left out of the ranking.
     """
 
-    results = []
+    results = [
+        result
+        for batch in iter_rank_resumes(file_paths, job_description, progress_callback, deadline)
+        for result in batch
+    ]
+
+    results.sort(
+        key=lambda x: x["match_score"],
+        reverse=True
+    )
+
+    return results
+
+
+def iter_rank_resumes(file_paths, job_description, progress_callback=None, deadline=None):
+    """
+    analyze_and_rank_resumes() one batch at a time: yields the
+    scored results of each batch of resumes as soon as it is ranked,
+    each list sorted by match score. Full-mode scores do not depend
+    on the other resumes, so merging the batches gives the ranking.
+    """
 
     # --------------------------------------------------
     # 1. Prepare job description
     # --------------------------------------------------
+    with span("prepare_job"):
+        job = prepare_job(job_description)
+
+    if job is None:
+        return
+
+    if not LEXICAL_SHORTLIST_SIZE or len(file_paths) <= LEXICAL_SHORTLIST_SIZE:
+        # --------------------------------------------------
+        # 2. Read, extract and embed in overlapping stages
+        # --------------------------------------------------
+        batches = ingest_files_staged(file_paths, progress_callback, deadline)
+
+        while True:
+            with span("ingest"):
+                batch = next(batches, None)
+            if batch is None:
+                return
+
+            yield rank_profiles([profile for _, profile in batch], job)
+
+    # --------------------------------------------------
+    # 2. Read (or load stored) text for each resume
+    # --------------------------------------------------
+    with span("read_files"):
+        indexed = read_files_indexed(file_paths, progress_callback, deadline)
+
+    # --------------------------------------------------
+    # 3. Lexical first stage (needs every text: a barrier)
+    # --------------------------------------------------
+    with span("lexical"):
+        shortlist = lexical_shortlist(
+            [profile.cleaned_text for _, profile in indexed],
+            job["cleaned"],
+            LEXICAL_SHORTLIST_SIZE
+        )
+    indexed = [indexed[i] for i in sorted(shortlist)]
+
+    # --------------------------------------------------
+    # 4. NLP + embeddings for the shortlist, score & rank
+    # --------------------------------------------------
+    for start in range(0, len(indexed), PIPELINE_BATCH_SIZE):
+        if deadline is not None and deadline.expired():
+            for index, _ in indexed[start:]:
+                deadline.give_up(index, file_paths[index])
+            return
+
+        chunk = indexed[start:start + PIPELINE_BATCH_SIZE]
+        batch = complete_profiles([profile for _, profile in chunk])  # "nlp" / "embedding" / "db_save" spans
+        yield rank_profiles(batch, job)
+
+
+def fast_rank_resumes(file_paths, job_description, progress_callback=None, deadline=None):
+    """
+    Fast mode for very large batches: rank every resume on TF-IDF
+    similarity plus rule-based skills and experience, without spaCy
+    or the embedding model. Scores are relative to the best lexical
+    match in the batch. New resumes are not stored in the corpus.
+    """
+
+    job_description_cleaned = clean_text(job_description)
+
+    if not job_description_cleaned:
+        return []
+
+    job = {
+        "cleaned": job_description_cleaned,
+        "vector": None,
+        "skills": {
+            skill.lower()
+            for skill in extract_info_fast(job_description_cleaned).get("skills", [])
+        },
+    }
+
+    with span("read_files"):
+        profiles = read_files(file_paths, progress_callback, deadline)
+
+    with span("nlp"):
+        for profile in profiles:
+            if profile.pk is None:
+                profile.info = extract_info_fast(profile.cleaned_text)
+
+    return rank_profiles(profiles, job)
+
+
+def iter_fast_rank_resumes(file_paths, job_description, progress_callback=None, deadline=None):
+    """
+    fast_rank_resumes() in the iter_rank_resumes() shape. Fast-mode
+    scores are relative to the best lexical match of the whole
+    upload, so everything comes as one batch.
+    """
+
+    results = fast_rank_resumes(file_paths, job_description, progress_callback, deadline)
+    if results:
+        yield results
+
+
+def rank_corpus(job_description, top_k=None):
+    """
+    Rank stored resumes against a new job description.
+    Only the job side is computed; resumes are scored from
+    their stored features.
+
+    With top_k, the approximate nearest-neighbour index picks a
+    shortlist of the top_k semantically closest resumes and only
+    those get full skill/experience scoring. With
+    VECTOR_STORE_ENABLED the shortlist is an exact scan of the
+    compact vector store instead, once one has been built for the
+    current embedding model. Until either has been synced for the
+    current model, every stored resume is scored.
+    """
+
+    with span("prepare_job"):
+        job = prepare_job(job_description)
+
+    if job is None:
+        return []
+
+    if not top_k:
+        return rank_profiles(CandidateProfile.objects.all().iterator(), job)
+
+    index = get_corpus_store() if VECTOR_STORE_ENABLED else None
+    if index is None:
+        index = get_corpus_index()
+    if index is None:
+        results = rank_profiles(CandidateProfile.objects.all().iterator(), job)
+        return results[:int(top_k)]
+
+    with span("ann_search"):
+        ids, _ = index.search(job["vector"], int(top_k))
+    shortlist = CandidateProfile.objects.in_bulk([int(pk) for pk in ids])
+
+    return rank_profiles(shortlist.values(), job)
+
+
+def prepare_job(job_description):
+    """
+    Clean, embed and extract skills from the job description.
+    Returns None when nothing usable is left after cleaning.
+    """
+
     job_description_cleaned = clean_text(job_description)
 
     if not job_description_cleaned:
-        return results
+        return None
 
     job_vector = embed(job_description_cleaned)
 
@@ -38,50 +225,42 @@ def analyze_and_rank_resumes(file_paths, job_description):
         for skill in job_info.get("skills", [])
     }
 
-    # --------------------------------------------------
-    # 2. Process each resume
-    # --------------------------------------------------
-    for file_path in file_paths:
-        try:
-            # ---------------- OCR ----------------
-            raw_text = extract_text_from_file(file_path)
-            if not raw_text:
-                continue
+    return {
+        "cleaned": job_description_cleaned,
+        "vector": job_vector,
+        "skills": job_skills,
+    }
 
-            # ---------------- Cleaning ----------------
-            cleaned_text = clean_text(raw_text)
-            if not cleaned_text:
-                continue
 
-            # ---------------- Contact Info ----------------
-            email = extract_primary_email(cleaned_text)
-            phones = extract_phone_numbers(cleaned_text)
+def rank_profiles(profiles, job):
+    """
+    Score stored candidate profiles against a prepared job and
+    return results sorted by match score (descending).
 
-            # ---------------- Resume NLP Extraction ----------------
-            resume_info = extract_info(cleaned_text)
+    Similarity and final scores are computed for all profiles
+    at once; only explanations are generated per resume.
+    A job without a vector (fast mode) is scored on TF-IDF
+    similarity instead of embeddings.
+    """
 
+    job_skills = job["skills"]
+
+    # --------------------------------------------------
+    # 1. Gather per-resume features
+    # --------------------------------------------------
+    rows = []
+    vectors = []
+
+    for profile in profiles:
+        try:
+            resume_info = profile.info or {}
             skills = resume_info.get("skills", [])
-            education = resume_info.get("education", "Unknown")
-            experience_years = resume_info.get("experience_years", 0.0)
-            domain = resume_info.get("domain", "Unknown")
 
             resume_skills = {
                 skill.lower()
                 for skill in skills
             }
 
-            # ---------------- Semantic Similarity (0–10 or None) ----------------
-            resume_vector = embed(cleaned_text)
-
-            semantic_score = cosine_similarity(
-                resume_vector,
-                job_vector
-            )
-
-            # ❌ Skip resumes with no meaningful semantic match
-            if semantic_score is None:
-                continue
-
             # ---------------- Skill Overlap ----------------
             if job_skills:
                 skill_overlap_ratio = (
@@ -91,45 +270,94 @@ def analyze_and_rank_resumes(file_paths, job_description):
             else:
                 skill_overlap_ratio = 0.0
 
-            # ---------------- Final ATS Score (0–10) ----------------
-            match_score = calculate_final_score(
-                semantic_similarity=semantic_score / 10,  # normalize back to 0–1
-                experience_years=experience_years,
-                skill_overlap=skill_overlap_ratio
-            )
-
-            # ---------------- Explanation ----------------
-            explanation = generate_explanation(
-                job_description=job_description_cleaned,
-                skills=skills,
-                experience_years=experience_years,
-                match_score=match_score,
-                semantic_similarity=semantic_score,
-                skill_overlap=skill_overlap_ratio
-            )
-
-            # ---------------- Collect Result ----------------
-            results.append({
-                "email": email,
-                "phone_numbers": phones,
-                "skills": skills,
-                "education": education,
-                "experience_years": round(experience_years, 2),
-                "domain": domain,
-                "semantic_similarity": round(semantic_score, 2),
-                "skill_overlap": round(skill_overlap_ratio, 2),
-                "match_score": match_score,
-                "explanation": explanation
-            })
+            vector = None
+            if job["vector"] is not None:
+                vector = profile.vector
+                if vector.shape != job["vector"].shape:
+                    raise ValueError(f"embedding has shape {vector.shape}")
 
         except Exception as e:
             # One resume failure should NOT stop the pipeline
-            print(f"[Resume skipped] {file_path} → {e}")
+            print(f"[Resume skipped] {profile.file_path} → {e}")
             continue
 
+        vectors.append(vector)
+        rows.append({
+            "profile": profile,
+            "skills": skills,
+            "education": resume_info.get("education", "Unknown"),
+            "experience_years": resume_info.get("experience_years", 0.0),
+            "domain": resume_info.get("domain", "Unknown"),
+            "skill_overlap": skill_overlap_ratio,
+        })
+
+    if not rows:
+        return []
+
+    # --------------------------------------------------
+    # 2. Semantic similarity (0–10, NaN = no meaningful match)
+    # --------------------------------------------------
+    with span("similarity"):
+        if job["vector"] is not None:
+            semantic_scores, no_match = batch_cosine_similarity(
+                np.vstack(vectors),
+                job["vector"]
+            )
+        else:
+            # Fast mode: TF-IDF similarity stands in for the embeddings
+            semantic_scores, no_match = lexical_similarity(
+                [row["profile"].cleaned_text for row in rows],
+                job["cleaned"]
+            )
+
+    # --------------------------------------------------
+    # 3. Final ATS scores (0–10)
+    # --------------------------------------------------
+    with span("scoring"):
+        match_scores = calculate_final_scores(
+            semantic_similarity=semantic_scores / 10,  # normalize back to 0–1
+            experience_years=[row["experience_years"] for row in rows],
+            skill_overlap=[row["skill_overlap"] for row in rows]
+        )
+
     # --------------------------------------------------
-    # 3. Sort by match score (descending)
+    # 4. Explanations & results for matching resumes
     # --------------------------------------------------
+    results = []
+
+    for index in np.flatnonzero(~no_match):
+        row = rows[index]
+        profile = row["profile"]
+        semantic_score = float(semantic_scores[index])
+        match_score = float(match_scores[index])
+
+        try:
+            with span("explanation"):
+                explanation = generate_explanation(
+                    job_description=job["cleaned"],
+                    skills=row["skills"],
+                    experience_years=row["experience_years"],
+                    match_score=match_score,
+                    semantic_similarity=semantic_score,
+                    skill_overlap=row["skill_overlap"]
+                )
+        except Exception as e:
+            print(f"[Resume skipped] {profile.file_path} → {e}")
+            continue
+
+        results.append({
+            "email": profile.email,
+            "phone_numbers": profile.phone_numbers,
+            "skills": row["skills"],
+            "education": row["education"],
+            "experience_years": round(row["experience_years"], 2),
+            "domain": row["domain"],
+            "semantic_similarity": round(semantic_score, 2),
+            "skill_overlap": round(row["skill_overlap"], 2),
+            "match_score": match_score,
+            "explanation": explanation
+        })
+
     results.sort(
         key=lambda x: x["match_score"],
         reverse=True
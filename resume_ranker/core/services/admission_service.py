@@ -0,0 +1,204 @@
+"""
+admission_service.py
+
+Per-request resource budgets for ranking requests: how many files,
+bytes and PDF pages one request may bring, how many pipelines may
+run or wait at once, and how long a pipeline run may take.
+
+A request over its upload budget is refused before any work is
+done: on its Content-Length before the body is read, and by an
+upload handler that stops reading once the files exceed it. The time budget (Deadline) is checked by the pipeline
+between units of work: files it had no time left for are reported
+as not processed instead of holding the request open.
+"""
+
+import os
+import time
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler
+
+from core.models import RankingJob
+from core.services.ocr_service import count_pages
+
+# --------------------------------------------------
+# Configuration (0 = no limit)
+# --------------------------------------------------
+MAX_FILES_PER_REQUEST = int(os.getenv("MAX_FILES_PER_REQUEST", "100"))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+MAX_PAGES_PER_REQUEST = int(os.getenv("MAX_PAGES_PER_REQUEST", "500"))
+RANKING_DEADLINE_SECONDS = float(os.getenv("RANKING_DEADLINE_SECONDS", "300"))
+
+# Queued + running background jobs before /rank/ answers 429
+MAX_PENDING_JOBS = int(os.getenv("MAX_PENDING_JOBS", "20"))
+
+# Allowed resume file extensions (other files are skipped, not counted)
+ALLOWED_EXTENSIONS = [".pdf", ".jpg", ".jpeg", ".png"]
+
+
+class AdmissionError(Exception):
+    """
+    A request over one of its budgets. `status` is the HTTP status
+    to answer with; `retry_after` (seconds) is set when retrying
+    later can succeed.
+    """
+
+    def __init__(self, message, status=413, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _size(n_bytes):
+    return f"{n_bytes / 1024 / 1024:.0f} MB"
+
+
+def is_allowed(file_name):
+    return os.path.splitext(file_name)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def check_content_length(request):
+    """
+    Refuse a request whose declared body is over the upload budget
+    (plus Django's allowance for the other form fields), before
+    anything reads it.
+    """
+    if not MAX_UPLOAD_BYTES:
+        return
+
+    try:
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        raise AdmissionError("Invalid Content-Length.", status=400)
+
+    limit = MAX_UPLOAD_BYTES + (settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0)
+    if content_length > limit:
+        raise AdmissionError(
+            f"Upload too large: {_size(content_length)}, "
+            f"at most {_size(MAX_UPLOAD_BYTES)} per request."
+        )
+
+
+class UploadBudgetHandler(FileUploadHandler):
+    """
+    Upload handler that stops reading the body once the uploaded
+    files pass MAX_UPLOAD_BYTES (covers requests without a
+    Content-Length). Raises AdmissionError from request.POST/FILES.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > MAX_UPLOAD_BYTES:
+            raise AdmissionError(
+                f"Upload too large: at most {_size(MAX_UPLOAD_BYTES)} per request."
+            )
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None  # the next handlers store the file
+
+
+def limit_upload(request):
+    """
+    Install UploadBudgetHandler; call before the body is read.
+    """
+    if MAX_UPLOAD_BYTES:
+        request.upload_handlers.insert(0, UploadBudgetHandler(request))
+
+
+def check_uploads(uploaded_files):
+    """
+    Count and total size of the resume files (allowed extensions),
+    before anything is saved.
+    """
+    resumes = [f for f in uploaded_files if is_allowed(f.name)]
+
+    if MAX_FILES_PER_REQUEST and len(resumes) > MAX_FILES_PER_REQUEST:
+        raise AdmissionError(
+            f"Too many resumes: {len(resumes)} uploaded, "
+            f"at most {MAX_FILES_PER_REQUEST} per request."
+        )
+
+    total_bytes = sum(f.size or 0 for f in resumes)
+    if MAX_UPLOAD_BYTES and total_bytes > MAX_UPLOAD_BYTES:
+        raise AdmissionError(
+            f"Upload too large: {_size(total_bytes)}, "
+            f"at most {_size(MAX_UPLOAD_BYTES)} per request."
+        )
+
+
+def check_pages(file_paths):
+    """
+    Total page count of the saved files.
+    """
+    if not MAX_PAGES_PER_REQUEST:
+        return
+
+    pages = 0
+    for file_path in file_paths:
+        pages += count_pages(file_path)
+        if pages > MAX_PAGES_PER_REQUEST:
+            raise AdmissionError(
+                f"Too many pages: more than {MAX_PAGES_PER_REQUEST} per request."
+            )
+
+
+def check_job_queue(retry_after):
+    """
+    Refuse new background jobs while MAX_PENDING_JOBS are queued
+    or running. Stale running jobs are failed first so they do not
+    hold the queue full.
+    """
+    from core.services.job_service import fail_stale_jobs  # imports this module
+
+    if not MAX_PENDING_JOBS:
+        return
+
+    fail_stale_jobs()
+
+    pending = RankingJob.objects.filter(
+        status__in=[RankingJob.STATUS_QUEUED, RankingJob.STATUS_RUNNING]
+    ).count()
+
+    if pending >= MAX_PENDING_JOBS:
+        raise AdmissionError(
+            "Too many ranking requests, try again later.",
+            status=429,
+            retry_after=retry_after
+        )
+
+
+class Deadline:
+    """
+    Time budget of one pipeline run. Stages check expired() between
+    units of work and give_up() on the files they have no time for.
+    """
+
+    def __init__(self, seconds=RANKING_DEADLINE_SECONDS):
+        self.expires_at = time.monotonic() + seconds if seconds else None
+        self._unprocessed = {}  # input index -> file path
+
+    def remaining(self):
+        """
+        Seconds left, or None without a deadline.
+        """
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def give_up(self, index, file_path):
+        self._unprocessed[index] = file_path
+
+    @property
+    def unprocessed(self):
+        """
+        Files given up on, in input order.
+        """
+        return [path for _, path in sorted(self._unprocessed.items())]
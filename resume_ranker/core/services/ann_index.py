@@ -0,0 +1,395 @@
+"""
+ann_index.py
+
+Approximate nearest-neighbour index (IVF) over stored resume
+embeddings. Vectors are bucketed by a k-means coarse quantizer;
+a query only scans the buckets whose centroids are closest to it.
+
+The index lives in a single .npz file, tagged with the embedding
+model its vectors came from. Syncing happens offline (build_ann_index,
+the ranking worker): new and re-embedded resumes are upserted, deleted
+ones removed, the quantizer is retrained once the corpus has grown
+well past the size it was trained on, and everything is rebuilt when
+the embedding model changes. The ranking path only loads the file.
+"""
+
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+from core.services.cache_service import CACHE_DIR
+
+# --------------------------------------------------
+# Configuration
+# --------------------------------------------------
+ANN_INDEX_PATH = os.getenv(
+    "ANN_INDEX_PATH",
+    os.path.join(CACHE_DIR, "ann_index.npz")
+)
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "16"))  # buckets scanned per query
+ANN_MIN_TRAIN_SIZE = 256   # below this everything stays in one bucket
+ANN_RETRAIN_GROWTH = 2.0   # retrain once corpus doubles since training
+ANN_SYNC_INTERVAL = float(os.getenv("ANN_SYNC_INTERVAL", "60"))  # seconds, idle worker
+
+
+def default_n_lists(size):
+    """
+    Usual IVF rule of thumb: about sqrt(N) buckets.
+    """
+    if size < ANN_MIN_TRAIN_SIZE:
+        return 1
+    return int(min(max(np.sqrt(size), 1), 4096))
+
+
+class IVFIndex:
+    """
+    Inverted-file index of L2-normalized float32 vectors keyed by int ids.
+    Similarity is the dot product (cosine for normalized vectors).
+    """
+
+    def __init__(self, dim, model_id=""):
+        self.dim = int(dim)
+        self.model_id = model_id
+        self.synced_at = 0.0  # newest CandidateProfile.updated_at indexed (epoch seconds)
+        self.centroids = np.zeros((1, self.dim), dtype=np.float32)
+        self.trained_size = 0
+        self._set_rows(
+            np.zeros(0, dtype=np.int64),
+            np.zeros((0, self.dim), dtype=np.float32),
+            np.zeros(0, dtype=np.int32)
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def max_id(self):
+        return int(self.ids.max()) if len(self.ids) else 0
+
+    # --------------------------------------------------
+    # Building
+    # --------------------------------------------------
+    @staticmethod
+    def _normalize(vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-8)
+
+    def build(self, ids, vectors, n_lists=None):
+        """
+        (Re)train the coarse quantizer and index every vector.
+        """
+        vectors = self._normalize(vectors).reshape(-1, self.dim)
+        n_lists = n_lists or default_n_lists(len(vectors))
+
+        if n_lists > 1:
+            from sklearn.cluster import MiniBatchKMeans  # slow import, build only
+
+            kmeans = MiniBatchKMeans(
+                n_clusters=n_lists,
+                batch_size=max(1024, 4 * n_lists),
+                n_init=3,
+                random_state=0
+            ).fit(vectors)
+            self.centroids = self._normalize(kmeans.cluster_centers_)
+        else:
+            self.centroids = np.zeros((1, self.dim), dtype=np.float32)
+
+        self.trained_size = len(vectors)
+        self._set_rows(np.asarray(ids, dtype=np.int64), vectors, self._assign(vectors))
+
+    def add(self, ids, vectors):
+        """
+        Add vectors to their nearest existing bucket, retraining
+        when the corpus has outgrown the current quantizer.
+        Rows are appended into spare capacity (grown by doubling),
+        so adds do not copy the whole index each time.
+        """
+        vectors = self._normalize(vectors).reshape(-1, self.dim)
+        if not len(vectors):
+            return
+
+        size = len(self.ids)
+        new_size = size + len(vectors)
+
+        if self.needs_retrain(new_size):
+            self.build(
+                np.concatenate([self.ids, np.asarray(ids, dtype=np.int64)]),
+                np.vstack([self.vectors, vectors])
+            )
+            return
+
+        if new_size > len(self._id_rows):
+            capacity = max(new_size, 2 * len(self._id_rows))
+            self._id_rows = _grown(self._id_rows, size, capacity)
+            self._vector_rows = _grown(self._vector_rows, size, capacity)
+            self._assignment_rows = _grown(self._assignment_rows, size, capacity)
+
+        self._id_rows[size:new_size] = ids
+        self._vector_rows[size:new_size] = vectors
+        self._assignment_rows[size:new_size] = self._assign(vectors)
+        self._resize(new_size)
+
+    def remove(self, ids):
+        """
+        Drop the vectors of the given ids (if indexed).
+        """
+        keep = ~np.isin(self.ids, np.asarray(ids, dtype=np.int64))
+        if keep.all():
+            return
+
+        size = int(keep.sum())
+        self._id_rows[:size] = self.ids[keep]
+        self._vector_rows[:size] = self.vectors[keep]
+        self._assignment_rows[:size] = self.assignments[keep]
+        self._resize(size)
+
+    def upsert(self, ids, vectors):
+        """
+        add(), replacing the vectors of ids that are already indexed.
+        """
+        self.remove(ids)
+        self.add(ids, vectors)
+
+    def needs_retrain(self, size):
+        if size < ANN_MIN_TRAIN_SIZE:
+            return False
+        return size > ANN_RETRAIN_GROWTH * max(self.trained_size, ANN_MIN_TRAIN_SIZE / 2)
+
+    def _assign(self, vectors):
+        if len(self.centroids) == 1:
+            return np.zeros(len(vectors), dtype=np.int32)
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _set_rows(self, ids, vectors, assignments):
+        self._id_rows = ids
+        self._vector_rows = vectors
+        self._assignment_rows = assignments
+        self._resize(len(ids))
+
+    def _resize(self, size):
+        """
+        Expose the first `size` rows of the backing arrays.
+        """
+        self.ids = self._id_rows[:size]
+        self.vectors = self._vector_rows[:size]
+        self.assignments = self._assignment_rows[:size]
+        self._rebuild_buckets()
+
+    def _rebuild_buckets(self):
+        order = np.argsort(self.assignments, kind="stable")
+        bounds = np.searchsorted(
+            self.assignments[order],
+            np.arange(len(self.centroids) + 1)
+        )
+        self._buckets = [
+            order[bounds[c]:bounds[c + 1]]
+            for c in range(len(self.centroids))
+        ]
+
+    # --------------------------------------------------
+    # Search
+    # --------------------------------------------------
+    def search(self, query, k, nprobe=ANN_NPROBE):
+        """
+        Return (ids, similarities) of the approximate top-k vectors,
+        best first.
+        """
+        if not len(self.ids) or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        query = self._normalize(query).reshape(self.dim)
+
+        nprobe = min(max(int(nprobe), 1), len(self.centroids))
+        centroid_scores = self.centroids @ query
+        probed = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        rows = np.concatenate([self._buckets[c] for c in probed])
+        if not len(rows):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        scores = self.vectors[rows] @ query
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return self.ids[rows[top]], scores[top]
+
+    # --------------------------------------------------
+    # Persistence
+    # --------------------------------------------------
+    def save(self, path=ANN_INDEX_PATH):
+        """
+        Write to a uniquely named file next to `path` and rename it
+        into place, so concurrent savers never share a temp file and
+        readers see either the old or the new index.
+        """
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp.npz")
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    centroids=self.centroids,
+                    ids=self.ids,
+                    vectors=self.vectors,
+                    assignments=self.assignments,
+                    trained_size=np.int64(self.trained_size),
+                    model_id=np.str_(self.model_id),
+                    synced_at=np.float64(self.synced_at),
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path=ANN_INDEX_PATH):
+        with np.load(path) as data:
+            index = cls(data["centroids"].shape[1])
+            index.model_id = str(data["model_id"]) if "model_id" in data else ""
+            index.synced_at = float(data["synced_at"]) if "synced_at" in data else 0.0
+            index.centroids = data["centroids"]
+            index.trained_size = int(data["trained_size"])
+            index._set_rows(data["ids"], data["vectors"], data["assignments"])
+
+        return index
+
+
+def _grown(rows, size, capacity):
+    """
+    A copy of the first `size` rows with room for `capacity` rows.
+    """
+    grown = np.empty((capacity, *rows.shape[1:]), dtype=rows.dtype)
+    grown[:size] = rows[:size]
+    return grown
+
+
+# --------------------------------------------------
+# Corpus index (kept in sync with CandidateProfile rows)
+# --------------------------------------------------
+_corpus_index = None
+_corpus_index_mtime = None
+_corpus_index_lock = threading.Lock()       # guards the loaded copy
+_corpus_index_sync_lock = threading.Lock()  # one sync at a time per process
+
+
+def _indexed_rows(profiles):
+    """
+    (ids, vectors, newest updated_at) of a CandidateProfile queryset.
+    """
+    rows = list(profiles.order_by("pk").values_list("pk", "embedding", "updated_at"))
+    if not rows:
+        return [], None, 0.0
+
+    ids = [pk for pk, _, _ in rows]
+    vectors = np.vstack([
+        np.frombuffer(bytes(blob), dtype=np.float32)
+        for _, blob, _ in rows
+    ])
+    synced_at = max(updated_at.timestamp() for _, _, updated_at in rows)
+
+    return ids, vectors, synced_at
+
+
+def get_corpus_index():
+    """
+    Return the persisted corpus index for the ranking path, or None
+    when there is none for the current embedding model yet. The file
+    is reloaded when a sync replaces it; this never builds or syncs:
+    sync_corpus_index() does that offline.
+    """
+    from core.services.embedding_service import EMBEDDING_MODEL_ID
+
+    global _corpus_index, _corpus_index_mtime
+
+    try:
+        mtime = os.stat(ANN_INDEX_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    with _corpus_index_lock:
+        if _corpus_index is None or _corpus_index_mtime != mtime:
+            try:
+                _corpus_index = IVFIndex.load(ANN_INDEX_PATH)
+                _corpus_index_mtime = mtime
+            except Exception as e:
+                print("ANN index load error:", e)
+                _corpus_index = None
+
+        index = _corpus_index
+
+    if index is None or index.model_id != EMBEDDING_MODEL_ID:
+        return None
+    return index
+
+
+def sync_corpus_index(rebuild=False):
+    """
+    Bring the persisted index up to date with the stored profiles
+    and save it. Returns the index (None for an empty corpus).
+
+    Profiles not in the index yet are added, profiles updated since
+    the last sync (re-embedded) have their vectors replaced, and
+    profiles deleted (or no longer embedded with the current model)
+    are removed. The index is rebuilt when it was made with another
+    embedding model or vector size, or with rebuild.
+    """
+    from core.models import CandidateProfile
+    from core.services.embedding_service import EMBEDDING_MODEL_ID
+
+    with _corpus_index_sync_lock:
+        index = None
+        if not rebuild and os.path.exists(ANN_INDEX_PATH):
+            try:
+                index = IVFIndex.load(ANN_INDEX_PATH)  # own copy: readers keep theirs
+            except Exception as e:
+                print("ANN index load error:", e)
+
+        if index is not None and index.model_id != EMBEDDING_MODEL_ID:
+            print(f"ANN index is for {index.model_id or 'an unknown model'}, rebuilding")
+            index = None
+
+        profiles = CandidateProfile.objects.filter(embedding_model=EMBEDDING_MODEL_ID)
+        removed = []
+
+        if index is None:
+            ids, vectors, synced_at = _indexed_rows(profiles)
+        else:
+            # New rows, rows changed since the last sync, and rows gone
+            stored = np.fromiter(profiles.values_list("pk", flat=True), dtype=np.int64)
+            missing = np.setdiff1d(stored, index.ids)
+            removed = np.setdiff1d(index.ids, stored)
+
+            changed = profiles.filter(updated_at__gt=datetime.fromtimestamp(index.synced_at, tz=timezone.utc))
+            if len(missing):
+                changed = changed | profiles.filter(pk__in=missing.tolist())
+
+            ids, vectors, synced_at = _indexed_rows(changed)
+
+            if ids and vectors.shape[1] != index.dim:
+                print(f"ANN index has {index.dim}-d vectors, got {vectors.shape[1]}-d; rebuilding")
+                index = None
+                removed = []
+                ids, vectors, synced_at = _indexed_rows(profiles)
+
+        if not ids and not len(removed):
+            return index
+
+        if index is None:
+            index = IVFIndex(vectors.shape[1], EMBEDDING_MODEL_ID)
+            index.build(ids, vectors)
+        else:
+            index.remove(removed)
+            if ids:
+                index.upsert(ids, vectors)
+
+        index.synced_at = max(index.synced_at, synced_at)
+        index.save(ANN_INDEX_PATH)
+        return index
@@ -0,0 +1,92 @@
+"""
+batching.py
+
+Micro-batching helper: callers submit small lists of items from
+any thread; a single dispatcher thread merges them into batches
+of up to max_items (or whatever arrived within max_wait seconds)
+and runs one handler call per batch.
+"""
+
+import queue
+import threading
+import time
+
+
+class _Pending:
+    __slots__ = ("items", "result", "error", "done")
+
+    def __init__(self, items):
+        self.items = items
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class BatchDispatcher:
+    """
+    Merge concurrent submit() calls into shared handler batches.
+
+    handler(items) must return a sequence (list or array) with one
+    result per item, in order.
+    """
+
+    def __init__(self, handler, max_items=64, max_wait=0.01, name="batch-dispatcher"):
+        self.handler = handler
+        self.max_items = max(int(max_items), 1)
+        self.max_wait = max(float(max_wait), 0.0)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, items):
+        """
+        Run handler over items as part of a shared batch and
+        return this caller's slice of the results.
+        """
+        pending = _Pending(list(items))
+        if not pending.items:
+            return []
+
+        self._queue.put(pending)
+        pending.done.wait()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        count = len(batch[0].items)
+        deadline = time.monotonic() + self.max_wait
+
+        while count < self.max_items:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(pending)
+            count += len(pending.items)
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for pending in batch for item in pending.items]
+
+            try:
+                results = self.handler(items)
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+                    pending.done.set()
+                continue
+
+            offset = 0
+            for pending in batch:
+                pending.result = results[offset:offset + len(pending.items)]
+                offset += len(pending.items)
+                pending.done.set()
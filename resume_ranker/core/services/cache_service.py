@@ -0,0 +1,179 @@
+"""
+cache_service.py
+
+Small persistent key/value caches shared by the services.
+Entries live in a local SQLite file and are evicted
+least-recently-used first once the cache grows past its size budget.
+"""
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+# --------------------------------------------------
+# Default cache location (resume_ranker/cache)
+# --------------------------------------------------
+CACHE_DIR = os.getenv(
+    "RESUME_CACHE_DIR",
+    str(Path(__file__).resolve().parent.parent.parent / "cache")
+)
+
+
+class SQLiteLRUCache:
+    """
+    Size-bounded LRU cache of bytes values stored in SQLite.
+
+    A fresh connection is opened per operation, so one instance
+    can be shared between threads and processes safely.
+    """
+
+    def __init__(self, path, max_bytes):
+        self.path = str(path)
+        self.max_bytes = int(max_bytes)
+        self._initialized = False
+
+    # --------------------------------------------------
+    # Connection handling
+    # --------------------------------------------------
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=30)
+
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_last_access"
+                " ON entries (last_access)"
+            )
+            conn.commit()
+            self._initialized = True
+
+        return conn
+
+    # --------------------------------------------------
+    # Public API
+    # --------------------------------------------------
+    def get(self, key):
+        """
+        Return the cached bytes for key, or None on a miss.
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?",
+                (time.time(), key)
+            )
+            conn.commit()
+            return bytes(row[0])
+        finally:
+            conn.close()
+
+    def set(self, key, value):
+        """
+        Store bytes under key and evict old entries if over budget.
+        """
+        value = bytes(value)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time())
+            )
+            conn.commit()
+            self._evict(conn, self.max_bytes)
+        finally:
+            conn.close()
+
+    def evict(self, max_bytes=None):
+        """
+        Drop least recently used entries until the cache fits max_bytes.
+        Returns the number of removed entries.
+        """
+        conn = self._connect()
+        try:
+            return self._evict(
+                conn,
+                self.max_bytes if max_bytes is None else int(max_bytes)
+            )
+        finally:
+            conn.close()
+
+    def purge(self):
+        """
+        Remove every entry. Returns the number of removed entries.
+        """
+        conn = self._connect()
+        try:
+            removed = conn.execute("DELETE FROM entries").rowcount
+            conn.commit()
+            conn.execute("VACUUM")
+            return removed
+        finally:
+            conn.close()
+
+    def stats(self):
+        """
+        Summary of the cache contents.
+        """
+        conn = self._connect()
+        try:
+            entries, total_bytes, oldest, newest = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0),"
+                " MIN(last_access), MAX(last_access) FROM entries"
+            ).fetchone()
+        finally:
+            conn.close()
+
+        return {
+            "path": self.path,
+            "entries": entries,
+            "total_bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "oldest_access": oldest,
+            "newest_access": newest,
+        }
+
+    # --------------------------------------------------
+    # Helpers
+    # --------------------------------------------------
+    @staticmethod
+    def _evict(conn, max_bytes):
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+        if total <= max_bytes:
+            return 0
+
+        removed = 0
+        rows = conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        ).fetchall()
+
+        for key, size in rows:
+            if total <= max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+
+        conn.commit()
+        return removed
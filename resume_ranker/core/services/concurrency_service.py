@@ -0,0 +1,305 @@
+"""
+concurrency_service.py
+
+Shared, size-limited executors and a global limit on concurrent
+ranking runs for the streaming views.
+
+Pipeline runs execute on one bounded thread pool of
+RANKING_MAX_CONCURRENT threads. Inside a run, OCR goes to the shared
+OCR process pool and embedding to the model server (or the
+in-process model), so a node runs at most that many pipelines no
+matter how many requests are connected. Async requests beyond the
+limit wait up to RANKING_QUEUE_TIMEOUT seconds for a slot, at most
+RANKING_MAX_WAITING of them, and are rejected otherwise; sync
+requests are rejected right away.
+"""
+
+import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+
+# --------------------------------------------------
+# Configuration
+# --------------------------------------------------
+RANKING_MAX_CONCURRENT = int(os.getenv("RANKING_MAX_CONCURRENT", "2"))
+RANKING_MAX_WAITING = int(os.getenv("RANKING_MAX_WAITING", "16"))
+RANKING_QUEUE_TIMEOUT = float(os.getenv("RANKING_QUEUE_TIMEOUT", "30"))  # seconds
+RANKING_RETRY_AFTER = int(os.getenv("RANKING_RETRY_AFTER", "10"))  # seconds, sent on rejection
+UPLOAD_IO_THREADS = int(os.getenv("UPLOAD_IO_THREADS", "4"))
+
+_executor_lock = threading.Lock()
+_pipeline_executor = None
+_io_executor = None
+
+_DONE = object()
+
+
+class Overloaded(Exception):
+    """
+    No ranking slot became free in time (HTTP 429 unless `status`
+    says otherwise).
+    """
+
+    def __init__(self, message="Too many ranking requests, try again later.",
+                 retry_after=RANKING_RETRY_AFTER, status=429):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status = status
+
+
+# --------------------------------------------------
+# Executors
+# --------------------------------------------------
+def get_pipeline_executor() -> ThreadPoolExecutor:
+    """
+    Lazily create the thread pool that runs ranking pipelines.
+    """
+
+    global _pipeline_executor
+
+    if _pipeline_executor is None:
+        with _executor_lock:
+            if _pipeline_executor is None:
+                _pipeline_executor = ThreadPoolExecutor(
+                    max_workers=max(RANKING_MAX_CONCURRENT, 1),
+                    thread_name_prefix="ranking"
+                )
+
+    return _pipeline_executor
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """
+    Lazily create the thread pool for blocking upload I/O
+    (multipart parsing, saving files).
+    """
+
+    global _io_executor
+
+    if _io_executor is None:
+        with _executor_lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers=max(UPLOAD_IO_THREADS, 1),
+                    thread_name_prefix="upload-io"
+                )
+
+    return _io_executor
+
+
+async def run_io(func, *args):
+    """
+    Await func(*args) on the upload I/O pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), func, *args)
+
+
+# --------------------------------------------------
+# Concurrency limit
+# --------------------------------------------------
+class _Waiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ConcurrencyLimiter:
+    """
+    At most `limit` holders at once, shared by every thread and
+    event loop of the process. A release hands the slot straight
+    to the longest waiter (first come, first served).
+    """
+
+    def __init__(self, limit, max_waiting=RANKING_MAX_WAITING, timeout=RANKING_QUEUE_TIMEOUT):
+        self.limit = max(int(limit), 1)
+        self.max_waiting = max(int(max_waiting), 0)
+        self.timeout = max(float(timeout), 0.0)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = deque()
+
+    @property
+    def active(self):
+        return self._active
+
+    @property
+    def waiting(self):
+        return len(self._waiters)
+
+    def try_acquire(self):
+        """
+        Take a slot if one is free right now (sync views, which
+        should not block a server thread waiting).
+        """
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return True
+            return False
+
+    async def acquire(self):
+        """
+        Take a slot, waiting up to `timeout` seconds for one.
+        Raises Overloaded when none is free in time or too many
+        requests are already waiting.
+        """
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return
+            if not self.timeout or len(self._waiters) >= self.max_waiting:
+                raise Overloaded()
+
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+
+            if isinstance(e, asyncio.CancelledError):
+                if granted:
+                    self.release()
+                raise
+            if not granted:
+                raise Overloaded() from None
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True  # the slot moves over, _active unchanged
+                try:
+                    waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+                    return
+                except RuntimeError:
+                    continue  # its event loop is gone
+            self._active -= 1
+
+
+ranking_limiter = ConcurrencyLimiter(RANKING_MAX_CONCURRENT)
+
+
+# --------------------------------------------------
+# Sync iterators on an executor
+# --------------------------------------------------
+class _Failed:
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+class ExecutorStream:
+    """
+    Async iterator over a sync iterator that runs on an executor
+    thread, for StreamingHttpResponse under ASGI.
+
+    make_iterator() is called and fully iterated on one executor
+    thread (Django database connections are per thread). close(),
+    which Django calls when the response ends, stops the producer
+    at its next item. on_close runs once the producer is done, or
+    right away if it never started.
+    """
+
+    def __init__(self, make_iterator, executor=None, on_close=None):
+        self._loop = asyncio.get_running_loop()
+        self._items = asyncio.Queue()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._on_close = on_close
+        self._future = (executor or get_pipeline_executor()).submit(
+            self._produce, make_iterator
+        )
+
+    def _send(self, item):
+        try:
+            self._loop.call_soon_threadsafe(self._items.put_nowait, item)
+        except RuntimeError:
+            self._stop.set()  # event loop closed: nobody is listening
+
+    def _produce(self, make_iterator):
+        iterator = None
+        try:
+            close_old_connections()
+            iterator = iter(make_iterator())
+            for item in iterator:
+                if self._stop.is_set():
+                    break
+                self._send(item)
+        except Exception as e:
+            self._send(_Failed(e))
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+            close_old_connections()
+            self._finish()
+            self._send(_DONE)
+
+    def _finish(self):
+        with self._lock:
+            on_close, self._on_close = self._on_close, None
+        if on_close is not None:
+            on_close()
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        try:
+            while True:
+                item = await self._items.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failed):
+                    raise item.error
+                yield item
+        finally:
+            self._stop.set()
+
+    def close(self):
+        self._stop.set()
+        if self._future.cancel():
+            self._finish()
+
+
+class ClosingIterator:
+    """
+    Sync iterator for StreamingHttpResponse that runs on_close once
+    when Django closes the response, even if it was never iterated
+    (a generator's finally would not run then).
+    """
+
+    def __init__(self, iterator, on_close):
+        self._iterator = iterator
+        self._lock = threading.Lock()
+        self._on_close = on_close
+
+    def __iter__(self):
+        return iter(self._iterator)
+
+    def close(self):
+        if hasattr(self._iterator, "close"):
+            self._iterator.close()
+
+        with self._lock:
+            on_close, self._on_close = self._on_close, None
+        if on_close is not None:
+            on_close()
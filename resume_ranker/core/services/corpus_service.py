@@ -0,0 +1,468 @@
+"""
+corpus_service.py
+
+Stores per-resume features (cleaned text, contact info,
+extract_info() output and embedding) once per file content,
+so a resume is only OCR'd, parsed and embedded the first time
+it is seen.
+"""
+
+import contextvars
+import os
+import queue
+import threading
+import time
+
+from django.utils import timezone
+
+from core.models import CandidateProfile
+from core.services.metrics_service import span
+from core.services.ocr_service import OCR_POOL_WORKERS, extract_text_from_file, file_sha256
+from core.services.cleaning_service import clean_text
+from core.services.regex_service import (
+    extract_primary_email,
+    extract_phone_numbers,
+)
+from core.services.genai_service import extract_info, extract_info_many
+from core.services.embedding_service import EMBEDDING_MODEL_ID, embed_documents
+
+# --------------------------------------------------
+# Staged ingestion: OCR threads (pages and images go to the OCR
+# process pool) → cleaning thread → batches for NLP + embedding,
+# connected by bounded queues
+# --------------------------------------------------
+PIPELINE_OCR_THREADS = int(
+    os.getenv("PIPELINE_OCR_THREADS", str(max(OCR_POOL_WORKERS, 1)))
+)
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "32"))
+PIPELINE_BATCH_SIZE = int(os.getenv("PIPELINE_BATCH_SIZE", "32"))
+PIPELINE_BATCH_WAIT = float(os.getenv("PIPELINE_BATCH_WAIT", "0.5"))  # seconds
+
+# Bump whenever cleaning, contact or NLP extraction changes so
+# stored profiles are extracted again
+FEATURES_VERSION = 1
+
+_DONE = object()
+
+
+def _profile_from_text(file_path, content_hash, raw_text, pk=None):
+    """
+    Cleaning and contact extraction for one file's OCR text.
+    Returns a CandidateProfile with NLP info still missing (unsaved,
+    or replacing stored row `pk`), or None if no text was found.
+    """
+
+    if not raw_text:
+        return None
+
+    # ---------------- Cleaning ----------------
+    with span("clean_text"):
+        cleaned_text = clean_text(raw_text)
+    if not cleaned_text:
+        return None
+
+    # ---------------- Contact Info ----------------
+    email = extract_primary_email(cleaned_text)
+    phones = extract_phone_numbers(cleaned_text)
+
+    return CandidateProfile(
+        pk=pk,
+        content_hash=content_hash,
+        file_path=str(file_path),
+        cleaned_text=cleaned_text,
+        email=email,
+        phone_numbers=phones,
+    )
+
+
+def _extract_info_batch(profiles):
+    """
+    Fill in extract_info() output for new profiles with one batched
+    spaCy pass. If the batch fails, fall back to one text at a time
+    and drop only the profiles that still fail.
+    """
+
+    try:
+        infos = extract_info_many([p.cleaned_text for p in profiles])
+        for profile, info in zip(profiles, infos):
+            profile.info = info
+        return profiles
+
+    except Exception as e:
+        print("[NLP batch failed] →", e)
+
+    extracted = []
+    for profile in profiles:
+        try:
+            profile.info = extract_info(profile.cleaned_text)
+            extracted.append(profile)
+        except Exception as e:
+            print(f"[Resume skipped] {profile.file_path} → {e}")
+
+    return extracted
+
+
+def ingest_files(file_paths, progress_callback=None, deadline=None):
+    """
+    Return a CandidateProfile for every readable resume in file_paths,
+    in input order.
+
+    Known files (same content hash) are loaded from the database;
+    new files go through the full extraction pipeline. Duplicate
+    uploads map to the same profile once.
+
+    progress_callback(done, total), if given, is called after
+    each file has been read and cleaned. With a deadline
+    (admission_service.Deadline), files left when it expires are
+    given up on.
+    """
+
+    indexed = [
+        pair
+        for batch in ingest_files_staged(file_paths, progress_callback, deadline)
+        for pair in batch
+    ]
+
+    indexed.sort(key=lambda pair: pair[0])
+    return [profile for _, profile in indexed]
+
+
+def ingest_files_staged(file_paths, progress_callback=None, deadline=None):
+    """
+    ingest_files() one batch at a time: yields lists of
+    (input index, completed profile) pairs. Files are read by the
+    staged reader (read_files_staged) and NLP extraction and
+    embedding run on its batches while later files are still being
+    OCR'd.
+    """
+
+    for batch in read_files_staged(file_paths, progress_callback, deadline=deadline):
+        if deadline is not None and deadline.expired():
+            for index, _ in batch:
+                deadline.give_up(index, file_paths[index])
+            continue
+
+        index_of = {id(profile): index for index, profile in batch}
+        completed = _complete_batch([profile for _, profile in batch])
+        yield [(index_of[id(profile)], profile) for profile in completed]
+
+
+def read_files(file_paths, progress_callback=None, deadline=None):
+    """
+    First, cheap half of ingest_files(): one profile per distinct
+    readable file, in input order. Known files come from the
+    database; new files are OCR'd and cleaned into unsaved profiles
+    without NLP info or embedding (see complete_profiles()).
+    """
+
+    return [
+        profile
+        for _, profile in read_files_indexed(file_paths, progress_callback, deadline)
+    ]
+
+
+def read_files_indexed(file_paths, progress_callback=None, deadline=None):
+    """
+    read_files() as (input index, profile) pairs.
+    """
+
+    indexed = [
+        pair
+        for batch in read_files_staged(file_paths, progress_callback, deadline=deadline)
+        for pair in batch
+    ]
+
+    indexed.sort(key=lambda pair: pair[0])
+    return indexed
+
+
+def read_files_staged(file_paths, progress_callback=None, batch_size=PIPELINE_BATCH_SIZE,
+                      max_wait=PIPELINE_BATCH_WAIT, deadline=None):
+    """
+    Read files through the staged pipeline and yield batches of
+    (input index, profile) pairs as they become ready: known profiles
+    first, then new ones once batch_size of them are cleaned or
+    max_wait seconds after the first one of a batch arrived. Known
+    profiles extracted with an older FEATURES_VERSION are read again
+    like new files.
+
+    PIPELINE_OCR_THREADS threads run OCR (the heavy work happens on
+    the OCR process pool) and one thread cleans, so a slow stage
+    only holds back the stages behind it through the bounded queues.
+    All database work stays on the calling thread.
+
+    Once the deadline expires no new file is started and files still
+    being read are given up on, without waiting for their OCR.
+    """
+
+    total = len(file_paths)
+    done = 0
+
+    def report():
+        if progress_callback:
+            progress_callback(done, total)
+
+    # ---------------- Hash every file, load known profiles ----------------
+    hashes = []
+    for file_path in file_paths:
+        try:
+            hashes.append(file_sha256(file_path))
+        except OSError as e:
+            print(f"[Resume skipped] {file_path} → {e}")
+            hashes.append(None)
+
+    known = CandidateProfile.objects.in_bulk(
+        [h for h in hashes if h],
+        field_name="content_hash"
+    )
+
+    known_batch = []
+    work = queue.Queue()
+    pending = set()  # input indices of files being read
+    seen = set()
+
+    for index, (file_path, content_hash) in enumerate(zip(file_paths, hashes)):
+        if content_hash is not None and content_hash not in seen:
+            seen.add(content_hash)
+            stored = known.get(content_hash)
+            if stored is None or stored.features_version != FEATURES_VERSION:
+                work.put((index, file_path, content_hash, stored and stored.pk))
+                pending.add(index)
+                continue
+            known_batch.append((index, stored))
+
+        # Known, duplicate or unreadable: nothing left to do
+        done += 1
+        report()
+
+    if known_batch:
+        yield known_batch
+
+    if work.empty():
+        return
+
+    # ---------------- OCR → clean stages ----------------
+    raw_queue = queue.Queue(PIPELINE_QUEUE_SIZE)
+    clean_queue = queue.Queue(PIPELINE_QUEUE_SIZE)
+    stop = threading.Event()
+    ocr_threads = max(min(PIPELINE_OCR_THREADS, work.qsize()), 1)
+
+    def put(target, item):
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def ocr_stage():
+        while not stop.is_set():
+            if deadline is not None and deadline.expired():
+                break
+            try:
+                index, file_path, content_hash, pk = work.get_nowait()
+            except queue.Empty:
+                break
+
+            try:
+                raw_text = extract_text_from_file(file_path, digest=content_hash)
+            except Exception as e:
+                # One resume failure should NOT stop the pipeline
+                print(f"[Resume skipped] {file_path} → {e}")
+                raw_text = ""
+
+            put(raw_queue, (index, file_path, content_hash, pk, raw_text))
+        put(raw_queue, _DONE)
+
+    def clean_stage():
+        finished = 0
+        while finished < ocr_threads and not stop.is_set():
+            try:
+                item = raw_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                finished += 1
+                continue
+
+            index, file_path, content_hash, pk, raw_text = item
+            try:
+                profile = _profile_from_text(file_path, content_hash, raw_text, pk)
+            except Exception as e:
+                print(f"[Resume skipped] {file_path} → {e}")
+                profile = None
+
+            put(clean_queue, (index, profile))
+        put(clean_queue, _DONE)
+
+    # Threads share the caller's context, so their spans join its trace
+    threads = [
+        threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(ocr_stage,),
+            name=f"ingest-ocr-{i}",
+            daemon=True
+        )
+        for i in range(ocr_threads)
+    ]
+    threads.append(threading.Thread(
+        target=contextvars.copy_context().run,
+        args=(clean_stage,),
+        name="ingest-clean",
+        daemon=True
+    ))
+    for thread in threads:
+        thread.start()
+
+    # ---------------- Batching (calling thread) ----------------
+    batch = []
+    flush_at = None
+
+    def wait_time():
+        waits = []
+        if batch:
+            waits.append(max(flush_at - time.monotonic(), 0))
+        if deadline is not None and deadline.remaining() is not None:
+            waits.append(deadline.remaining())
+        return min(waits) if waits else None
+
+    try:
+        while True:
+            try:
+                item = clean_queue.get(timeout=wait_time())
+            except queue.Empty:
+                if deadline is not None and deadline.expired():
+                    break
+                if batch:
+                    yield batch
+                    batch = []
+                continue
+
+            if item is _DONE:
+                break
+
+            done += 1
+            report()
+
+            index, profile = item
+            pending.discard(index)
+            if profile is not None:
+                batch.append((index, profile))
+                if len(batch) == 1:
+                    flush_at = time.monotonic() + max_wait
+
+            if deadline is not None and deadline.expired():
+                break
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if deadline is not None and deadline.expired():
+            # Out of time: give up on what is still being read
+            # or has not reached NLP + embedding yet
+            for index in [*pending, *(index for index, _ in batch)]:
+                deadline.give_up(index, file_paths[index])
+            return
+
+        if batch:
+            yield batch
+
+    finally:
+        stop.set()
+
+
+def _complete_batch(profiles):
+    """
+    complete_profiles() for one batch; if the batch as a whole fails,
+    retry profile by profile so only the failing resumes are lost.
+    """
+
+    try:
+        return complete_profiles(profiles)
+    except Exception as e:
+        print("[Batch failed] →", e)
+
+    completed = []
+    for profile in profiles:
+        try:
+            completed += complete_profiles([profile])
+        except Exception as e:
+            print(f"[Resume skipped] {profile.file_path} → {e}")
+
+    return completed
+
+
+def complete_profiles(profiles):
+    """
+    Second half of ingest_files(): batch NLP extraction and embedding
+    for the profiles from read_files() that are new or were extracted
+    with an older FEATURES_VERSION, re-embedding of stored ones whose
+    vector came from another embedding model, and saving.
+    Profiles whose NLP extraction fails are dropped; order is kept.
+
+    A profile whose embedding fails keeps a zero vector for this
+    ranking but is stored without an embedding model, so it is
+    embedded again the next time it is seen.
+    """
+
+    to_extract = [
+        profile for profile in profiles
+        if profile.pk is None or profile.features_version != FEATURES_VERSION
+    ]
+    stale_profiles = [
+        # Stored with another embedding model/backend (or none) - only re-embed
+        profile for profile in profiles
+        if profile.pk is not None
+        and profile.features_version == FEATURES_VERSION
+        and profile.embedding_model != EMBEDDING_MODEL_ID
+    ]
+
+    # ---------------- NLP extraction in one batch ----------------
+    with span("nlp"):
+        extracted = _extract_info_batch(to_extract)
+    failed = {id(profile) for profile in to_extract} - {id(profile) for profile in extracted}
+
+    for profile in extracted:
+        profile.features_version = FEATURES_VERSION
+
+    # ---------------- Embed everything new in batches ----------------
+    to_embed = extracted + stale_profiles
+    with span("embedding"):
+        vectors = embed_documents([profile.cleaned_text for profile in to_embed])
+
+    now = timezone.now()
+    for profile, vector in zip(to_embed, vectors):
+        profile.embedding = vector.tobytes()
+        # A zero vector is the encoding-failure fallback: leave it untagged
+        profile.embedding_model = EMBEDDING_MODEL_ID if vector.any() else ""
+        profile.updated_at = now  # bulk_update() skips auto_now; the ANN index syncs on it
+
+    new_profiles = [profile for profile in extracted if profile.pk is None]
+    reextracted = [profile for profile in extracted if profile.pk is not None]
+    stale_profiles = [
+        # Nothing to save when re-embedding failed again
+        profile for profile in stale_profiles if profile.embedding_model
+    ]
+
+    with span("db_save"):
+        if new_profiles:
+            # Another request may have stored the same file meanwhile
+            CandidateProfile.objects.bulk_create(
+                new_profiles,
+                ignore_conflicts=True
+            )
+        if reextracted:
+            CandidateProfile.objects.bulk_update(
+                reextracted,
+                [
+                    "file_path", "cleaned_text", "email", "phone_numbers", "info",
+                    "features_version", "embedding", "embedding_model", "updated_at",
+                ]
+            )
+        if stale_profiles:
+            CandidateProfile.objects.bulk_update(
+                stale_profiles,
+                ["embedding", "embedding_model", "updated_at"]
+            )
+
+    return [profile for profile in profiles if id(profile) not in failed]
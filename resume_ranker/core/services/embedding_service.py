@@ -1,16 +1,93 @@
-from sentence_transformers import SentenceTransformer
+from collections import OrderedDict
+import hashlib
+import os
+import threading
 import numpy as np
 
+from core.services import model_client
+from core.services.cache_service import CACHE_DIR, SQLiteLRUCache
+
 # --------------------------------------------------
-# Load model once (IMPORTANT for performance)
+# Model is loaded once, on first use (see get_model)
 # --------------------------------------------------
 MODEL_NAME = "all-MiniLM-L6-v2"
-_model = SentenceTransformer(MODEL_NAME)
+_model = None
+_model_lock = threading.Lock()
+_dimension = None
+
+# --------------------------------------------------
+# Inference backend: "torch" (SentenceTransformer), "onnx" or
+# "onnx-int8" (ONNX Runtime, exported once and cached locally)
+# --------------------------------------------------
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+_onnx_encoder = None
+_onnx_lock = threading.Lock()
 
 # --------------------------------------------------
 # Configuration
 # --------------------------------------------------
-MAX_TEXT_LENGTH = 5000  # characters (safe for OCR resumes)
+MAX_TEXT_LENGTH = 5000  # characters, cut before tokenizing
+DEFAULT_BATCH_SIZE = 32  # texts per encode() call
+
+# The model only sees MAX_SEQ_TOKENS word pieces ([CLS] and [SEP] included)
+MAX_SEQ_TOKENS = int(os.getenv("EMBEDDING_MAX_TOKENS", "256"))
+TOKEN_BUDGET = MAX_SEQ_TOKENS - 2
+
+# --------------------------------------------------
+# Resume vectors: "single" embeds the first TOKEN_BUDGET tokens,
+# "chunked" embeds up to EMBEDDING_MAX_CHUNKS token windows and
+# pools them ("mean" or "max") into one vector
+# --------------------------------------------------
+EMBEDDING_MODE = os.getenv("EMBEDDING_MODE", "single")
+CHUNK_POOLING = os.getenv("EMBEDDING_CHUNK_POOLING", "mean")
+CHUNK_OVERLAP_TOKENS = int(os.getenv("EMBEDDING_CHUNK_OVERLAP", "32"))
+MAX_CHUNKS = int(os.getenv("EMBEDDING_MAX_CHUNKS", "8"))
+
+_tokenizer = None
+_tokenizer_retry = False  # failed before the model was loaded
+_tokenizer_lock = threading.Lock()
+
+# Identifies the encoder - cache keys are only reused for the same
+# model *and* backend
+ENCODER_ID = (
+    MODEL_NAME if EMBEDDING_BACKEND == "torch"
+    else f"{MODEL_NAME}@{EMBEDDING_BACKEND}"
+)
+
+# Identifies stored resume vectors, which also depend on chunking
+EMBEDDING_MODEL_ID = (
+    ENCODER_ID if EMBEDDING_MODE != "chunked"
+    else f"{ENCODER_ID}+chunked-{CHUNK_POOLING}"
+)
+
+# --------------------------------------------------
+# Embedding cache (in-process LRU + on-disk SQLite tier)
+# --------------------------------------------------
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") != "0"
+EMBEDDING_MEMORY_CACHE_SIZE = int(
+    os.getenv("EMBEDDING_MEMORY_CACHE_SIZE", "4096")
+)  # vectors
+EMBEDDING_DISK_CACHE_MAX_BYTES = int(
+    os.getenv("EMBEDDING_DISK_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+)
+
+_memory_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+disk_cache = SQLiteLRUCache(
+    os.path.join(CACHE_DIR, "embedding_cache.sqlite3"),
+    EMBEDDING_DISK_CACHE_MAX_BYTES
+)
+
+
+def _clip_text(text: str, max_length: int) -> str:
+    if not text or not isinstance(text, str):
+        return ""
+
+    return text.strip()[:max_length]
 
 
 def _prepare_text(text: str) -> str:
@@ -18,19 +95,362 @@ def _prepare_text(text: str) -> str:
     Prepare text safely for embedding.
 
     - Ensures valid string
-    - Truncates very long OCR text
+    - Truncates to what the model actually reads (TOKEN_BUDGET tokens),
+      so nothing past that is tokenized again or changes the cache key
     """
 
-    if not text or not isinstance(text, str):
-        return ""
+    # Cheap character cut first (keeps start which usually has skills & summary)
+    text = _clip_text(text, MAX_TEXT_LENGTH)
+
+    return truncate_to_tokens(text)
+
+
+def _zero_vector() -> np.ndarray:
+    return np.zeros(
+        embedding_dimension(),
+        dtype=np.float32
+    )
+
+
+# --------------------------------------------------
+# Lazy model loading
+# --------------------------------------------------
+def get_model():
+    """
+    Return the SentenceTransformer, loading it on first use.
+    Thread-safe: concurrent first calls load the model only once.
+    """
+    global _model
+
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(MODEL_NAME)
+
+    return _model
+
+
+def get_onnx_encoder(backend=None):
+    """
+    Return the ONNX Runtime encoder, exporting the model on first use.
+    Passing a backend other than the configured one builds a fresh
+    encoder (used by benchmarks) instead of the shared instance.
+    """
+    global _onnx_encoder
+    from core.services.onnx_backend import OnnxEncoder, ensure_exported
+
+    backend = backend or EMBEDDING_BACKEND
+    quantized = backend == "onnx-int8"
+
+    def load_fresh():
+        out_dir = ensure_exported(MODEL_NAME, get_model, quantized)
+        return OnnxEncoder(out_dir, quantized=quantized)
+
+    if backend != EMBEDDING_BACKEND:
+        return load_fresh()
+
+    if _onnx_encoder is None:
+        with _onnx_lock:
+            if _onnx_encoder is None:
+                _onnx_encoder = load_fresh()
+
+    return _onnx_encoder
+
+
+def get_tokenizer():
+    """
+    Return the model's fast tokenizer without truncation or padding,
+    used to count tokens and cut text at token boundaries.
+    None if it cannot be loaded (text is then cut by characters only);
+    tried again once the model itself has been loaded.
+    """
+    global _tokenizer, _tokenizer_retry
+
+    def should_load():
+        return _tokenizer is None or (_tokenizer_retry and is_model_loaded())
+
+    if should_load():
+        with _tokenizer_lock:
+            if should_load():
+                _tokenizer_retry = not is_model_loaded()
+                try:
+                    tokenizer = _load_tokenizer()
+                    tokenizer.no_truncation()
+                    tokenizer.no_padding()
+                    _tokenizer = tokenizer
+                    _tokenizer_retry = False
+                except Exception as e:
+                    print("Tokenizer load error:", e)
+                    _tokenizer = False
+
+    return _tokenizer or None
+
+
+def _load_tokenizer():
+    """
+    The fast tokenizer alone, never the full model and never the
+    network: tokenizer.json from the local Hugging Face cache or the
+    ONNX export, else a copy from the model already loaded in this
+    process or from the model server.
+    """
+    from tokenizers import Tokenizer
+
+    from core.services.onnx_backend import model_dir
+
+    repo = MODEL_NAME if "/" in MODEL_NAME else f"sentence-transformers/{MODEL_NAME}"
+    try:
+        from huggingface_hub import hf_hub_download
+
+        return Tokenizer.from_file(
+            hf_hub_download(repo, "tokenizer.json", local_files_only=True)
+        )
+    except Exception:
+        pass
+
+    exported = os.path.join(model_dir(MODEL_NAME), "tokenizer.json")
+    if os.path.exists(exported):
+        return Tokenizer.from_file(exported)
+
+    # Copies: the encoders' own tokenizers truncate and pad
+    if EMBEDDING_BACKEND == "torch" and _model is not None:
+        return Tokenizer.from_str(_model.tokenizer.backend_tokenizer.to_str())
+    if EMBEDDING_BACKEND != "torch" and _onnx_encoder is not None:
+        return Tokenizer.from_str(_onnx_encoder.tokenizer.to_str())
+
+    served = model_client.tokenizer(ENCODER_ID)
+    if served is not None:
+        return Tokenizer.from_str(served)
+
+    raise RuntimeError(f"no local tokenizer.json for {repo}")
+
+
+def is_model_loaded() -> bool:
+    if EMBEDDING_BACKEND == "torch":
+        return _model is not None
+    return _onnx_encoder is not None
+
+
+def embedding_dimension() -> int:
+    """
+    Vector size, asked from the model server when one is running so
+    this process does not have to load the model just to know it.
+    """
+    global _dimension
+
+    if _dimension is None:
+        if not is_model_loaded():
+            _dimension = model_client.embedding_dimension(ENCODER_ID)
+        if _dimension is None:
+            if EMBEDDING_BACKEND == "torch":
+                _dimension = get_model().get_sentence_embedding_dimension()
+            else:
+                _dimension = get_onnx_encoder().dimension
+
+    return _dimension
+
+
+# --------------------------------------------------
+# Token-bounded truncation and chunking
+# --------------------------------------------------
+def _token_offsets(text: str):
+    """
+    (start, end) character span of every token, or None without a tokenizer.
+    """
+
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return None
+
+    return tokenizer.encode(text, add_special_tokens=False).offsets
+
+
+def _word_start(offsets, index: int, lower: int) -> int:
+    """
+    Move index back (not below lower) to a token that starts a word,
+    so cuts do not split a word into its word pieces.
+    """
+
+    i = index
+    while i > lower and offsets[i][0] == offsets[i - 1][1]:
+        i -= 1
+
+    return i if i > lower else index
+
+
+def truncate_to_tokens(text: str, max_tokens: int = TOKEN_BUDGET) -> str:
+    """
+    Cut text after its first max_tokens tokens.
+    """
+
+    if not text:
+        return text
+
+    offsets = _token_offsets(text)
+    if offsets is None or len(offsets) <= max_tokens:
+        return text
+
+    end = _word_start(offsets, max_tokens, 0)
+    return text[:offsets[end - 1][1]]
+
+
+def chunk_text(text: str, max_tokens: int = TOKEN_BUDGET,
+               overlap: int = CHUNK_OVERLAP_TOKENS,
+               max_chunks: int = MAX_CHUNKS) -> list:
+    """
+    Split text into at most max_chunks windows of max_tokens tokens,
+    consecutive windows sharing about `overlap` tokens.
+    """
+
+    text = _clip_text(text, MAX_TEXT_LENGTH * max_chunks)
+    if not text:
+        return []
+
+    offsets = _token_offsets(text)
+    if offsets is None:
+        return [text[:MAX_TEXT_LENGTH]]
+
+    chunks = []
+    start = 0
+    n_tokens = len(offsets)
+
+    while start < n_tokens and len(chunks) < max_chunks:
+        end = min(start + max_tokens, n_tokens)
+        if end < n_tokens:
+            end = _word_start(offsets, end, start)
+
+        chunks.append(text[offsets[start][0]:offsets[end - 1][1]])
+        if end == n_tokens:
+            break
+
+        next_start = _word_start(offsets, max(end - overlap, start + 1), start)
+        start = next_start if next_start > start else end
+
+    return chunks
+
+
+def pool_vectors(vectors: np.ndarray, pooling: str = CHUNK_POOLING) -> np.ndarray:
+    """
+    Pool chunk vectors (rows) into one normalized vector.
+    """
+
+    pooled = vectors.max(axis=0) if pooling == "max" else vectors.mean(axis=0)
+    norm = np.linalg.norm(pooled)
+
+    return pooled / norm if norm > 0 else pooled
+
+
+# --------------------------------------------------
+# Cache helpers
+# --------------------------------------------------
+def _cache_key(prepared_text: str) -> str:
+    return hashlib.sha256(
+        f"{ENCODER_ID}\0{prepared_text}".encode("utf-8")
+    ).hexdigest()
+
+
+def _cache_get(key: str):
+    with _cache_lock:
+        vector = _memory_cache.get(key)
+        if vector is not None:
+            _memory_cache.move_to_end(key)
+            _cache_counters["memory_hits"] += 1
+            return vector
+
+    try:
+        blob = disk_cache.get(key)
+    except Exception as e:
+        print("Embedding cache error:", e)
+        blob = None
+
+    with _cache_lock:
+        if blob is None:
+            _cache_counters["misses"] += 1
+            return None
+        _cache_counters["disk_hits"] += 1
+
+    vector = np.frombuffer(blob, dtype=np.float32).copy()
+    _memory_put(key, vector)
+    return vector
+
+
+def _memory_put(key: str, vector: np.ndarray):
+    with _cache_lock:
+        _memory_cache[key] = vector
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > EMBEDDING_MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _cache_put(key: str, vector: np.ndarray):
+    vector = np.array(vector, dtype=np.float32)  # own copy, not a view
+    _memory_put(key, vector)
+
+    try:
+        disk_cache.set(key, vector.tobytes())
+    except Exception as e:
+        print("Embedding cache error:", e)
+
+
+def cache_stats() -> dict:
+    """
+    Hit/miss counters for this process plus memory-tier size.
+    """
+    with _cache_lock:
+        stats = dict(_cache_counters)
+        stats["memory_entries"] = len(_memory_cache)
+
+    lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+    stats["hit_rate"] = (
+        (stats["memory_hits"] + stats["disk_hits"]) / lookups
+        if lookups else 0.0
+    )
+    return stats
+
+
+# --------------------------------------------------
+# Encoding
+# --------------------------------------------------
+def _encode(texts: list) -> np.ndarray:
+    """
+    Encode already prepared, non-empty texts in a single model call,
+    on the shared model server when it is running the same encoder.
+    """
+
+    vectors = model_client.encode(texts, ENCODER_ID)
+    if vectors is not None:
+        return vectors
+
+    return encode_local(texts)
 
-    text = text.strip()
 
-    # Truncate extremely long text (keeps start which usually has skills & summary)
-    if len(text) > MAX_TEXT_LENGTH:
-        text = text[:MAX_TEXT_LENGTH]
+def encode_local(texts: list) -> np.ndarray:
+    """
+    Encode prepared texts with the in-process model on the
+    configured backend.
+    """
+
+    if EMBEDDING_BACKEND != "torch":
+        return get_onnx_encoder().encode(texts)
+
+    return get_model().encode(
+        texts,
+        batch_size=len(texts),
+        convert_to_numpy=True,
+        normalize_embeddings=True
+    )
+
+
+def _encode_one(prepared_text: str) -> np.ndarray:
+    """
+    Encode one prepared text, falling back to a zero vector on failure.
+    """
 
-    return text
+    try:
+        return _encode([prepared_text])[0]
+    except Exception as e:
+        print("Embedding error:", e)
+        return _zero_vector()
 
 
 def embed(text: str) -> np.ndarray:
@@ -42,28 +462,128 @@ def embed(text: str) -> np.ndarray:
     """
 
     try:
-        prepared_text = _prepare_text(text)
-
-        # If text is empty, return zero vector
-        if not prepared_text:
-            return np.zeros(
-                _model.get_sentence_embedding_dimension(),
-                dtype=np.float32
-            )
-
-        embedding = _model.encode(
-            prepared_text,
-            convert_to_numpy=True,
-            normalize_embeddings=True
-        )
-
-        return embedding
+        return embed_many([text])[0]
 
     except Exception as e:
         print("Embedding error:", e)
 
         # Always return safe fallback
-        return np.zeros(
-            _model.get_sentence_embedding_dimension(),
-            dtype=np.float32
-        )
+        return _zero_vector()
+
+
+def embed_many(texts, batch_size: int = DEFAULT_BATCH_SIZE,
+               prepared: bool = False) -> np.ndarray:
+    """
+    Generate sentence embeddings for many texts at once.
+
+    Cached vectors are reused; the remaining texts are encoded in
+    length-sorted batches so that each batch pads to similar lengths.
+    Empty texts and texts whose encoding fails get a zero vector,
+    exactly like embed(). With prepared, texts are already within
+    the token budget (chunk_text() output) and are not clipped or
+    tokenized again.
+
+    Returns:
+        np.ndarray: (len(texts), dim) matrix of normalized vectors,
+                    rows in the same order as the input
+    """
+
+    prepared = list(texts) if prepared else [_prepare_text(text) for text in texts]
+    vectors = np.zeros(
+        (len(prepared), embedding_dimension()),
+        dtype=np.float32
+    )
+
+    # ---------------- Cache lookup ----------------
+    keys = {}
+    pending = []
+    first_seen = {}
+    duplicates = []
+
+    for i, text in enumerate(prepared):
+        if not text:
+            continue  # empty texts keep their zero row
+
+        # Identical texts are encoded once and copied afterwards
+        if text in first_seen:
+            duplicates.append((i, first_seen[text]))
+            continue
+        first_seen[text] = i
+
+        if EMBEDDING_CACHE_ENABLED:
+            keys[i] = _cache_key(text)
+            cached = _cache_get(keys[i])
+            if cached is not None:
+                vectors[i] = cached
+                continue
+
+        pending.append(i)
+
+    # ---------------- Batched encoding (longest first) ----------------
+    order = sorted(
+        pending,
+        key=lambda i: len(prepared[i]),
+        reverse=True
+    )
+    batch_size = max(int(batch_size), 1)
+
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+
+        try:
+            vectors[batch] = _encode([prepared[i] for i in batch])
+        except Exception as e:
+            print("Embedding batch error:", e)
+
+            # Retry item by item so one bad text only loses its own vector
+            for i in batch:
+                vectors[i] = _encode_one(prepared[i])
+
+        if EMBEDDING_CACHE_ENABLED:
+            for i in batch:
+                if vectors[i].any():  # never cache the zero fallback
+                    _cache_put(keys[i], vectors[i])
+
+    for i, original in duplicates:
+        vectors[i] = vectors[original]
+
+    return vectors
+
+
+def embed_documents(texts, batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+    """
+    Resume vectors for many texts.
+
+    In "chunked" mode every text is split with chunk_text(), the chunks
+    of all texts are embedded in one embed_many() call and pooled back
+    into one vector per text; otherwise this is embed_many().
+
+    Returns:
+        np.ndarray: (len(texts), dim) matrix, rows in input order
+    """
+
+    if EMBEDDING_MODE != "chunked":
+        return embed_many(texts, batch_size)
+
+    chunked = [chunk_text(text) for text in texts]
+    chunk_vectors = embed_many(
+        [chunk for chunks in chunked for chunk in chunks],
+        batch_size,
+        prepared=True
+    )
+
+    vectors = np.zeros(
+        (len(chunked), embedding_dimension()),
+        dtype=np.float32
+    )
+    position = 0
+
+    for i, chunks in enumerate(chunked):
+        block = chunk_vectors[position:position + len(chunks)]
+        position += len(chunks)
+
+        block = block[block.any(axis=1)]  # chunks that failed to encode
+        if len(block):
+            vectors[i] = pool_vectors(block)
+
+    return vectors
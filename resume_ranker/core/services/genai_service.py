@@ -1,13 +1,55 @@
+import os
 import re
-import spacy
+import threading
 from datetime import datetime
 
+from core.services import model_client
+from core.services.keyword_service import KeywordMatcher, line_index, line_of
+
 # ==================================================
-# Load spaCy model
+# spaCy model (only NER is used - name detection),
+# loaded once on first use (see get_nlp)
 # ==================================================
-nlp = spacy.load("en_core_web_sm")
+SPACY_MODEL = "en_core_web_sm"
+_nlp = None
+_nlp_lock = threading.Lock()
+
 CURRENT_YEAR = datetime.now().year
 
+# ==================================================
+# NLP batching (extract_info_many)
+# ==================================================
+NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", "64"))
+NLP_N_PROCESS = int(os.getenv("NLP_N_PROCESS", "1"))
+
+NAME_SCAN_LINES = 5       # names sit at the top of a resume
+NAME_SCAN_CHARS = 1000    # cleaned text is one line - cap the header
+
+# ==================================================
+# LAZY MODEL LOADING
+# ==================================================
+def get_nlp():
+    """
+    Return the spaCy pipeline, loading it on first use.
+    Thread-safe: concurrent first calls load the model only once.
+    """
+    global _nlp
+
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+                _nlp = spacy.load(
+                    SPACY_MODEL,
+                    exclude=["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+                )
+
+    return _nlp
+
+
+def is_nlp_loaded():
+    return _nlp is not None
+
 # ==================================================
 # SKILL TAXONOMY
 # ==================================================
@@ -54,6 +96,29 @@ EDUCATION_LEVELS = [
     ])
 ]
 
+# ==================================================
+# CERTIFICATION KEYWORDS (matched as word prefixes:
+# "Certifications", "CourseraML")
+# ==================================================
+CERT_KEYWORDS = [
+    "certified", "certification", "coursera",
+    "udemy", "aws certified", "google certified"
+]
+
+# ==================================================
+# KEYWORD MATCHER (skills, aliases, education, certifications)
+# ==================================================
+KEYWORD_MATCHER = KeywordMatcher(
+    [(skill, ("skill", skill)) for skill in SKILL_KEYWORDS]
+    + [(alias, ("skill", canonical)) for alias, canonical in SKILL_ALIASES.items()]
+    + [
+        (pattern, ("education", label, rank))
+        for label, rank, patterns in EDUCATION_LEVELS
+        for pattern in patterns
+    ],
+    tagged_prefixes=[(keyword, ("certification",)) for keyword in CERT_KEYWORDS]
+)
+
 # ==================================================
 # EXPERIENCE PATTERNS
 # ==================================================
@@ -66,17 +131,54 @@ DATE_RANGE_PATTERN = re.compile(
 # ==================================================
 # NAME EXTRACTION
 # ==================================================
+def name_header(text):
+    """
+    Top of the resume, the only part parsed by spaCy.
+    """
+    lines = text.splitlines()[:NAME_SCAN_LINES]
+    return "\n".join(lines)[:NAME_SCAN_CHARS]
+
+
+def name_from_doc(doc):
+    for ent in doc.ents:
+        if (
+            ent.label_ == "PERSON"
+            and "\n" not in ent.text
+            and len(ent.text.split()) <= 3
+        ):
+            return ent.text.title()
+    return "Unknown"
+
+
 def extract_name(text):
     """
     Extract candidate name using NLP + heuristics.
     """
-    lines = text.splitlines()[:5]  # top of resume
-    for line in lines:
-        doc = nlp(line)
-        for ent in doc.ents:
-            if ent.label_ == "PERSON" and len(ent.text.split()) <= 3:
-                return ent.text.title()
-    return "Unknown"
+    return extract_names([name_header(text)])[0]
+
+
+def extract_names(headers, batch_size=None, n_process=None):
+    """
+    Names for many resume headers, on the shared model server
+    when it is running, otherwise with the in-process model.
+    """
+    if not headers:
+        return []
+
+    names = model_client.extract_names(headers)
+    if names is not None:
+        return names
+
+    return extract_names_local(headers, batch_size, n_process)
+
+
+def extract_names_local(headers, batch_size=None, n_process=None):
+    docs = get_nlp().pipe(
+        headers,
+        batch_size=batch_size or NLP_BATCH_SIZE,
+        n_process=n_process or NLP_N_PROCESS
+    )
+    return [name_from_doc(doc) for doc in docs]
 
 # ==================================================
 # EXPERIENCE EXTRACTION
@@ -114,55 +216,57 @@ def infer_experience_level(years):
     return "Senior"
 
 # ==================================================
-# EDUCATION EXTRACTION
+# KEYWORD SCAN (one pass for skills, education & certifications)
 # ==================================================
-def extract_education(text):
-    text = text.lower()
-    found = []
+def scan_keywords(text):
+    """
+    Find skills, the highest education level and certification
+    lines in a single pass over the text.
+    """
+    skills = set()
+    education = []
+    cert_lines = set()
+    starts = None
 
-    for label, rank, patterns in EDUCATION_LEVELS:
-        for p in patterns:
-            if p in text:
-                found.append((label, rank))
-                break
+    for start, _, tags in KEYWORD_MATCHER.finditer(text or ""):
+        for tag in tags:
+            if tag[0] == "skill":
+                skills.add(tag[1])
+            elif tag[0] == "education":
+                education.append((tag[1], tag[2]))
+            else:
+                if starts is None:
+                    lines, starts = line_index(text)
+                cert_lines.add(line_of(starts, start))
 
-    return max(found, key=lambda x: x[1])[0] if found else "Unknown"
+    return {
+        "skills": skills,
+        "education": max(education, key=lambda x: x[1])[0] if education else "Unknown",
+        "certifications": [
+            lines[i].strip() for i in sorted(cert_lines)
+        ] if cert_lines else [],
+    }
 
 # ==================================================
-# SKILLS EXTRACTION
+# EDUCATION EXTRACTION
 # ==================================================
-def extract_skills(text):
-    text = text.lower()
-    found = set()
-
-    for skill in SKILL_KEYWORDS:
-        if skill in text:
-            found.add(skill)
-
-    for alias, canonical in SKILL_ALIASES.items():
-        if alias in text:
-            found.add(canonical)
+def extract_education(text):
+    return scan_keywords(text)["education"]
 
-    doc = nlp(text)
-    for chunk in doc.noun_chunks:
-        if chunk.text in SKILL_KEYWORDS:
-            found.add(chunk.text)
+# ==================================================
+# SKILLS EXTRACTION
+# ==================================================
+def extract_skills(text, keyword_skills=None):
+    if keyword_skills is None:
+        keyword_skills = scan_keywords(text)["skills"]
 
-    return sorted(s.title() for s in found)
+    return sorted(s.title() for s in keyword_skills)
 
 # ==================================================
 # CERTIFICATIONS EXTRACTION
 # ==================================================
 def extract_certifications(text):
-    cert_keywords = [
-        "certified", "certification", "coursera",
-        "udemy", "aws certified", "google certified"
-    ]
-    return [
-        line.strip()
-        for line in text.splitlines()
-        if any(k in line.lower() for k in cert_keywords)
-    ]
+    return scan_keywords(text)["certifications"]
 
 # ==================================================
 # PROJECT COUNT
@@ -198,13 +302,53 @@ def extract_info(resume_text):
     if not resume_text:
         return {}
 
-    name = extract_name(resume_text)
-    skills = extract_skills(resume_text)
-    education = extract_education(resume_text)
+    return extract_info_many([resume_text])[0]
+
+
+def extract_info_many(texts, batch_size=None, n_process=None):
+    """
+    extract_info() for many texts, running spaCy once per text
+    through nlp.pipe.
+
+    Returns a list of dicts in input order ({} for empty texts).
+    """
+
+    texts = list(texts)
+    filled = [i for i, text in enumerate(texts) if text]
+    results = [{} for _ in texts]
+
+    names = extract_names(
+        [name_header(texts[i]) for i in filled],
+        batch_size=batch_size,
+        n_process=n_process
+    )
+
+    for i, name in zip(filled, names):
+        results[i] = _build_info(texts[i], name)
+
+    return results
+
+
+def extract_info_fast(resume_text):
+    """
+    extract_info() without spaCy: rule-based fields only, name is None.
+    """
+
+    if not resume_text:
+        return {}
+
+    return _build_info(resume_text, None)
+
+
+def _build_info(resume_text, name):
+    keywords = scan_keywords(resume_text)
+
+    skills = extract_skills(resume_text, keywords["skills"])
+    education = keywords["education"]
     experience_years = extract_experience_years(resume_text)
     experience_level = infer_experience_level(experience_years)
     domain = infer_domain(skills)
-    certifications = extract_certifications(resume_text)
+    certifications = keywords["certifications"]
     project_count = extract_project_count(resume_text)
 
     return {
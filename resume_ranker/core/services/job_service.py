@@ -0,0 +1,147 @@
+"""
+job_service.py
+
+Database-backed queue for background ranking jobs.
+Web requests enqueue jobs; the `run_ranking_worker`
+management command claims and runs them.
+"""
+
+import os
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.utils import timezone
+
+from core.models import RankingJob
+from core.services.admission_service import Deadline
+from core.services.metrics_service import trace
+from core.services.profiling_service import profiled
+from core.pipelines.resume_pipeline import analyze_and_rank_resumes, fast_rank_resumes
+
+# Running jobs older than this are assumed orphaned (worker killed
+# or restarted mid-job) and failed, so they stop counting towards
+# MAX_PENDING_JOBS. Keep well above RANKING_DEADLINE_SECONDS.
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "1800"))
+
+PIPELINES = {
+    RankingJob.MODE_FULL: analyze_and_rank_resumes,
+    RankingJob.MODE_FAST: fast_rank_resumes,
+}
+
+
+def enqueue_ranking_job(file_paths, job_description, mode=RankingJob.MODE_FULL, profile=False):
+    """
+    Queue a ranking job and return it immediately.
+    With profile, the worker runs it under cProfile and tracemalloc.
+    """
+    return RankingJob.objects.create(
+        job_description=job_description,
+        file_paths=list(file_paths),
+        mode=mode,
+        profile=profile,
+        total=len(file_paths),
+    )
+
+
+def fail_stale_jobs():
+    """
+    Mark running jobs started more than JOB_STALE_SECONDS ago as
+    failed. Returns how many there were.
+    """
+    if not JOB_STALE_SECONDS:
+        return 0
+
+    now = timezone.now()
+    return (
+        RankingJob.objects
+        .filter(
+            status=RankingJob.STATUS_RUNNING,
+            started_at__lt=now - timedelta(seconds=JOB_STALE_SECONDS),
+        )
+        .update(
+            status=RankingJob.STATUS_FAILED,
+            error="The worker stopped before the job finished.",
+            finished_at=now,
+        )
+    )
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest queued job to running, after failing
+    stale running jobs.
+    Safe with several workers: only one UPDATE can win a given job.
+    """
+    fail_stale_jobs()
+
+    while True:
+        job = (
+            RankingJob.objects
+            .filter(status=RankingJob.STATUS_QUEUED)
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+
+        claimed = (
+            RankingJob.objects
+            .filter(pk=job.pk, status=RankingJob.STATUS_QUEUED)
+            .update(status=RankingJob.STATUS_RUNNING, started_at=timezone.now())
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def run_job(job):
+    """
+    Run the ranking pipeline for a claimed job, recording progress
+    and the final ranking (or the error) on the job row. Resumes
+    left when RANKING_DEADLINE_SECONDS run out are recorded as
+    unprocessed.
+    """
+
+    def report_progress(done, total):
+        RankingJob.objects.filter(pk=job.pk).update(processed=done, total=total)
+
+    deadline = Deadline()
+
+    try:
+        pipeline = PIPELINES.get(job.mode, analyze_and_rank_resumes)
+        profiler = (
+            profiled(f"job-{job.pk}", job_id=job.pk, mode=job.mode, resumes=len(job.file_paths))
+            if job.profile else nullcontext()
+        )
+        with profiler, trace("ranking_job", job_id=job.pk, mode=job.mode, resumes=len(job.file_paths)) as record:
+            results = pipeline(
+                job.file_paths,
+                job.job_description,
+                progress_callback=report_progress,
+                deadline=deadline,
+            )
+            record["fields"]["ranked"] = len(results)
+            record["fields"]["unprocessed"] = len(deadline.unprocessed)
+    except Exception as e:
+        print(f"[Job failed] {job.pk} → {e}")
+        RankingJob.objects.filter(pk=job.pk).update(
+            status=RankingJob.STATUS_FAILED,
+            error=str(e),
+            finished_at=timezone.now(),
+        )
+        return
+
+    RankingJob.objects.filter(pk=job.pk).update(
+        status=RankingJob.STATUS_DONE,
+        processed=job.total - len(deadline.unprocessed),
+        results=results,
+        unprocessed=deadline.unprocessed,
+        finished_at=timezone.now(),
+    )
+
+
+def queue_depth():
+    """
+    Number of jobs waiting for a worker.
+    """
+    return RankingJob.objects.filter(status=RankingJob.STATUS_QUEUED).count()
@@ -0,0 +1,160 @@
+"""
+keyword_service.py
+
+Single-pass multi-keyword matching.
+
+All keywords are compiled into one case-insensitive regex with
+word boundaries, so a text is scanned once no matter how many
+keywords there are, and short keywords such as "r" or "c" only
+match as whole words: not inside "react", nor in front of the
+"+" or "#" of "c++11" or "c#". Keywords ending in "+" or "#" may
+carry a version ("C++17" matches "c++"). Prefix keywords only need
+a word start ("certification" also matches "Certifications"). The alternation is built as a character
+trie ("p(?:ython|ytorch|andas)") so the engine never retries
+keywords that share a prefix.
+"""
+
+import bisect
+import re
+
+
+class KeywordMatcher:
+    """
+    Match many tagged keywords in one pass over a text.
+
+    Each keyword carries one or more tags (any hashable value).
+    When a longer keyword contains a shorter one as a separate word
+    ("aws certified" contains "aws", but "c++" does not contain "c"),
+    a match of the longer keyword
+    also yields the shorter keyword's tags, so leftmost-longest
+    matching does not hide nested keywords.
+
+    tagged_prefixes match at the start of a word and run to its
+    end ("coursera" matches "CourseraML"); a whole-word keyword
+    at the same position wins.
+    """
+
+    def __init__(self, tagged_keywords, tagged_prefixes=()):
+        tags = {}
+        prefixes = set()
+        for keyword, tag in tagged_keywords:
+            keyword = keyword.strip().lower()
+            if keyword:
+                tags.setdefault(keyword, set()).add(tag)
+        for keyword, tag in tagged_prefixes:
+            keyword = keyword.strip().lower()
+            if keyword:
+                tags.setdefault(keyword, set()).add(tag)
+                prefixes.add(keyword)
+
+        keywords = sorted(tags, key=len, reverse=True)
+        words = [k for k in keywords if k not in prefixes]
+
+        self._tags = {}
+        for keyword in keywords:
+            expanded = set(tags[keyword])
+            for other in keywords:
+                if other != keyword and self._word_in(other, keyword):
+                    expanded |= tags[other]
+            self._tags[keyword] = frozenset(expanded)
+
+        # The lookahead on first characters lets most positions fail fast
+        first_chars = "".join(sorted({k[0] for k in keywords}))
+        alternatives = []
+        if words:
+            # Versions only after a symbol ("c++17"), and a keyword never
+            # ends in front of "+" or "#" ("c" is not in "c++11")
+            alternatives.append(
+                r"(?P<word>" + trie_pattern(words) + r")(?:(?<=[+#])\d+)?(?![\w+#])"
+            )
+        if prefixes:
+            alternatives.append(r"(?P<prefix>" + trie_pattern(prefixes) + r")\w*")
+
+        self._regex = re.compile(
+            r"(?<!\w)(?=[" + re.escape(first_chars) + r"])(?:"
+            + "|".join(alternatives)
+            + r")",
+            re.IGNORECASE
+        ) if keywords else None
+
+    @staticmethod
+    def _word_in(short, long):
+        return re.search(
+            r"(?<!\S)" + re.escape(short) + r"(?!\S)",
+            long
+        ) is not None
+
+    def finditer(self, text):
+        """
+        Yield (start, end, tags) for every keyword occurrence.
+        """
+        if not text or self._regex is None:
+            return
+
+        for match in self._regex.finditer(text):
+            keyword = match.group("word") if "word" in self._regex.groupindex else None
+            if keyword is None:
+                keyword = match.group("prefix")
+            yield match.start(), match.end(), self._tags[keyword.lower()]
+
+    def tags(self, text):
+        """
+        Set of all tags found in text.
+        """
+        found = set()
+        for _, _, tags in self.finditer(text):
+            found |= tags
+        return found
+
+
+def trie_pattern(words):
+    """
+    Regex alternation of words built as a character trie.
+    Optional tails are greedy, so the longest keyword is tried first
+    ("c++" before "c") and shorter ones on backtracking.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end of word
+
+    def build(node):
+        is_end = "" in node
+        branches = [
+            re.escape(ch) + build(child)
+            for ch, child in sorted(node.items())
+            if ch
+        ]
+
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+
+        pattern = "(?:" + "|".join(branches) + ")"
+        return pattern + "?" if is_end else pattern
+
+    return build(trie)
+
+
+def line_index(text):
+    """
+    Return (lines, starts) where starts[i] is the offset of lines[i]
+    in text, using the same line breaks as str.splitlines().
+    """
+    lines = text.splitlines(keepends=True)
+    starts = []
+    offset = 0
+    for line in lines:
+        starts.append(offset)
+        offset += len(line)
+    return lines, starts
+
+
+def line_of(starts, position):
+    """
+    Index of the line containing a character offset.
+    """
+    return bisect.bisect_right(starts, position) - 1
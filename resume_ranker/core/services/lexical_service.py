@@ -0,0 +1,83 @@
+"""
+lexical_service.py
+
+Sparse TF-IDF scoring of cleaned resume texts against a job
+description. Costs a few milliseconds per hundred resumes, so it
+serves as the first stage of the ranking cascade (only the best
+lexical matches go on to spaCy and the embedding model) and as the
+similarity signal of the standalone fast mode.
+"""
+
+import os
+
+import numpy as np
+
+# --------------------------------------------------
+# Configuration
+# --------------------------------------------------
+# Resumes kept by the lexical stage of analyze_and_rank_resumes (0 = keep all)
+LEXICAL_SHORTLIST_SIZE = int(os.getenv("LEXICAL_SHORTLIST_SIZE", "100"))
+
+# Keeps "c++", "c#" and "node.js"-style skill tokens whole
+TOKEN_PATTERN = r"(?u)\w[\w+#]*(?:\.\w+)*"
+
+
+def lexical_scores(texts, query):
+    """
+    Cosine similarity (0–1) of each text with the query in a TF-IDF
+    space fitted on the texts themselves.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer  # slow import
+
+    texts = list(texts)
+    if not texts or not query:
+        return np.zeros(len(texts), dtype=np.float32)
+
+    vectorizer = TfidfVectorizer(
+        token_pattern=TOKEN_PATTERN,
+        ngram_range=(1, 2),
+        sublinear_tf=True,
+        stop_words="english",
+        dtype=np.float32,
+    )
+
+    try:
+        matrix = vectorizer.fit_transform(texts)
+    except ValueError:
+        # Nothing but stop words / empty texts
+        return np.zeros(len(texts), dtype=np.float32)
+
+    # Rows are L2-normalized, so the dot product is the cosine
+    query_vector = vectorizer.transform([query])
+    return (matrix @ query_vector.T).toarray().ravel()
+
+
+def lexical_shortlist(texts, query, size=LEXICAL_SHORTLIST_SIZE):
+    """
+    Indices of the `size` texts that best match the query lexically,
+    best first. All indices when size is 0 or covers every text.
+    """
+    texts = list(texts)
+    if not size or size >= len(texts):
+        return list(range(len(texts)))
+
+    scores = lexical_scores(texts, query)
+    top = np.argpartition(-scores, size - 1)[:size]
+    return top[np.argsort(-scores[top], kind="stable")].tolist()
+
+
+def lexical_similarity(texts, query, scale=10):
+    """
+    Fast-mode stand-in for batch_cosine_similarity(): scores 0–scale
+    relative to the best lexical match in the batch, NaN (and True
+    in the mask) for texts sharing no terms with the query.
+    """
+    scores = lexical_scores(texts, query)
+    no_match = scores <= 0
+
+    best = scores.max() if len(scores) else 0.0
+    scaled = np.full(len(scores), np.nan, dtype=np.float32)
+    if best > 0:
+        scaled[~no_match] = np.round(scores[~no_match] / best * scale, 2)
+
+    return scaled, no_match
@@ -0,0 +1,371 @@
+"""
+metrics_service.py
+
+Lightweight timing spans, counters and histograms, exposed in the
+Prometheus text format at /metrics.
+
+Rankings run in the worker process while /metrics is served by the
+web process, so each process writes a snapshot of its own metrics
+to METRICS_DIR/<pid>.json (after every traced request, and at most
+every METRICS_FLUSH_SECONDS otherwise) and the endpoint adds up all
+snapshots.
+
+trace() wraps one request/job: the spans inside it are summed into
+a per-request stage breakdown that is logged as one JSON line on
+the "core.metrics" logger.
+"""
+
+import contextvars
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from core.services.cache_service import CACHE_DIR
+
+# --------------------------------------------------
+# Configuration
+# --------------------------------------------------
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(CACHE_DIR, "metrics"))
+METRICS_FLUSH_SECONDS = 10
+METRICS_RETENTION_SECONDS = 24 * 3600  # snapshots of exited processes
+
+METRIC_PREFIX = "resume_ranker_"
+SECONDS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+METRIC_HELP = {
+    "stage_seconds": "Time spent in each pipeline stage (nested stages overlap).",
+    "request_seconds": "Wall time of traced requests and jobs.",
+    "ocr_pages_total": "PDF pages read from the text layer or OCR'd.",
+    "ocr_cache_lookups_total": "OCR text cache lookups by result.",
+    "embedding_cache_lookups_total": "Embedding cache lookups by result.",
+    "resumes_total": "Resumes handled by traced requests and jobs.",
+    "cache_hit_ratio": "Share of cache lookups served from the cache.",
+    "queue_depth": "Ranking jobs waiting for a worker.",
+}
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_counters = {}    # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [per-bucket counts..., +Inf count, sum]
+_last_flush = 0.0
+_current_trace = contextvars.ContextVar("metrics_trace", default=None)
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+# --------------------------------------------------
+# Recording
+# --------------------------------------------------
+def increment(name, value=1, **labels):
+    if not METRICS_ENABLED:
+        return
+
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """
+    Add one observation (seconds) to a histogram.
+    """
+    if not METRICS_ENABLED:
+        return
+
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [0] * (len(SECONDS_BUCKETS) + 2)
+
+        bucket = next(
+            (i for i, bound in enumerate(SECONDS_BUCKETS) if value <= bound),
+            len(SECONDS_BUCKETS)
+        )
+        histogram[bucket] += 1
+        histogram[-1] += value
+
+
+@contextmanager
+def span(stage):
+    """
+    Time a pipeline stage into the stage_seconds histogram and the
+    breakdown of the current trace().
+    """
+    if not METRICS_ENABLED:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe("stage_seconds", elapsed, stage=stage)
+
+        record = _current_trace.get()
+        if record is not None:
+            with _lock:
+                record["stages"][stage] = record["stages"].get(stage, 0.0) + elapsed
+                record["calls"][stage] = record["calls"].get(stage, 0) + 1
+
+        _maybe_flush()
+
+
+@contextmanager
+def trace(event, **fields):
+    """
+    Collect the spans of one request or job and log them as a single
+    structured line when it finishes. Extra fields set on the yielded
+    dict's "fields" are logged too.
+    """
+    if not METRICS_ENABLED:
+        yield {"fields": dict(fields)}
+        return
+
+    record = {"stages": {}, "calls": {}, "fields": dict(fields)}
+    token = _current_trace.set(record)
+    start = time.perf_counter()
+    status = "ok"
+
+    try:
+        yield record
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        _current_trace.reset(token)
+        elapsed = time.perf_counter() - start
+        observe("request_seconds", elapsed, event=event)
+
+        resumes = record["fields"].get("resumes")
+        if resumes:
+            increment("resumes_total", resumes, event=event)
+
+        logger.info(json.dumps({
+            "event": event,
+            "status": status,
+            "seconds": round(elapsed, 4),
+            **record["fields"],
+            "stages": {
+                stage: round(seconds, 4)
+                for stage, seconds in record["stages"].items()
+            },
+            "calls": record["calls"],
+        }, default=str))
+
+        flush()
+
+
+# --------------------------------------------------
+# Snapshots (one file per process)
+# --------------------------------------------------
+def _collected_counters():
+    """
+    Counters kept by other services, read at snapshot time.
+    """
+    from core.services.embedding_service import cache_stats
+    from core.services.ocr_service import page_path_stats
+
+    stats = cache_stats()
+    for result in ("memory_hits", "disk_hits", "misses"):
+        yield _key("embedding_cache_lookups_total", {"result": result}), stats[result]
+
+    for path, pages in page_path_stats().items():
+        yield _key("ocr_pages_total", {"path": path}), pages
+
+
+def snapshot():
+    """
+    This process's metrics as a JSON-serializable dict.
+    """
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(values) for key, values in _histograms.items()}
+
+    try:
+        counters.update(_collected_counters())
+    except Exception as e:
+        print("Metrics collection error:", e)
+
+    return {
+        "pid": os.getpid(),
+        "counters": [[name, list(labels), value] for (name, labels), value in counters.items()],
+        "histograms": [[name, list(labels), values] for (name, labels), values in histograms.items()],
+    }
+
+
+def flush():
+    """
+    Write this process's snapshot for /metrics in other processes.
+    """
+    global _last_flush
+
+    if not METRICS_ENABLED:
+        return
+
+    _last_flush = time.monotonic()
+    path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+    tmp_path = f"{path}.tmp"
+
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot(), f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print("Metrics flush error:", e)
+
+
+def _maybe_flush():
+    if time.monotonic() - _last_flush >= METRICS_FLUSH_SECONDS:
+        flush()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _load_snapshots():
+    """
+    Snapshots of all processes, with this process's live state.
+    Snapshots of long-exited processes are removed.
+    """
+    snapshots = [snapshot()]
+    own_pid = os.getpid()
+
+    for path in glob.glob(os.path.join(METRICS_DIR, "*.json")):
+        try:
+            pid = int(os.path.basename(path)[:-len(".json")])
+            if pid == own_pid:
+                continue
+
+            if (not _pid_alive(pid)
+                    and time.time() - os.path.getmtime(path) > METRICS_RETENTION_SECONDS):
+                os.remove(path)
+                continue
+
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (ValueError, OSError) as e:
+            print(f"Metrics snapshot skipped ({path}):", e)
+
+    return snapshots
+
+
+# --------------------------------------------------
+# Prometheus text exposition
+# --------------------------------------------------
+def _labels_text(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def _merge(snapshots):
+    counters = {}
+    histograms = {}
+
+    for data in snapshots:
+        for name, labels, value in data.get("counters", []):
+            key = (name, tuple(tuple(pair) for pair in labels))
+            counters[key] = counters.get(key, 0) + value
+
+        for name, labels, values in data.get("histograms", []):
+            key = (name, tuple(tuple(pair) for pair in labels))
+            merged = histograms.setdefault(key, [0] * len(values))
+            for i, value in enumerate(values):
+                merged[i] += value
+
+    return counters, histograms
+
+
+def _gauges(counters):
+    """
+    Values computed at scrape time: cache hit ratios and queue depth.
+    """
+    def total(name, results):
+        return sum(
+            value for (metric, labels), value in counters.items()
+            if metric == name and dict(labels).get("result") in results
+        )
+
+    ratios = {
+        "embedding": (
+            total("embedding_cache_lookups_total", {"memory_hits", "disk_hits"}),
+            total("embedding_cache_lookups_total", {"memory_hits", "disk_hits", "misses"}),
+        ),
+        "ocr": (
+            total("ocr_cache_lookups_total", {"hit"}),
+            total("ocr_cache_lookups_total", {"hit", "miss"}),
+        ),
+    }
+    for cache, (hits, lookups) in ratios.items():
+        yield "cache_hit_ratio", (("cache", cache),), hits / lookups if lookups else 0.0
+
+    try:
+        from core.services.job_service import queue_depth
+        yield "queue_depth", (), queue_depth()
+    except Exception as e:
+        print("Metrics queue depth error:", e)
+
+
+def render_prometheus():
+    """
+    All processes' metrics in the Prometheus text format (0.0.4).
+    """
+    counters, histograms = _merge(_load_snapshots())
+    lines = []
+
+    def header(name, kind):
+        lines.append(f"# HELP {METRIC_PREFIX}{name} {METRIC_HELP.get(name, name)}")
+        lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+
+    for name in sorted({name for name, _ in counters}):
+        header(name, "counter")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{METRIC_PREFIX}{name}{_labels_text(labels)} {value}")
+
+    for name in sorted({name for name, _ in histograms}):
+        header(name, "histogram")
+        for (metric, labels), values in sorted(histograms.items()):
+            if metric != name:
+                continue
+
+            cumulative = 0
+            bounds = [str(bound) for bound in SECONDS_BUCKETS] + ["+Inf"]
+            for bound, count in zip(bounds, values[:-1]):
+                cumulative += count
+                lines.append(
+                    f"{METRIC_PREFIX}{name}_bucket{_labels_text(labels, [('le', bound)])} {cumulative}"
+                )
+            lines.append(f"{METRIC_PREFIX}{name}_sum{_labels_text(labels)} {round(values[-1], 6)}")
+            lines.append(f"{METRIC_PREFIX}{name}_count{_labels_text(labels)} {cumulative}")
+
+    gauges = list(_gauges(counters))
+    for name in sorted({name for name, _, _ in gauges}):
+        header(name, "gauge")
+        for metric, labels, value in gauges:
+            if metric == name:
+                lines.append(f"{METRIC_PREFIX}{name}{_labels_text(labels)} {round(value, 6)}")
+
+    return "\n".join(lines) + "\n"
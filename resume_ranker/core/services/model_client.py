@@ -0,0 +1,168 @@
+"""
+model_client.py
+
+Client for the shared model server (`manage.py run_model_server`).
+
+Each call opens a short Unix-socket connection to the server.
+If the server is not running, calls return None and the services
+fall back to their in-process models; an unreachable server is
+not retried for MODEL_SERVER_RETRY_SECONDS. Embeddings from a server
+running another encoder than the caller expects are not used either.
+"""
+
+import base64
+import json
+import os
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+from core.services.cache_service import CACHE_DIR
+
+# --------------------------------------------------
+# Configuration
+# --------------------------------------------------
+MODEL_SERVER_SOCKET = os.getenv(
+    "MODEL_SERVER_SOCKET",
+    os.path.join(CACHE_DIR, "model_server.sock")
+)
+MODEL_SERVER_ENABLED = os.getenv("MODEL_SERVER_ENABLED", "1") != "0"
+MODEL_SERVER_TIMEOUT = float(os.getenv("MODEL_SERVER_TIMEOUT", "120"))
+MODEL_SERVER_RETRY_SECONDS = 5.0
+
+_HEADER = struct.Struct("!I")
+
+_state_lock = threading.Lock()
+_disabled = not MODEL_SERVER_ENABLED
+_unavailable_until = 0.0
+_mismatch_reported = set()
+
+
+# --------------------------------------------------
+# Framing (shared with the server)
+# --------------------------------------------------
+def send_message(sock, message):
+    payload = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("model server closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock):
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return json.loads(_recv_exact(sock, size))
+
+
+def encode_array(array):
+    array = np.ascontiguousarray(array, dtype=np.float32)
+    return {
+        "shape": list(array.shape),
+        "data": base64.b64encode(array.tobytes()).decode("ascii"),
+    }
+
+
+def decode_array(message):
+    data = base64.b64decode(message["data"])
+    return np.frombuffer(data, dtype=np.float32).reshape(message["shape"]).copy()
+
+
+# --------------------------------------------------
+# Client
+# --------------------------------------------------
+def disable():
+    """
+    Never use the server from this process (the server itself calls this).
+    """
+    global _disabled
+    _disabled = True
+
+
+def _call(message):
+    global _unavailable_until
+
+    if _disabled or time.monotonic() < _unavailable_until:
+        return None
+    if not os.path.exists(MODEL_SERVER_SOCKET):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(MODEL_SERVER_TIMEOUT)
+            sock.connect(MODEL_SERVER_SOCKET)
+            send_message(sock, message)
+            reply = recv_message(sock)
+    except (OSError, ValueError) as e:
+        print("Model server unavailable, using in-process models:", e)
+        with _state_lock:
+            _unavailable_until = time.monotonic() + MODEL_SERVER_RETRY_SECONDS
+        return None
+
+    if "error" in reply:
+        raise RuntimeError(f"model server error: {reply['error']}")
+
+    return reply
+
+
+def _matches(result, model_id):
+    """
+    Whether a reply came from the expected encoder (any, without model_id).
+    """
+    served = result.get("model_id")
+    if model_id is None or served == model_id:
+        return True
+
+    with _state_lock:
+        report = (served, model_id) not in _mismatch_reported
+        _mismatch_reported.add((served, model_id))
+    if report:
+        print(f"Model server encodes with {served}, expected {model_id}; using in-process model")
+    return False
+
+
+def encode(texts, model_id=None):
+    """
+    Embeddings for prepared texts, or None if the server is unavailable
+    or (with model_id) serves another encoder.
+    """
+    reply = _call({"op": "encode", "items": list(texts)})
+    if reply is None or not _matches(reply["result"], model_id):
+        return None
+    return decode_array(reply["result"])
+
+
+def embedding_dimension(model_id=None):
+    reply = _call({"op": "info"})
+    if reply is None or not _matches(reply["result"], model_id):
+        return None
+    return reply["result"]["embedding_dimension"]
+
+
+def tokenizer(model_id=None):
+    """
+    The server's tokenizer as JSON (tokenizers format), or None if the
+    server is unavailable or serves another encoder.
+    """
+    reply = _call({"op": "tokenizer"})
+    if reply is None or not _matches(reply["result"], model_id):
+        return None
+    return reply["result"]["tokenizer"]
+
+
+def extract_names(headers):
+    """
+    Candidate names for resume headers, or None if the server is unavailable.
+    """
+    reply = _call({"op": "names", "items": list(headers)})
+    return None if reply is None else reply["result"]
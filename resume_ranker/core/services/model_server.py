@@ -0,0 +1,96 @@
+"""
+model_server.py
+
+Shared model-serving process. One long-lived process owns the
+embedding and spaCy models and serves every web/worker process
+over a Unix socket, so N gunicorn workers share one copy of the
+models instead of loading N.
+
+Requests from different connections are merged into shared
+batches by a BatchDispatcher per operation.
+"""
+
+import os
+import socketserver
+
+from core.services import embedding_service, genai_service, model_client
+from core.services.batching import BatchDispatcher
+
+# --------------------------------------------------
+# Configuration
+# --------------------------------------------------
+MODEL_SERVER_MAX_BATCH = int(os.getenv("MODEL_SERVER_MAX_BATCH", "64"))
+MODEL_SERVER_MAX_WAIT_MS = float(os.getenv("MODEL_SERVER_MAX_WAIT_MS", "10"))
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            message = model_client.recv_message(self.request)
+            reply = {"result": self.server.dispatch(message)}
+        except Exception as e:
+            reply = {"error": str(e)}
+
+        try:
+            model_client.send_message(self.request, reply)
+        except OSError:
+            pass  # client went away
+
+
+class ModelServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, max_batch=MODEL_SERVER_MAX_BATCH,
+                 max_wait_ms=MODEL_SERVER_MAX_WAIT_MS):
+        # This process owns the models - never call ourselves
+        model_client.disable()
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # stale socket from a previous run
+        os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+
+        self.encoder = BatchDispatcher(
+            embedding_service.encode_local,
+            max_items=max_batch,
+            max_wait=max_wait_ms / 1000,
+            name="model-server-encode"
+        )
+        self.namer = BatchDispatcher(
+            genai_service.extract_names_local,
+            max_items=max_batch,
+            max_wait=max_wait_ms / 1000,
+            name="model-server-names"
+        )
+
+        super().__init__(socket_path, _Handler)
+
+    def dispatch(self, message):
+        op = message.get("op")
+
+        if op == "encode":
+            return {
+                **model_client.encode_array(self.encoder.submit(message["items"])),
+                "model_id": embedding_service.ENCODER_ID,
+            }
+        if op == "names":
+            return list(self.namer.submit(message["items"]))
+        if op == "tokenizer":
+            tokenizer = embedding_service.get_tokenizer()
+            if tokenizer is None:
+                raise RuntimeError("tokenizer unavailable")
+            return {
+                "tokenizer": tokenizer.to_str(),
+                "model_id": embedding_service.ENCODER_ID,
+            }
+        if op == "info":
+            return {
+                "embedding_dimension": embedding_service.embedding_dimension(),
+                "model_id": embedding_service.ENCODER_ID,
+            }
+
+        raise ValueError(f"unknown op {op!r}")
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
@@ -1,8 +1,13 @@
 import os
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 import pytesseract
 from PIL import Image, ImageEnhance, ImageFilter
 import fitz  # PyMuPDF
-from pdf2image import convert_from_path
+
+from core.services.cache_service import CACHE_DIR, SQLiteLRUCache
+from core.services.metrics_service import increment, span
 
 
 # --------------------------------------------------
@@ -16,6 +21,49 @@ pytesseract.pytesseract.tesseract_cmd = (
 # Tesseract OCR configuration
 # --------------------------------------------------
 TESSERACT_CONFIG = r"--oem 3 --psm 6"
+OCR_DPI = 300  # Higher DPI = better OCR
+
+# "fitz" renders pages in-process; "pdf2image" shells out to poppler
+PDF_RENDERER = os.getenv("PDF_RENDERER", "fitz")
+
+# Bump whenever preprocess_image() or the text layer vs OCR decision
+# changes so cached text is not reused
+PREPROCESS_VERSION = 2
+
+# --------------------------------------------------
+# Per-page text layer vs OCR decision
+# --------------------------------------------------
+MIN_PAGE_TEXT_CHARS = 50       # shorter text layers get OCR'd
+MIN_PAGE_TEXT_QUALITY = 0.6    # share of letters/digits/whitespace
+
+_page_counters = {"text_layer": 0, "ocr": 0}
+_page_counters_lock = threading.Lock()
+
+# --------------------------------------------------
+# Page-parallel OCR
+# --------------------------------------------------
+OCR_POOL_WORKERS = int(
+    os.getenv("OCR_POOL_WORKERS", str(os.cpu_count() or 1))
+)  # processes shared by all documents
+OCR_MAX_WORKERS_PER_DOC = int(
+    os.getenv("OCR_MAX_WORKERS_PER_DOC", "4")
+)  # pages of one document in flight at once
+
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+# --------------------------------------------------
+# Extracted text cache (keyed by file content + OCR config)
+# --------------------------------------------------
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "1") != "0"
+OCR_CACHE_MAX_BYTES = int(
+    os.getenv("OCR_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+
+ocr_cache = SQLiteLRUCache(
+    os.path.join(CACHE_DIR, "ocr_cache.sqlite3"),
+    OCR_CACHE_MAX_BYTES
+)
 
 
 # --------------------------------------------------
@@ -62,60 +110,309 @@ def extract_text_from_image(image_path: str) -> str:
 # --------------------------------------------------
 # OCR FOR PDF FILES
 # --------------------------------------------------
-def extract_text_from_pdf(pdf_path: str) -> str:
-    extracted_text = ""
+def has_usable_text_layer(text: str) -> bool:
+    """
+    True when a page's embedded text is long enough and not garbage
+    (e.g. broken font encodings that come out as symbol soup).
+    """
 
-    try:
-        # -----------------------------
-        # 1. Try direct text extraction
-        # -----------------------------
-        doc = fitz.open(pdf_path)
-        for page in doc:
-            extracted_text += page.get_text()
-
-        # If sufficient text found, return
-        if len(extracted_text.strip()) > 200:
-            return extracted_text
-
-        # -----------------------------
-        # 2. OCR fallback (scanned PDF)
-        # -----------------------------
-        images = convert_from_path(
-            pdf_path,
-            dpi=300,          # Higher DPI = better OCR
-            fmt="png"
-        )
+    stripped = text.strip()
+    if len(stripped) < MIN_PAGE_TEXT_CHARS:
+        return False
+
+    readable = sum(
+        1 for ch in stripped
+        if ch.isalnum() or ch.isspace()
+    )
+    return readable / len(stripped) >= MIN_PAGE_TEXT_QUALITY
+
+
+def extract_pdf_with_report(pdf_path: str):
+    """
+    Extract text page by page: keep the text layer where it is usable
+    and OCR only image-only or garbage pages.
+
+    Returns:
+        (str, dict): extracted text in page order and a report with
+                     pages / text_layer_pages / ocr_pages counts
+    """
+
+    with span("ocr.text_layer"), fitz.open(pdf_path) as doc:
+        page_texts = [page.get_text() for page in doc]
+
+    ocr_page_numbers = [
+        number
+        for number, text in enumerate(page_texts, start=1)
+        if not has_usable_text_layer(text)
+    ]
 
-        for img in images:
-            img = preprocess_image(img)
-            extracted_text += pytesseract.image_to_string(
-                img,
-                config=TESSERACT_CONFIG
-            )
+    if ocr_page_numbers:
+        with span("ocr.tesseract"):
+            ocr_texts = ocr_pdf_pages(pdf_path, ocr_page_numbers, join=False)
+        for number, text in zip(ocr_page_numbers, ocr_texts):
+            page_texts[number - 1] = text
 
-        return extracted_text
+    report = {
+        "pages": len(page_texts),
+        "text_layer_pages": len(page_texts) - len(ocr_page_numbers),
+        "ocr_pages": len(ocr_page_numbers),
+    }
+
+    with _page_counters_lock:
+        _page_counters["text_layer"] += report["text_layer_pages"]
+        _page_counters["ocr"] += report["ocr_pages"]
+
+    return "".join(page_texts), report
+
+
+def page_path_stats() -> dict:
+    """
+    Pages handled through each path since process start.
+    """
+    with _page_counters_lock:
+        return dict(_page_counters)
+
+
+def extract_text_from_pdf(pdf_path: str) -> str:
+    try:
+        text, _ = extract_pdf_with_report(pdf_path)
+        return text
 
     except Exception as e:
         print(f"OCR PDF error ({pdf_path}):", e)
         return ""
 
 
+# --------------------------------------------------
+# PAGE-PARALLEL OCR HELPERS
+# --------------------------------------------------
+def get_ocr_pool() -> ProcessPoolExecutor:
+    """
+    Lazily create the process pool shared by all OCR work.
+    """
+
+    global _ocr_pool
+
+    if _ocr_pool is None:
+        with _ocr_pool_lock:
+            if _ocr_pool is None:
+                _ocr_pool = ProcessPoolExecutor(
+                    max_workers=max(OCR_POOL_WORKERS, 1)
+                )
+
+    return _ocr_pool
+
+
+def render_pdf_page_fitz(pdf_path: str, page_number: int, dpi: int = OCR_DPI) -> Image.Image:
+    """
+    Render a (1-based) PDF page straight to a grayscale PIL image.
+    The pixmap buffer is wrapped directly - no temp files, no PNG round trip.
+    """
+
+    with fitz.open(pdf_path) as doc:
+        pix = doc[page_number - 1].get_pixmap(
+            dpi=dpi,
+            colorspace=fitz.csGRAY,
+            alpha=False
+        )
+
+    return Image.frombuffer(
+        "L",
+        (pix.width, pix.height),
+        pix.samples,
+        "raw",
+        "L",
+        pix.stride,
+        1
+    )
+
+
+def render_pdf_page_pdf2image(pdf_path: str, page_number: int, dpi: int = OCR_DPI) -> Image.Image:
+    """
+    Render a (1-based) PDF page through poppler (legacy path).
+    """
+
+    from pdf2image import convert_from_path  # optional dependency
+
+    images = convert_from_path(
+        pdf_path,
+        dpi=dpi,
+        fmt="png",
+        first_page=page_number,
+        last_page=page_number
+    )
+
+    return images[0]
+
+
+PDF_RENDERERS = {
+    "fitz": render_pdf_page_fitz,
+    "pdf2image": render_pdf_page_pdf2image,
+}
+
+
+def ocr_pdf_page(pdf_path: str, page_number: int) -> str:
+    """
+    Render and OCR a single (1-based) PDF page.
+    Runs inside pool workers, so it must stay a top-level function.
+    """
+
+    img = PDF_RENDERERS[PDF_RENDERER](pdf_path, page_number)
+    img = preprocess_image(img)
+
+    return pytesseract.image_to_string(
+        img,
+        config=TESSERACT_CONFIG
+    )
+
+
+def ocr_pdf_pages(pdf_path: str, page_numbers: list, join: bool = True):
+    """
+    OCR the given pages on the shared process pool.
+
+    At most OCR_MAX_WORKERS_PER_DOC pages of this document are in
+    flight at once, so one huge PDF cannot take over the pool.
+    Output keeps page order: one string, or a list per page
+    when join is False.
+    """
+
+    if len(page_numbers) <= 1 or OCR_POOL_WORKERS <= 1:
+        texts = [ocr_pdf_page(pdf_path, n) for n in page_numbers]
+        return "".join(texts) if join else texts
+
+    pool = get_ocr_pool()
+    texts = [""] * len(page_numbers)
+    remaining = iter(enumerate(page_numbers))
+    in_flight = {}
+
+    def submit_next():
+        for index, page_number in remaining:
+            future = pool.submit(ocr_pdf_page, pdf_path, page_number)
+            in_flight[future] = index
+            return
+
+    for _ in range(max(OCR_MAX_WORKERS_PER_DOC, 1)):
+        submit_next()
+
+    try:
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                texts[in_flight.pop(future)] = future.result()
+                submit_next()
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+    return "".join(texts) if join else texts
+
+
+def count_pages(file_path: str) -> int:
+    """
+    Pages that extract_text_from_file() would read: the PDF page
+    count, 1 for images and unreadable files.
+    """
+
+    if os.path.splitext(file_path)[1].lower() != ".pdf":
+        return 1
+
+    try:
+        with fitz.open(file_path) as doc:
+            return max(doc.page_count, 1)
+    except Exception as e:
+        print(f"Page count error ({file_path}):", e)
+        return 1
+
+
+# --------------------------------------------------
+# CACHE KEY
+# --------------------------------------------------
+def file_sha256(file_path: str) -> str:
+    """
+    SHA-256 hex digest of the file bytes.
+    """
+
+    digest = hashlib.sha256()
+
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def file_cache_key(file_path: str, digest: str = None) -> str:
+    """
+    SHA-256 of the file bytes plus everything that changes OCR output.
+    Pass `digest` when the caller already hashed the file.
+    """
+
+    config = (
+        f"{TESSERACT_CONFIG}|dpi={OCR_DPI}|pre={PREPROCESS_VERSION}"
+        f"|renderer={PDF_RENDERER}"
+        f"|text_layer={MIN_PAGE_TEXT_CHARS},{MIN_PAGE_TEXT_QUALITY}"
+    )
+
+    return f"{digest or file_sha256(file_path)}:{config}"
+
+
 # --------------------------------------------------
 # MAIN ENTRY FUNCTION
 # --------------------------------------------------
-def extract_text_from_file(file_path: str) -> str:
+def extract_text_from_file(file_path: str, digest: str = None) -> str:
     """
     Extract text from resume files (PDF / Image).
     Automatically selects best method.
+
+    Results are cached by file content, so re-uploads of the
+    same resume skip parsing and OCR entirely. `digest` is the
+    file's SHA-256 if the caller already has it.
     """
 
     if not file_path or not os.path.exists(file_path):
         return ""
 
+    with span("ocr"):
+        return _extract_text_cached(file_path, digest)
+
+
+def _extract_text_cached(file_path: str, digest: str = None) -> str:
+    if not OCR_CACHE_ENABLED:
+        return _extract_text(file_path)
+
+    try:
+        key = file_cache_key(file_path, digest)
+        cached = ocr_cache.get(key)
+    except Exception as e:
+        print(f"OCR cache error ({file_path}):", e)
+        return _extract_text(file_path)
+
+    increment("ocr_cache_lookups_total", result="hit" if cached is not None else "miss")
+
+    if cached is not None:
+        return cached.decode("utf-8")
+
+    text = _extract_text(file_path)
+
+    # Empty output usually means a failure - don't remember it
+    if text:
+        try:
+            ocr_cache.set(key, text.encode("utf-8"))
+        except Exception as e:
+            print(f"OCR cache error ({file_path}):", e)
+
+    return text
+
+
+def _extract_text(file_path: str) -> str:
     ext = os.path.splitext(file_path)[1].lower()
 
     if ext in [".jpg", ".jpeg", ".png"]:
-        return extract_text_from_image(file_path)
+        with span("ocr.tesseract"):
+            if OCR_POOL_WORKERS <= 1:
+                return extract_text_from_image(file_path)
+            # Keep preprocessing off the calling (ingestion) thread
+            return get_ocr_pool().submit(extract_text_from_image, file_path).result()
 
     if ext == ".pdf":
         return extract_text_from_pdf(file_path)
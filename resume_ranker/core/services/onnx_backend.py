@@ -0,0 +1,172 @@
+"""
+onnx_backend.py
+
+ONNX Runtime backend for the sentence embedding model.
+
+The transformer inside the SentenceTransformer is exported to ONNX
+once (optionally with an int8 dynamic-quantized copy) and cached
+under CACHE_DIR/onnx/<model>/. At runtime only onnxruntime and the
+`tokenizers` library are needed; mean pooling and L2 normalization
+are done in NumPy, matching SentenceTransformer's output.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+from core.services.cache_service import CACHE_DIR
+
+ONNX_DIR = os.path.join(CACHE_DIR, "onnx")
+ONNX_OPSET = 14
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))  # 0 = onnxruntime default
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+META_FILE = "meta.json"
+
+_export_lock = threading.Lock()
+
+
+def model_dir(model_name):
+    return os.path.join(ONNX_DIR, model_name.replace("/", "__"))
+
+
+# --------------------------------------------------
+# Export (needs torch + sentence_transformers, runs once)
+# --------------------------------------------------
+def export_model(sentence_transformer, model_name, quantize=True):
+    """
+    Export the transformer to ONNX, save its tokenizer and, if asked,
+    an int8 dynamic-quantized copy. Returns the output directory.
+    """
+
+    import torch
+
+    out_dir = model_dir(model_name)
+    os.makedirs(out_dir, exist_ok=True)
+
+    transformer = sentence_transformer[0].auto_model.eval()
+    tokenizer = sentence_transformer.tokenizer
+    max_seq_length = sentence_transformer.max_seq_length
+
+    sample = tokenizer(
+        ["export sample"],
+        padding=True,
+        truncation=True,
+        max_length=max_seq_length,
+        return_tensors="pt"
+    )
+    input_names = [
+        name for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in sample
+    ]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    fp32_path = os.path.join(out_dir, FP32_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+        )
+
+    tokenizer.save_pretrained(out_dir)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            fp32_path,
+            os.path.join(out_dir, INT8_FILE),
+            weight_type=QuantType.QInt8
+        )
+
+    with open(os.path.join(out_dir, META_FILE), "w") as f:
+        json.dump({
+            "model_name": model_name,
+            "max_seq_length": max_seq_length,
+            "dimension": sentence_transformer.get_sentence_embedding_dimension(),
+            "input_names": input_names,
+        }, f, indent=2)
+
+    return out_dir
+
+
+def ensure_exported(model_name, load_sentence_transformer, quantized):
+    """
+    Export on first use; load_sentence_transformer() is only called
+    when the ONNX files are missing.
+    """
+
+    out_dir = model_dir(model_name)
+    needed = INT8_FILE if quantized else FP32_FILE
+
+    with _export_lock:
+        if not (
+            os.path.exists(os.path.join(out_dir, needed))
+            and os.path.exists(os.path.join(out_dir, META_FILE))
+        ):
+            export_model(load_sentence_transformer(), model_name, quantize=True)
+
+    return out_dir
+
+
+# --------------------------------------------------
+# Runtime
+# --------------------------------------------------
+class OnnxEncoder:
+    """
+    Drop-in replacement for SentenceTransformer.encode(...,
+    normalize_embeddings=True) running on ONNX Runtime.
+    """
+
+    def __init__(self, out_dir, quantized=False):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(out_dir, META_FILE)) as f:
+            meta = json.load(f)
+
+        self.dimension = meta["dimension"]
+        self.max_seq_length = meta["max_seq_length"]
+        self.input_names = meta["input_names"]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(out_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        if ONNX_THREADS:
+            options.intra_op_num_threads = ONNX_THREADS
+
+        self.session = ort.InferenceSession(
+            os.path.join(out_dir, INT8_FILE if quantized else FP32_FILE),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+
+    def encode(self, texts):
+        encodings = self.tokenizer.encode_batch(list(texts))
+
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        feeds = {name: feeds[name] for name in self.input_names}
+
+        hidden = self.session.run(["last_hidden_state"], feeds)[0]
+
+        # Mean pooling over real tokens, then L2 normalize
+        mask = feeds["attention_mask"][:, :, np.newaxis].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+
+        return (pooled / np.maximum(norms, 1e-12)).astype(np.float32)
@@ -0,0 +1,179 @@
+"""
+profiling_service.py
+
+On-demand CPU and memory profiling of ranking jobs.
+
+A profiled run executes under cProfile and tracemalloc and leaves
+three files in PROFILES_DIR, sharing one base name:
+
+    <base>.prof  - cProfile stats (load with pstats or snakeviz)
+    <base>.txt   - top functions by cumulative time and top allocations
+    <base>.json  - summary used by `manage.py profiles`
+
+cProfile only sees the thread that runs the profiled block: the
+staged reader's OCR and cleaning threads are not in the profile
+(their time shows up as waiting on queues). tracemalloc only sees
+Python allocations of this process: OCR pool workers and native
+buffers (PyTorch, ONNX Runtime) are not included.
+
+tracemalloc is process-wide, so one run is profiled at a time; a
+run that starts while another is being profiled runs unprofiled.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+PROFILE_TOP_FUNCTIONS = 40
+PROFILE_TOP_ALLOCATIONS = 30
+PROFILE_TRACEMALLOC_FRAMES = 10
+
+_profiling_lock = threading.Lock()  # held by the run being profiled
+
+
+def profiling_enabled():
+    return getattr(settings, "PROFILING_ENABLED", False)
+
+
+def profiles_dir():
+    return str(getattr(settings, "PROFILES_DIR", "profiles"))
+
+
+def should_profile(request):
+    """
+    Decide at enqueue time whether a request's job is profiled:
+    staff asking for it (X-Profile: 1 header or ?profile=1), or a
+    random sample of PROFILING_SAMPLE_RATE of all requests.
+    """
+    if not profiling_enabled():
+        return False
+
+    asked = (
+        request.headers.get("X-Profile") == "1"
+        or request.GET.get("profile") == "1"
+    )
+    if asked and request.user.is_staff:
+        return True
+
+    return random.random() < getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+
+
+@contextmanager
+def profiled(name, **meta):
+    """
+    Run the body under cProfile and tracemalloc and save the reports.
+    Extra keyword arguments are stored in the summary.
+
+    Only one run per process is profiled at a time; while one is,
+    others run unprofiled. Profiling errors are printed, never raised.
+    """
+    if not _profiling_lock.acquire(blocking=False):
+        print(f"Profile skipped ({name}): another run is being profiled")
+        yield
+        return
+
+    try:
+        directory = profiles_dir()
+        os.makedirs(directory, exist_ok=True)
+
+        created = datetime.now(timezone.utc)
+        base = os.path.join(directory, f"{created:%Y%m%d-%H%M%S}-{name}")
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+    except Exception as e:
+        _profiling_lock.release()
+        print(f"Profile start error ({name}):", e)
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        try:
+            profiler.disable()
+            seconds = time.perf_counter() - start
+
+            allocations = tracemalloc.take_snapshot()
+            current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+            _save(base, profiler, allocations, {
+                "name": name,
+                "created": created.isoformat(),
+                "seconds": round(seconds, 3),
+                "peak_bytes": peak_bytes,
+                "retained_bytes": current_bytes,
+                "threads": "calling thread only (OCR and cleaning threads not profiled)",
+                **meta,
+            })
+        except Exception as e:
+            print(f"Profile save error ({base}):", e)
+        finally:
+            _profiling_lock.release()
+
+
+def _save(base, profiler, allocations, summary):
+    profiler.dump_stats(f"{base}.prof")
+
+    with open(f"{base}.txt", "w") as f:
+        f.write(f"{summary['name']}: {summary['seconds']} s, "
+                f"peak traced memory {summary['peak_bytes'] / 1024 / 1024:.1f} MiB\n")
+        f.write(f"cProfile threads: {summary['threads']}\n\n")
+
+        f.write(f"Top {PROFILE_TOP_FUNCTIONS} functions by cumulative time\n")
+        f.write(function_report(f"{base}.prof"))
+
+        f.write(f"\nTop {PROFILE_TOP_ALLOCATIONS} allocation sites still alive at the end\n")
+        for stat in allocations.statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]:
+            f.write(f"{stat.size / 1024:10.1f} KiB  {stat.count:8d} blocks  {stat.traceback}\n")
+
+    with open(f"{base}.json", "w") as f:
+        json.dump(summary, f, indent=2, default=str)
+
+
+def function_report(prof_path, limit=PROFILE_TOP_FUNCTIONS, sort="cumulative"):
+    out = io.StringIO()
+    stats = pstats.Stats(prof_path, stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def list_profiles():
+    """
+    Summaries of saved profiles, newest first.
+    """
+    directory = profiles_dir()
+    if not os.path.isdir(directory):
+        return []
+
+    summaries = []
+    for filename in sorted(os.listdir(directory), reverse=True):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as f:
+                summary = json.load(f)
+        except (OSError, ValueError):
+            continue
+        summary["base"] = os.path.join(directory, filename[:-len(".json")])
+        summaries.append(summary)
+
+    return summaries
@@ -6,8 +6,18 @@ using multiple relevance signals in an ATS-style manner.
 Final score is returned on a 0–10 scale.
 """
 
+import numpy as np
 
-def normalize_experience(experience_years, max_years=10):
+DEFAULT_WEIGHTS = {
+    "semantic": 0.55,     # Role relevance (embeddings)
+    "skills": 0.30,       # Explicit skill match
+    "experience": 0.15    # Experience relevance
+}
+
+MAX_EXPERIENCE_YEARS = 10  # experience at or above this scores 1.0
+
+
+def normalize_experience(experience_years, max_years=MAX_EXPERIENCE_YEARS):
     """
     Normalize experience into 0–1 range.
 
@@ -71,11 +81,7 @@ def calculate_final_score(
     # Default ATS-style weights
     # ----------------------------
     if weights is None:
-        weights = {
-            "semantic": 0.55,     # Role relevance (embeddings)
-            "skills": 0.30,       # Explicit skill match
-            "experience": 0.15    # Experience relevance
-        }
+        weights = DEFAULT_WEIGHTS
 
     # ----------------------------
     # Normalize inputs
@@ -99,3 +105,57 @@ def calculate_final_score(
     final_score = round(normalized_final * scale, 2)
 
     return final_score
+
+
+def calculate_final_scores(
+    semantic_similarity,
+    experience_years,
+    skill_overlap=0.0,
+    weights=None,
+    scale=10,
+    max_years=MAX_EXPERIENCE_YEARS
+):
+    """
+    Vectorized calculate_final_score() for many resumes at once.
+
+    Args:
+        semantic_similarity (array-like): cosine similarities (0–1)
+        experience_years (array-like): total experience per resume
+        skill_overlap (array-like | float): matched skill ratios (0–1)
+        weights (dict): optional ATS weight configuration
+        scale (int): output score scale (default 10)
+        max_years (int): experience cap, as in normalize_experience()
+
+    Returns:
+        np.ndarray: final match scores (0–10), same shape as inputs
+    """
+
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+
+    # ----------------------------
+    # Normalize inputs (NaN counts as 0, like the scalar helpers)
+    # ----------------------------
+    semantic_score = np.clip(
+        np.nan_to_num(np.asarray(semantic_similarity, dtype=np.float64)),
+        0.0, 1.0
+    )
+    skill_score = np.clip(
+        np.nan_to_num(np.asarray(skill_overlap, dtype=np.float64)),
+        0.0, 1.0
+    )
+    experience_score = np.clip(
+        np.nan_to_num(np.asarray(experience_years, dtype=np.float64)) / max_years,
+        0.0, 1.0
+    )
+
+    # ----------------------------
+    # Weighted score (0–1), scaled to 0–10
+    # ----------------------------
+    normalized_final = (
+        weights["semantic"] * semantic_score +
+        weights["skills"] * skill_score +
+        weights["experience"] * experience_score
+    )
+
+    return np.round(normalized_final * scale, 2)
@@ -82,3 +82,81 @@ def cosine_similarity(vec1, vec2, scale=10, min_match_threshold=0.25):
     except Exception as e:
         print("Similarity computation error:", e)
         return None
+
+
+def batch_cosine_similarity(resume_matrix, job_vectors, scale=10, min_match_threshold=0.25):
+    """
+    Vectorized cosine_similarity() over many resumes (and optionally
+    many jobs) at once, using the same scaling and no-match rules.
+
+    Args:
+        resume_matrix (array-like): (N, d) resume embeddings
+        job_vectors (array-like): (d,) job embedding or (K, d) job matrix
+        scale (int): output score scale (default = 10)
+        min_match_threshold (float): minimum normalized similarity
+                                     required to consider a match
+
+    Returns:
+        (np.ndarray, np.ndarray): scores (0–10) and a boolean no-match
+        mask, both shaped (N,) for one job or (N, K) for a job matrix.
+        Scores are NaN where the mask is True.
+    """
+
+    # -----------------------------
+    # 1. Input validation
+    # -----------------------------
+    resumes = np.asarray(resume_matrix, dtype=np.float32)
+    jobs = np.asarray(job_vectors, dtype=np.float32)
+
+    single_job = jobs.ndim == 1
+    if single_job:
+        jobs = jobs[np.newaxis, :]
+
+    if resumes.ndim != 2 or jobs.ndim != 2:
+        raise ValueError("Expected an (N, d) resume matrix and a (d,) or (K, d) job input")
+
+    if resumes.shape[1] != jobs.shape[1]:
+        raise ValueError(
+            f"Dimension mismatch: resumes {resumes.shape[1]}, jobs {jobs.shape[1]}"
+        )
+
+    # -----------------------------
+    # 2. Raw cosine similarity (zero vectors never match)
+    # -----------------------------
+    resume_norms = np.linalg.norm(resumes, axis=1)
+    job_norms = np.linalg.norm(jobs, axis=1)
+
+    zero = (resume_norms < 1e-8)[:, np.newaxis] | (job_norms < 1e-8)[np.newaxis, :]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw_similarity = (resumes @ jobs.T) / np.outer(resume_norms, job_norms)
+
+    raw_similarity = np.clip(raw_similarity, -1.0, 1.0).astype(np.float64)
+
+    # Convert from [-1, 1] → [0, 1]
+    normalized_similarity = (raw_similarity + 1.0) / 2.0
+
+    # -----------------------------
+    # 3. No-match validation
+    # -----------------------------
+    no_match = zero | ~(normalized_similarity >= min_match_threshold)
+
+    # -----------------------------
+    # 4. ATS-style non-linear scaling
+    # -----------------------------
+    adjusted_similarity = np.select(
+        [normalized_similarity < 0.4, normalized_similarity < 0.65],
+        [normalized_similarity * 0.7, normalized_similarity * 0.9],
+        np.minimum(normalized_similarity * 1.1, 1.0)
+    )
+
+    # -----------------------------
+    # 5. Scale to 0–10
+    # -----------------------------
+    scores = np.round(adjusted_similarity * scale, 2)
+    scores[no_match] = np.nan
+
+    if single_job:
+        return scores[:, 0], no_match[:, 0]
+
+    return scores, no_match
@@ -0,0 +1,504 @@
+"""
+vector_store.py
+
+Compact on-disk store of resume embeddings for large corpora.
+
+Vectors can be reduced with PCA and kept as float32, float16 or
+int8 codes with one float32 scale per vector (x ≈ code * scale).
+Files are plain .npy arrays opened memory-mapped, so processes
+share the OS page cache instead of each holding a float32 copy.
+Similarities are computed block by block on the compact arrays;
+only one block is ever widened to float32 at a time.
+
+Each save writes a new version directory under VECTOR_STORE_DIR and
+then atomically repoints the CURRENT file at it, so readers always
+find a complete store. The version it replaces is kept (PREVIOUS) for
+processes still reading it; older ones are removed. Building and
+appending happen offline (build_vector_store, the ranking worker);
+the ranking path only loads the current version.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+from django.db.models import Max
+
+from core.services.cache_service import CACHE_DIR
+
+# --------------------------------------------------
+# Configuration
+# --------------------------------------------------
+VECTOR_STORE_DIR = os.getenv(
+    "VECTOR_STORE_DIR",
+    os.path.join(CACHE_DIR, "vector_store")
+)
+VECTOR_STORE_ENABLED = os.getenv("VECTOR_STORE_ENABLED", "0") == "1"
+VECTOR_STORE_DTYPE = os.getenv("VECTOR_STORE_DTYPE", "int8")  # float32 | float16 | int8
+VECTOR_STORE_PCA_DIM = int(os.getenv("VECTOR_STORE_PCA_DIM", "0"))  # 0 = no PCA
+VECTOR_STORE_BLOCK_ROWS = 4096  # rows widened to float32 per step
+VECTOR_STORE_SYNC_INTERVAL = float(os.getenv("VECTOR_STORE_SYNC_INTERVAL", "60"))  # seconds, idle worker
+
+DTYPES = ("float32", "float16", "int8")
+
+
+# --------------------------------------------------
+# Quantization helpers
+# --------------------------------------------------
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-8)
+
+
+def quantize(vectors, dtype):
+    """
+    Return (codes, scales); scales is None except for int8.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+
+    if dtype == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales = np.maximum(scales, 1e-12).astype(np.float32)
+        codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales
+
+    return vectors.astype(dtype), None
+
+
+class CompactVectorStore:
+    """
+    Read-mostly matrix of (optionally PCA-reduced) L2-normalized
+    vectors keyed by int ids. Similarity is the dot product.
+    """
+
+    def __init__(self, ids, codes, scales=None, pca_mean=None,
+                 pca_components=None, dtype="float32", model_id="", version=None,
+                 synced_at=0.0):
+        self.ids = ids
+        self.codes = codes
+        self.scales = scales
+        self.pca_mean = pca_mean
+        self.pca_components = pca_components
+        self.dtype = dtype
+        self.model_id = model_id
+        self.version = version  # directory name under VECTOR_STORE_DIR, once saved
+        self.synced_at = synced_at  # newest CandidateProfile.updated_at stored (epoch seconds)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def max_id(self):
+        return int(self.ids.max()) if len(self.ids) else 0
+
+    @property
+    def dim(self):
+        return self.codes.shape[1]
+
+    @property
+    def nbytes(self):
+        size = self.codes.nbytes + self.ids.nbytes
+        if self.scales is not None:
+            size += self.scales.nbytes
+        return size
+
+    # --------------------------------------------------
+    # Building
+    # --------------------------------------------------
+    @classmethod
+    def build(cls, ids, vectors, dtype=VECTOR_STORE_DTYPE,
+              pca_dim=VECTOR_STORE_PCA_DIM, model_id=""):
+        """
+        Fit the PCA projection (if pca_dim) and quantize every vector.
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown vector store dtype: {dtype}")
+
+        vectors = _normalize(vectors)
+        pca_mean = pca_components = None
+
+        if pca_dim and pca_dim < vectors.shape[1]:
+            from sklearn.decomposition import PCA  # slow import, build only
+
+            pca = PCA(n_components=min(pca_dim, len(vectors)), random_state=0).fit(vectors)
+            pca_mean = pca.mean_.astype(np.float32)
+            pca_components = pca.components_.astype(np.float32)
+
+        store = cls(
+            np.zeros(0, dtype=np.int64),
+            np.zeros((0, 0), dtype=dtype),
+            pca_mean=pca_mean,
+            pca_components=pca_components,
+            dtype=dtype,
+            model_id=model_id,
+        )
+        store.ids = np.asarray(ids, dtype=np.int64)
+        store.codes, store.scales = quantize(store.project(vectors), dtype)
+        return store
+
+    def add(self, ids, vectors, directory=VECTOR_STORE_DIR):
+        """
+        Save a new version with vectors appended (existing projection)
+        and return it, memory-mapped. The stored codes are copied
+        block by block, never loaded whole.
+        """
+        codes, scales = quantize(self.project(vectors), self.dtype)
+        return self.save(directory, tail=(np.asarray(ids, dtype=np.int64), codes, scales))
+
+    def project(self, vectors):
+        """
+        Map full-size vectors into the store's space (normalized).
+        """
+        vectors = _normalize(vectors)
+        if self.pca_components is not None:
+            vectors = _normalize((vectors - self.pca_mean) @ self.pca_components.T)
+        return vectors
+
+    # --------------------------------------------------
+    # Search
+    # --------------------------------------------------
+    def similarities(self, queries):
+        """
+        Dot products of every stored vector with full-size queries:
+        (N,) for one query vector, (N, K) for K query rows.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        single = queries.ndim == 1
+        projected = self.project(queries.reshape(-1, queries.shape[-1]))
+
+        scores = np.empty((len(self.ids), len(projected)), dtype=np.float32)
+        buffer = np.empty((min(VECTOR_STORE_BLOCK_ROWS, len(self.ids)), self.dim), dtype=np.float32)
+
+        for start in range(0, len(self.ids), VECTOR_STORE_BLOCK_ROWS):
+            codes = self.codes[start:start + VECTOR_STORE_BLOCK_ROWS]
+            if codes.dtype == np.float32:
+                block = codes
+            else:
+                block = buffer[:len(codes)]
+                np.copyto(block, codes, casting="unsafe")
+
+            # int8: (code * scale) . q == (code . q) * scale
+            block_scores = scores[start:start + len(codes)]
+            np.matmul(block, projected.T, out=block_scores)
+            if self.scales is not None:
+                block_scores *= self.scales[start:start + len(codes), None]
+
+        return scores[:, 0] if single else scores
+
+    def search(self, query, k):
+        """
+        Return (ids, similarities) of the top-k vectors, best first.
+        """
+        if not len(self.ids) or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        scores = self.similarities(query)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return np.asarray(self.ids[top]), scores[top]
+
+    # --------------------------------------------------
+    # Persistence
+    # --------------------------------------------------
+    def save(self, directory=VECTOR_STORE_DIR, tail=None):
+        """
+        Write the store (plus `tail` rows from add()) as a new version
+        and make it current. Returns the saved store, memory-mapped.
+        """
+        os.makedirs(directory, exist_ok=True)
+        version_dir = tempfile.mkdtemp(dir=directory, prefix="v-")
+        tail_ids, tail_codes, tail_scales = tail or (None, None, None)
+
+        try:
+            _write_rows(os.path.join(version_dir, "ids.npy"), self.ids, tail_ids)
+            _write_rows(os.path.join(version_dir, "codes.npy"), self.codes, tail_codes)
+            if self.scales is not None:
+                _write_rows(os.path.join(version_dir, "scales.npy"), self.scales, tail_scales)
+            if self.pca_components is not None:
+                np.save(os.path.join(version_dir, "pca_mean.npy"), self.pca_mean)
+                np.save(os.path.join(version_dir, "pca_components.npy"), self.pca_components)
+
+            with open(os.path.join(version_dir, "meta.json"), "w") as f:
+                json.dump({
+                    "dtype": self.dtype,
+                    "model_id": self.model_id,
+                    "synced_at": self.synced_at,
+                }, f)
+
+            _publish(directory, os.path.basename(version_dir))
+        except BaseException:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            raise
+
+        return self.load(directory)
+
+    @classmethod
+    def load(cls, directory=VECTOR_STORE_DIR):
+        """
+        Open the current version (FileNotFoundError if none).
+        """
+        try:
+            return cls._load_version(directory, _current_version(directory))
+        except FileNotFoundError:
+            # Replaced and removed between reading CURRENT and opening it
+            return cls._load_version(directory, _current_version(directory))
+
+    @classmethod
+    def _load_version(cls, directory, version):
+        if version is None:
+            raise FileNotFoundError(f"No vector store in {directory}")
+        version_dir = os.path.join(directory, version)
+
+        def array(name, mmap_mode="r"):
+            path = os.path.join(version_dir, name)
+            return np.load(path, mmap_mode=mmap_mode) if os.path.exists(path) else None
+
+        with open(os.path.join(version_dir, "meta.json")) as f:
+            meta = json.load(f)
+
+        return cls(
+            array("ids.npy", mmap_mode=None),
+            array("codes.npy"),
+            scales=array("scales.npy"),
+            pca_mean=array("pca_mean.npy", mmap_mode=None),
+            pca_components=array("pca_components.npy", mmap_mode=None),
+            dtype=meta["dtype"],
+            model_id=meta["model_id"],
+            version=version,
+            synced_at=meta.get("synced_at", 0.0),
+        )
+
+
+def _write_rows(path, head, tail=None):
+    """
+    Write head (possibly memory-mapped) followed by tail to one .npy
+    file, copying VECTOR_STORE_BLOCK_ROWS rows at a time.
+    """
+    tail_rows = len(tail) if tail is not None else 0
+    out = np.lib.format.open_memmap(
+        path, mode="w+", dtype=head.dtype,
+        shape=(len(head) + tail_rows, *head.shape[1:])
+    )
+
+    for start in range(0, len(head), VECTOR_STORE_BLOCK_ROWS):
+        block = head[start:start + VECTOR_STORE_BLOCK_ROWS]
+        out[start:start + len(block)] = block
+    if tail_rows:
+        out[len(head):] = tail
+
+    out.flush()
+    del out
+
+
+def _current_version(directory, pointer="CURRENT"):
+    try:
+        with open(os.path.join(directory, pointer)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_pointer(directory, pointer, version):
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{pointer}-")
+    with os.fdopen(fd, "w") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(directory, pointer))
+
+
+def _publish(directory, version):
+    """
+    Atomically point CURRENT at `version`. The version it replaces
+    stays on disk as PREVIOUS, so processes that loaded it just before
+    the switch can still open it; the one before that is removed.
+    Only published versions are ever removed, never one a concurrent
+    save is still writing.
+    """
+    previous = _current_version(directory)
+    retired = _current_version(directory, "PREVIOUS")
+
+    if previous and previous != version:
+        _write_pointer(directory, "PREVIOUS", previous)
+    _write_pointer(directory, "CURRENT", version)
+
+    if retired and retired not in (previous, version):
+        shutil.rmtree(os.path.join(directory, retired), ignore_errors=True)
+
+
+# --------------------------------------------------
+# Drift against full precision
+# --------------------------------------------------
+def drift_report(store, vectors, queries, k=50):
+    """
+    Compare store rankings with exact float32 rankings of the same
+    vectors (rows in store order) for each query.
+    """
+    from scipy.stats import spearmanr
+
+    vectors = _normalize(vectors)
+    queries = _normalize(np.asarray(queries, dtype=np.float32).reshape(-1, vectors.shape[1]))
+    k = min(k, len(vectors))
+
+    exact = queries @ vectors.T  # (K, N)
+    compact = store.similarities(queries).T
+
+    overlaps = []
+    correlations = []
+    for exact_scores, compact_scores in zip(exact, compact):
+        truth = set(np.argpartition(-exact_scores, k - 1)[:k].tolist())
+        found = set(np.argpartition(-compact_scores, k - 1)[:k].tolist())
+        overlaps.append(len(truth & found) / k)
+        correlations.append(spearmanr(exact_scores, compact_scores).correlation)
+
+    full_bytes = vectors.nbytes + len(vectors) * 8  # float32 + int64 ids
+    return {
+        "dtype": store.dtype,
+        "dim": store.dim,
+        "vectors": len(vectors),
+        "bytes": int(store.nbytes),
+        "compression": round(full_bytes / max(store.nbytes, 1), 2),
+        "k": k,
+        "recall_at_k": round(float(np.mean(overlaps)), 4),
+        "spearman_mean": round(float(np.nanmean(correlations)), 4),
+        "score_abs_error_mean": round(float(np.abs(exact - compact).mean()), 5),
+    }
+
+
+# --------------------------------------------------
+# Corpus store (kept in sync with CandidateProfile rows)
+# --------------------------------------------------
+_corpus_store = None
+_corpus_store_lock = threading.Lock()
+
+
+def _stored_vectors(exclude=None):
+    """
+    (ids, vectors) of the profiles embedded with the current model,
+    except the ids in `exclude`.
+    """
+    from core.models import CandidateProfile
+    from core.services.embedding_service import EMBEDDING_MODEL_ID
+
+    profiles = CandidateProfile.objects.filter(embedding_model=EMBEDDING_MODEL_ID)
+    if exclude is not None and len(exclude):
+        stored = np.fromiter(profiles.values_list("pk", flat=True), dtype=np.int64)
+        profiles = profiles.filter(pk__in=np.setdiff1d(stored, exclude).tolist())
+
+    rows = list(profiles.order_by("pk").values_list("pk", "embedding"))
+    ids = [pk for pk, _ in rows]
+    vectors = [np.frombuffer(bytes(blob), dtype=np.float32) for _, blob in rows]
+    return ids, (np.vstack(vectors) if vectors else None)
+
+
+def get_corpus_store():
+    """
+    Return the current persisted store for the ranking path, or None
+    when there is none for the current embedding model yet. Never
+    builds: sync_corpus_store() does that offline.
+    """
+    from core.services.embedding_service import EMBEDDING_MODEL_ID
+
+    global _corpus_store
+
+    with _corpus_store_lock:
+        version = _current_version(VECTOR_STORE_DIR)
+
+        if version is None:
+            _corpus_store = None
+        elif _corpus_store is None or _corpus_store.version != version:
+            try:
+                _corpus_store = CompactVectorStore.load(VECTOR_STORE_DIR)
+            except Exception as e:
+                print("Vector store load error:", e)
+                _corpus_store = None
+
+        if _corpus_store is not None and _corpus_store.model_id != EMBEDDING_MODEL_ID:
+            return None
+
+        return _corpus_store
+
+
+def _is_stale(store):
+    """
+    True when the store holds vectors that are no longer current:
+    profiles deleted, re-embedded with another model, or updated
+    (re-embedded) since the store was synced.
+    """
+    from core.models import CandidateProfile
+    from core.services.embedding_service import EMBEDDING_MODEL_ID
+
+    profiles = CandidateProfile.objects.filter(embedding_model=EMBEDDING_MODEL_ID)
+
+    stored = np.fromiter(profiles.values_list("pk", flat=True), dtype=np.int64)
+    if len(np.setdiff1d(store.ids, stored)):
+        return True
+
+    updated = profiles.filter(updated_at__gt=datetime.fromtimestamp(store.synced_at, tz=timezone.utc))
+    updated = np.fromiter(updated.values_list("pk", flat=True), dtype=np.int64)
+    return bool(len(np.intersect1d(updated, store.ids)))
+
+
+def _newest_update():
+    from core.models import CandidateProfile
+    from core.services.embedding_service import EMBEDDING_MODEL_ID
+
+    newest = CandidateProfile.objects.filter(
+        embedding_model=EMBEDDING_MODEL_ID
+    ).aggregate(newest=Max("updated_at"))["newest"]
+    return newest.timestamp() if newest else 0.0
+
+
+def sync_corpus_store(rebuild=False, dtype=VECTOR_STORE_DTYPE, pca_dim=VECTOR_STORE_PCA_DIM):
+    """
+    Bring the persisted store up to date with the stored profiles:
+    append the ones it does not hold yet, or rebuild it when it was
+    made for another embedding model, when stored profiles were
+    updated or deleted since (keeping its dtype and PCA size), or
+    with rebuild. Returns the current store (None for an empty corpus).
+    """
+    from core.services.embedding_service import EMBEDDING_MODEL_ID
+
+    global _corpus_store
+
+    with _corpus_store_lock:
+        store = None
+        if not rebuild and _current_version(VECTOR_STORE_DIR) is not None:
+            try:
+                store = CompactVectorStore.load(VECTOR_STORE_DIR)
+            except Exception as e:
+                print("Vector store load error:", e)
+
+        if store is not None and store.model_id != EMBEDDING_MODEL_ID:
+            store = None
+
+        # Taken before reading rows: later updates are caught next sync
+        synced_at = _newest_update()
+
+        if store is not None and _is_stale(store):
+            print("Vector store has updated or deleted resumes, rebuilding")
+            dtype = store.dtype
+            pca_dim = store.dim if store.pca_components is not None else 0
+            store = None
+
+        ids, vectors = _stored_vectors(exclude=store.ids if store is not None else None)
+
+        if vectors is not None:
+            if store is None:
+                store = CompactVectorStore.build(
+                    ids, vectors, dtype=dtype, pca_dim=pca_dim,
+                    model_id=EMBEDDING_MODEL_ID
+                )
+                store.synced_at = synced_at
+                store = store.save(VECTOR_STORE_DIR)
+            else:
+                store.synced_at = max(store.synced_at, synced_at)
+                store = store.add(ids, vectors, VECTOR_STORE_DIR)
+
+        _corpus_store = store
+        return store
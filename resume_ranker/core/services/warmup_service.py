@@ -0,0 +1,67 @@
+"""
+warmup_service.py
+
+Explicit model warm-up for serving processes. Models are loaded
+lazily on first use, so management commands such as migrate or
+check never pay for them; serving processes call warmup_models()
+(or set WARMUP_MODELS_ON_STARTUP=1) to load them before traffic.
+With a shared model server running, nothing is loaded locally.
+"""
+
+import threading
+import time
+
+from core.services import embedding_service, genai_service, model_client
+
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+
+
+def warmup_models():
+    """
+    Load the embedding model (on the configured backend) and the
+    spaCy model, and run one tiny inference
+    through each so lazy internals are initialized too.
+    Nothing is loaded when a shared model server is answering with
+    the same encoder (ENCODER_ID).
+    Returns load timings in seconds.
+    """
+
+    timings = {}
+
+    if model_client.embedding_dimension(embedding_service.ENCODER_ID) is not None:
+        timings["model_server"] = 0.0
+        return timings
+
+    start = time.perf_counter()
+    embedding_service.encode_local(["warm up"])  # on the configured backend
+    timings["embedding_model"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    genai_service.get_nlp()("John Smith")
+    timings["spacy_model"] = round(time.perf_counter() - start, 3)
+
+    return timings
+
+
+def start_background_warmup():
+    """
+    Warm models up in a daemon thread (once per process).
+    """
+
+    global _warmup_thread
+
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(
+                target=warmup_models,
+                name="model-warmup",
+                daemon=True
+            )
+            _warmup_thread.start()
+
+
+def models_ready():
+    if embedding_service.is_model_loaded() and genai_service.is_nlp_loaded():
+        return True
+    return model_client.embedding_dimension(embedding_service.ENCODER_ID) is not None
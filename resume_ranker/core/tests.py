@@ -1,3 +1,437 @@
-from django.test import TestCase
+import asyncio
+import os
+import re
+import shutil
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from core.services import corpus_service, embedding_service, onnx_backend
+from core.services.admission_service import (
+    AdmissionError,
+    Deadline,
+    check_content_length,
+    check_uploads,
+)
+from core.services.concurrency_service import RANKING_RETRY_AFTER, ConcurrencyLimiter, Overloaded
+
+from core.services.genai_service import (
+    CERT_KEYWORDS,
+    EDUCATION_LEVELS,
+    SKILL_ALIASES,
+    SKILL_KEYWORDS,
+    extract_certifications,
+    extract_education,
+    extract_skills,
+)
+from core.services.keyword_service import KeywordMatcher, trie_pattern
+from core.services.scoring_service import calculate_final_score, calculate_final_scores
+from core.services.similarity_service import batch_cosine_similarity, cosine_similarity
+from core.services.warmup_service import warmup_models
+
+
+class BatchScoringTests(SimpleTestCase):
+    """
+    The vectorized helpers must agree with their scalar versions.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.resumes = rng.normal(size=(50, 8)).astype(np.float32)
+        self.resumes[3] = 0.0  # zero vector: never a match
+        self.resumes[7] = -self.resumes[8]  # far apart from its neighbour
+        self.jobs = rng.normal(size=(3, 8)).astype(np.float32)
+
+    def assert_matches_scalar(self, scores, no_match, job):
+        for resume, score, missing in zip(self.resumes, scores, no_match):
+            expected = cosine_similarity(resume, job)
+            if expected is None:
+                self.assertTrue(missing)
+                self.assertTrue(np.isnan(score))
+            else:
+                self.assertFalse(missing)
+                self.assertAlmostEqual(float(score), expected, places=2)
+
+    def test_single_job_matches_cosine_similarity(self):
+        job = self.resumes[8]
+        scores, no_match = batch_cosine_similarity(self.resumes, job)
+
+        self.assertEqual(scores.shape, (len(self.resumes),))
+        self.assertTrue(no_match[3])
+        self.assertTrue(no_match[7])
+        self.assert_matches_scalar(scores, no_match, job)
+
+    def test_job_matrix_matches_cosine_similarity(self):
+        scores, no_match = batch_cosine_similarity(self.resumes, self.jobs)
+
+        self.assertEqual(scores.shape, (len(self.resumes), len(self.jobs)))
+        for k, job in enumerate(self.jobs):
+            self.assert_matches_scalar(scores[:, k], no_match[:, k], job)
+
+    def test_dimension_mismatch_raises(self):
+        with self.assertRaises(ValueError):
+            batch_cosine_similarity(self.resumes, np.ones(4, dtype=np.float32))
+
+    def test_final_scores_match_calculate_final_score(self):
+        rng = np.random.default_rng(1)
+        similarity = rng.uniform(-0.2, 1.2, size=40)
+        experience = rng.uniform(0, 15, size=40)
+        overlap = rng.uniform(0, 1, size=40)
+
+        scores = calculate_final_scores(similarity, experience, overlap)
+
+        for score, args in zip(scores, zip(similarity, experience, overlap)):
+            self.assertAlmostEqual(float(score), calculate_final_score(*args), places=2)
+
+    def test_final_scores_accept_scalar_skill_overlap(self):
+        scores = calculate_final_scores([0.5, 0.9], [2, 12])
+        self.assertEqual(
+            list(scores),
+            [calculate_final_score(0.5, 2), calculate_final_score(0.9, 12)]
+        )
+
+
+# Resume text where every keyword is a separate word, so the one-pass
+# matcher must find what the old substring checks found (except "c"
+# and "r", which those found inside any word)
+RESUME_TEXT = """
+Jane Doe
+B.Tech in Computer Science, M.Tech (pursuing)
+Skills: Python, SQL, Machine Learning, NLP, Docker, Git, Power BI, sklearn
+Worked with pandas and numpy on AWS; some ML and CV projects
+Certifications
+AWS Certified Cloud Practitioner
+Deep Learning Specialization - Coursera
+"""
+
+
+def substring_skills(text):
+    """
+    extract_skills() before the keyword matcher (substring checks).
+    """
+    text = text.lower()
+    found = {skill for skill in SKILL_KEYWORDS if skill in text}
+    found |= {canonical for alias, canonical in SKILL_ALIASES.items() if alias in text}
+    return sorted(s.title() for s in found)
+
+
+def substring_education(text):
+    text = text.lower()
+    found = [
+        (label, rank)
+        for label, rank, patterns in EDUCATION_LEVELS
+        if any(p in text for p in patterns)
+    ]
+    return max(found, key=lambda x: x[1])[0] if found else "Unknown"
+
+
+def substring_certifications(text):
+    return [
+        line.strip()
+        for line in text.splitlines()
+        if any(k in line.lower() for k in CERT_KEYWORDS)
+    ]
+
+
+class KeywordMatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.matcher = KeywordMatcher(
+            [("c", "c"), ("c++", "c++"), ("r", "r"), ("aws certified", "cert"), ("aws", "aws")],
+            tagged_prefixes=[("coursera", "course")]
+        )
+
+    def test_short_keywords_only_match_whole_words(self):
+        self.assertEqual(self.matcher.tags("react, rust, docker and cobol"), set())
+        self.assertEqual(self.matcher.tags("R and C"), {"r", "c"})
+
+    def test_longest_keyword_wins(self):
+        self.assertEqual(self.matcher.tags("C++ only"), {"c++"})
+
+    def test_symbol_keywords_keep_their_boundary(self):
+        self.assertEqual(self.matcher.tags("c++11"), {"c++"})
+        self.assertEqual(self.matcher.tags("C#10 and c+"), set())
+        self.assertEqual(self.matcher.tags("C/C++, C."), {"c", "c++"})
+
+    def test_nested_keyword_tags(self):
+        self.assertEqual(self.matcher.tags("AWS Certified"), {"cert", "aws"})
+
+    def test_prefix_keywords_run_to_the_end_of_the_word(self):
+        matches = list(self.matcher.finditer("via CourseraML"))
+        self.assertEqual([(start, end) for start, end, _ in matches], [(4, 14)])
+        self.assertEqual(self.matcher.tags("precoursera"), set())
+
+    def test_trie_pattern_matches_every_word(self):
+        words = ["py", "python", "pytorch", "pandas"]
+        pattern = re.compile(r"(?:" + trie_pattern(words) + r")$")
+        for word in words:
+            self.assertTrue(pattern.match(word), word)
+
+
+class KeywordExtractionTests(SimpleTestCase):
+    def test_same_results_as_substring_checks(self):
+        self.assertEqual(
+            extract_skills(RESUME_TEXT),
+            [skill for skill in substring_skills(RESUME_TEXT) if skill not in ("C", "R")]
+        )
+        self.assertEqual(extract_education(RESUME_TEXT), substring_education(RESUME_TEXT))
+        self.assertEqual(
+            extract_certifications(RESUME_TEXT),
+            substring_certifications(RESUME_TEXT)
+        )
+
+    def test_letters_inside_words_are_not_skills(self):
+        skills = extract_skills("Experienced in react and rust, worked at a cafe")
+        self.assertNotIn("R", skills)
+        self.assertNotIn("C", skills)
+
+    def test_versioned_cpp_is_not_c(self):
+        skills = extract_skills("Modern C++11 and C++17 development")
+        self.assertIn("C++", skills)
+        self.assertNotIn("C", skills)
+
+    def test_certification_plurals_and_run_on_words(self):
+        text = "Certifications:\nAWS Certified Developer\nCourseraML course"
+        self.assertEqual(
+            extract_certifications(text),
+            ["Certifications:", "AWS Certified Developer", "CourseraML course"]
+        )
+
+
+class StagedReadTests(TestCase):
+    """
+    read_files_staged() with OCR replaced by the file's own text.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def read(self, file_paths, extract=None, **kwargs):
+        def read_text(path, digest=None):
+            with open(path) as f:
+                return f.read()
+
+        with mock.patch.object(corpus_service, "extract_text_from_file", extract or read_text):
+            return list(corpus_service.read_files_staged(file_paths, **kwargs))
+
+    def test_order_and_duplicates(self):
+        paths = [
+            self.write("a.txt", "Python developer with five years of Django"),
+            self.write("b.txt", "Java engineer, Spring and Kafka"),
+            self.write("a-copy.txt", "Python developer with five years of Django"),
+            self.write("c.txt", "Data analyst, SQL and Power BI"),
+        ]
+
+        pairs = sorted(pair for batch in self.read(paths, batch_size=2) for pair in batch)
+
+        self.assertEqual([index for index, _ in pairs], [0, 1, 3])
+        for index, profile in pairs:
+            self.assertEqual(profile.file_path, paths[index])
+            self.assertIsNone(profile.pk)
+
+    def test_known_profiles_come_first_from_the_database(self):
+        paths = [
+            self.write("a.txt", "Python developer with five years of Django"),
+            self.write("b.txt", "Java engineer, Spring and Kafka"),
+        ]
+        known = self.read(paths[:1])[0][0][1]
+        known.features_version = corpus_service.FEATURES_VERSION
+        known.save()
+
+        batches = self.read(paths)
+
+        self.assertEqual([(index, profile.pk) for index, profile in batches[0]], [(0, known.pk)])
+        self.assertEqual([index for index, _ in batches[1]], [1])
+
+    def test_failing_resume_is_dropped_alone(self):
+        paths = [
+            self.write("a.txt", "Python developer with five years of Django"),
+            self.write("broken.txt", "unreadable"),
+            self.write("c.txt", "Data analyst, SQL and Power BI"),
+        ]
+
+        def extract(path, digest=None):
+            if path.endswith("broken.txt"):
+                raise RuntimeError("OCR failed")
+            with open(path) as f:
+                return f.read()
+
+        pairs = sorted(pair for batch in self.read(paths, extract) for pair in batch)
+
+        self.assertEqual([index for index, _ in pairs], [0, 2])
+
+    def test_ocr_reuses_the_upload_hash(self):
+        path = self.write("a.txt", "Python developer with five years of Django")
+        digests = []
+
+        def extract(path, digest=None):
+            digests.append(digest)
+            with open(path) as f:
+                return f.read()
+
+        self.read([path], extract)
+
+        self.assertEqual(digests, [corpus_service.file_sha256(path)])
+
+    def test_partial_batch_is_flushed_after_max_wait(self):
+        paths = [
+            self.write("a.txt", "Python developer with five years of Django"),
+            self.write("slow.txt", "Java engineer, Spring and Kafka"),
+        ]
+
+        def extract(path, digest=None):
+            if path.endswith("slow.txt"):
+                time.sleep(0.5)
+            with open(path) as f:
+                return f.read()
+
+        with mock.patch.object(corpus_service, "PIPELINE_OCR_THREADS", 2):
+            batches = self.read(paths, extract, batch_size=10, max_wait=0.05)
+
+        self.assertEqual([[index for index, _ in batch] for batch in batches], [[0], [1]])
+
+
+class ConcurrencyLimiterTests(SimpleTestCase):
+    def test_try_acquire_respects_the_limit(self):
+        limiter = ConcurrencyLimiter(2)
+
+        self.assertTrue(limiter.try_acquire())
+        self.assertTrue(limiter.try_acquire())
+        self.assertFalse(limiter.try_acquire())
+
+        limiter.release()
+        self.assertTrue(limiter.try_acquire())
+        self.assertEqual(limiter.active, 2)
+
+    def test_release_hands_the_slot_to_the_first_waiter(self):
+        limiter = ConcurrencyLimiter(1, max_waiting=2, timeout=5)
+        order = []
+
+        async def run(name):
+            await limiter.acquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            limiter.release()
+
+        async def main():
+            await limiter.acquire()  # hold the only slot
+            tasks = [asyncio.create_task(run(name)) for name in ("first", "second")]
+            await asyncio.sleep(0.01)
+            self.assertEqual(limiter.waiting, 2)
+            limiter.release()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(main())
+
+        self.assertEqual(order, ["first", "second"])
+        self.assertEqual((limiter.active, limiter.waiting), (0, 0))
+
+    def test_overloaded_when_the_queue_is_full_or_the_wait_times_out(self):
+        limiter = ConcurrencyLimiter(1, max_waiting=1, timeout=0.05)
+
+        async def main():
+            await limiter.acquire()
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0)
+
+            with self.assertRaises(Overloaded):
+                await limiter.acquire()  # nobody else may wait
+            with self.assertRaises(Overloaded):
+                await waiter  # no slot within the timeout
+
+        asyncio.run(main())
+
+        self.assertEqual((limiter.active, limiter.waiting), (1, 0))
+
+    def test_corpus_ranking_is_limited(self):
+        with mock.patch("core.views.ranking_limiter", ConcurrencyLimiter(1)) as limiter:
+            limiter.try_acquire()  # every slot busy
+            response = self.client.post(
+                "/corpus/rank/",
+                {"job_description": "Python developer"},
+                HTTP_ACCEPT="application/json"
+            )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], str(RANKING_RETRY_AFTER))
+
+
+class DeadlineTests(SimpleTestCase):
+    def test_without_a_budget_never_expires(self):
+        deadline = Deadline(0)
+
+        self.assertIsNone(deadline.remaining())
+        self.assertFalse(deadline.expired())
+
+    def test_expires_after_its_budget(self):
+        deadline = Deadline(0.05)
+
+        self.assertFalse(deadline.expired())
+        time.sleep(0.06)
+        self.assertTrue(deadline.expired())
+        self.assertEqual(deadline.remaining(), 0.0)
+
+    def test_unprocessed_files_in_input_order(self):
+        deadline = Deadline(10)
+        deadline.give_up(4, "e.pdf")
+        deadline.give_up(1, "b.pdf")
+        deadline.give_up(4, "e.pdf")
+
+        self.assertEqual(deadline.unprocessed, ["b.pdf", "e.pdf"])
+
+
+class UploadBudgetTests(SimpleTestCase):
+    def test_only_resume_files_count(self):
+        uploads = [SimpleUploadedFile(f"{i}.pdf", b"%PDF") for i in range(2)]
+        uploads += [SimpleUploadedFile(f"{i}.txt", b"notes") for i in range(5)]
+
+        with mock.patch("core.services.admission_service.MAX_FILES_PER_REQUEST", 2):
+            check_uploads(uploads)
+            with self.assertRaises(AdmissionError):
+                check_uploads(uploads + [SimpleUploadedFile("c.png", b"png")])
+
+    def test_content_length_checked_before_the_body(self):
+        request = RequestFactory().post("/rank/", data=b"", content_type="text/plain")
+        request.META["CONTENT_LENGTH"] = str(10 ** 12)
+
+        with self.assertRaises(AdmissionError) as raised:
+            check_content_length(request)
+        self.assertEqual(raised.exception.status, 413)
+
+
+class FakeOnnxEncoder:
+    dimension = 4
+
+    def __init__(self, out_dir, quantized=False):
+        pass
+
+    def encode(self, texts):
+        return np.ones((len(texts), self.dimension), dtype=np.float32) / 2
+
+
+class WarmupTests(SimpleTestCase):
+    def test_ready_after_warmup_on_onnx_backend(self):
+        with mock.patch.object(embedding_service, "EMBEDDING_BACKEND", "onnx"), \
+                mock.patch.object(embedding_service, "_onnx_encoder", None), \
+                mock.patch.object(embedding_service, "get_model", side_effect=AssertionError("torch loaded")), \
+                mock.patch.object(onnx_backend, "ensure_exported", return_value="unused"), \
+                mock.patch.object(onnx_backend, "OnnxEncoder", FakeOnnxEncoder), \
+                mock.patch("core.services.model_client.embedding_dimension", return_value=None):
+            self.assertEqual(self.client.get("/ready/").status_code, 503)
+
+            warmup_models()
+
+            self.assertIsInstance(embedding_service._onnx_encoder, FakeOnnxEncoder)
+            response = self.client.get("/ready/")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), {"ready": True})
@@ -1,7 +1,14 @@
 from django.urls import path
-from .views import home, rank_resumes
+from .views import home, readiness, metrics, rank_resumes, rank_stream, rank_stream_async, job_detail, job_status, rank_corpus_view
 
 urlpatterns = [
     path("", home, name="home"),
     path("rank/", rank_resumes, name="rank"),
-]
\ No newline at end of file
+    path("rank/stream/", rank_stream, name="rank_stream"),
+    path("rank/stream/async/", rank_stream_async, name="rank_stream_async"),
+    path("ready/", readiness, name="ready"),
+    path("metrics/", metrics, name="metrics"),
+    path("jobs/<uuid:job_id>/", job_detail, name="job_detail"),
+    path("jobs/<uuid:job_id>/status/", job_status, name="job_status"),
+    path("corpus/rank/", rank_corpus_view, name="rank_corpus"),
+]
@@ -1,21 +1,87 @@
-from django.shortcuts import render
+from django.shortcuts import render, redirect, get_object_or_404
 from django.core.files.storage import FileSystemStorage
 from django.contrib import messages
-from core.pipelines.resume_pipeline import analyze_and_rank_resumes
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from core.models import RankingJob
+from core.services.job_service import enqueue_ranking_job
+from core.services.warmup_service import models_ready
+from core.services.metrics_service import render_prometheus, trace
+from core.services.profiling_service import profiled, should_profile
+from core.services.concurrency_service import (
+    RANKING_RETRY_AFTER,
+    ClosingIterator,
+    ExecutorStream,
+    Overloaded,
+    get_pipeline_executor,
+    ranking_limiter,
+    run_io,
+)
+from core.services.admission_service import (
+    ALLOWED_EXTENSIONS,
+    AdmissionError,
+    Deadline,
+    check_content_length,
+    check_job_queue,
+    check_pages,
+    check_uploads,
+    limit_upload,
+)
+from core.pipelines.resume_pipeline import iter_fast_rank_resumes, iter_rank_resumes, rank_corpus
+from contextlib import nullcontext
+import json
 import os
 import uuid
 
-# Allowed resume file extensions
-ALLOWED_EXTENSIONS = [".pdf", ".jpg", ".jpeg", ".png"]
+# Incremental pipelines behind rank_stream
+STREAM_PIPELINES = {
+    RankingJob.MODE_FULL: iter_rank_resumes,
+    RankingJob.MODE_FAST: iter_fast_rank_resumes,
+}
 
 def home(request):
-    return render(request, "index.html")
+    # Under ASGI the live leaderboard streams from the async view
+    stream_view = "rank_stream_async" if isinstance(request, ASGIRequest) else "rank_stream"
+    return render(request, "index.html", {"stream_url": reverse(stream_view)})
 
 
+def readiness(request):
+    """
+    Readiness probe: 200 once the models are loaded, 503 before.
+    """
+    ready = models_ready()
+    return JsonResponse({"ready": ready}, status=200 if ready else 503)
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint: stage timings of all processes,
+    OCR page counts, cache hit ratios and queue depth.
+    """
+    return HttpResponse(
+        render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+# The upload views are csrf_exempt so that CsrfViewMiddleware does not
+# read the body before admission control has seen the request; they
+# read it through read_upload_body() once it is admitted.
+@csrf_exempt
 def rank_resumes(request):
     if request.method != "POST":
         return render(request, "index.html")
 
+    try:
+        check_content_length(request)
+        check_job_queue(retry_after=RANKING_RETRY_AFTER)
+        read_upload_body(request)
+    except AdmissionError as e:
+        return rejected(request, e)
+
     # -----------------------------
     # 1. Validate job description
     # -----------------------------
@@ -26,7 +92,7 @@ def rank_resumes(request):
         return render(request, "index.html")
 
     # -----------------------------
-    # 2. Validate uploaded files
+    # 2. Validate and save uploaded files
     # -----------------------------
     uploaded_files = request.FILES.getlist("resumes")
 
@@ -34,50 +100,402 @@ def rank_resumes(request):
         messages.error(request, "Please upload at least one resume.")
         return render(request, "index.html")
 
-    fs = FileSystemStorage(location="media/resumes")
-    file_paths = []
+    try:
+        check_uploads(uploaded_files)
+    except AdmissionError as e:
+        return rejected(request, e)
+
+    saved, skipped = save_uploads(uploaded_files)
+    file_paths = list(saved)
+
+    for name in skipped:
+        messages.warning(
+            request,
+            f"File '{name}' skipped (unsupported format)."
+        )
+
+    if not file_paths:
+        messages.error(request, "No valid resume files were uploaded.")
+        return render(request, "index.html")
+
+    try:
+        check_pages(file_paths)
+    except AdmissionError as e:
+        discard_uploads(file_paths)
+        return rejected(request, e)
 
     # -----------------------------
-    # 3. Save files safely
+    # 3. Queue ranking job (runs in the background worker)
     # -----------------------------
+    job = enqueue_ranking_job(
+        file_paths,
+        job_description,
+        mode=requested_mode(request),
+        profile=should_profile(request)
+    )
+
+    if "application/json" in request.headers.get("Accept", ""):
+        return JsonResponse(
+            {
+                "job_id": str(job.pk),
+                "status": job.status,
+                "status_url": reverse("job_status", args=[job.pk]),
+            },
+            status=202
+        )
+
+    return redirect("job_detail", job_id=job.pk)
+
+
+def read_upload_body(request):
+    """
+    Parse the body of an admitted upload request under
+    UploadBudgetHandler, then run the CsrfViewMiddleware check the
+    csrf_exempt upload views skipped. Raises AdmissionError (413 over
+    budget, 403 on a CSRF failure).
+    """
+    limit_upload(request)
+    request.FILES  # parse here, so an upload over budget raises now
+
+    failure = CsrfViewMiddleware(lambda request: None).process_view(request, None, (), {})
+    if failure is not None:
+        raise AdmissionError("CSRF verification failed.", status=403)
+
+
+def rejected(request, error):
+    """
+    Response for a request refused by admission control.
+    """
+    if "application/json" in request.headers.get("Accept", ""):
+        return error_json(error)
+
+    messages.error(request, str(error))
+    response = render(request, "index.html", status=error.status)
+    if error.retry_after:
+        response["Retry-After"] = str(error.retry_after)
+    return response
+
+
+def error_json(error):
+    response = JsonResponse({"error": str(error)}, status=error.status)
+    if error.retry_after:
+        response["Retry-After"] = str(error.retry_after)
+    return response
+
+
+def save_uploads(uploaded_files):
+    """
+    Save supported resume uploads under unique names.
+    Returns {saved path: original name} and the names of
+    skipped files.
+    """
+    fs = FileSystemStorage(location="media/resumes")
+    saved = {}
+    skipped = []
+
     for f in uploaded_files:
         ext = os.path.splitext(f.name)[1].lower()
 
         if ext not in ALLOWED_EXTENSIONS:
-            messages.warning(
-                request,
-                f"File '{f.name}' skipped (unsupported format)."
-            )
+            skipped.append(f.name)
             continue
 
         # Prevent filename collision
         unique_name = f"{uuid.uuid4()}{ext}"
         filename = fs.save(unique_name, f)
-        file_paths.append(fs.path(filename))
+        saved[fs.path(filename)] = f.name
 
-    if not file_paths:
-        messages.error(request, "No valid resume files were uploaded.")
-        return render(request, "index.html")
+    return saved, skipped
+
+
+def discard_uploads(file_paths):
+    for file_path in file_paths:
+        try:
+            os.remove(file_path)
+        except OSError as e:
+            print(f"Upload cleanup error ({file_path}):", e)
+
+
+def requested_mode(request):
+    mode = request.POST.get("mode", RankingJob.MODE_FULL)
+    if mode not in dict(RankingJob.MODE_CHOICES):
+        mode = RankingJob.MODE_FULL
+    return mode
+
+
+def read_stream_form(request):
+    """
+    Validate, admit and save a rank_stream form. Returns the
+    arguments of ranking_events(); raises AdmissionError.
+    """
+    read_upload_body(request)
+
+    job_description = request.POST.get("job_description", "").strip()
+    if not job_description:
+        raise AdmissionError("Job description is required.", status=400)
+
+    uploaded_files = request.FILES.getlist("resumes")
+    check_uploads(uploaded_files)
+
+    uploads, skipped = save_uploads(uploaded_files)
+    if not uploads:
+        raise AdmissionError("No valid resume files were uploaded.", status=400)
 
-    # -----------------------------
-    # 4. Analyze & rank resumes
-    # -----------------------------
     try:
-        ranked_results = analyze_and_rank_resumes(
-            file_paths,
-            job_description
+        check_pages(list(uploads))
+    except AdmissionError:
+        discard_uploads(uploads)
+        raise
+
+    return {
+        "uploads": uploads,
+        "job_description": job_description,
+        "mode": requested_mode(request),
+        "skipped": skipped,
+        "sse": "text/event-stream" in request.headers.get("Accept", ""),
+        "profile": should_profile(request),
+    }
+
+
+def ranking_events(uploads, job_description, mode, skipped, sse, profile=False):
+    """
+    Run the incremental pipeline and yield the encoded events of
+    rank_stream. uploads maps saved paths to original file names.
+    With profile, the run is profiled like a profiled job.
+    """
+    pipeline = STREAM_PIPELINES[mode]
+    file_paths = list(uploads)
+    deadline = Deadline()
+    progress = {"processed": 0, "total": len(file_paths)}
+    ranked = []
+
+    def encode(event, **data):
+        line = json.dumps({"event": event, **data}, default=str)
+        if sse:
+            return f"event: {event}\ndata: {line}\n\n"
+        return line + "\n"
+
+    def report_progress(done, total):
+        progress.update(processed=done, total=total)
+
+    profiler = (
+        profiled(f"stream-{uuid.uuid4().hex[:8]}", mode=mode, resumes=len(file_paths))
+        if profile else nullcontext()
+    )
+    with profiler, trace("rank_stream", resumes=len(file_paths)) as record:
+        if skipped:
+            yield encode("skipped", files=skipped)
+        yield encode("progress", **progress)
+
+        try:
+            for batch in pipeline(file_paths, job_description, report_progress, deadline):
+                yield encode("progress", **progress)
+                for result in batch:
+                    yield encode("result", id=len(ranked), result=result)
+                    ranked.append(result)
+        except Exception as e:
+            print("[Stream failed] →", e)
+            yield encode("error", error="An error occurred while analyzing resumes.")
+            return
+
+        unprocessed = deadline.unprocessed
+        record["fields"]["ranked"] = len(ranked)
+        record["fields"]["unprocessed"] = len(unprocessed)
+        if unprocessed:
+            yield encode("unprocessed", files=[uploads[path] for path in unprocessed])
+
+        order = sorted(
+            range(len(ranked)),
+            key=lambda i: ranked[i]["match_score"],
+            reverse=True
         )
-    except Exception as e:
-        print("Pipeline error:", e)
+        total = progress["total"]
+        yield encode("progress", processed=total - len(unprocessed), total=total)
+        yield encode("ranking", order=order)
+
+
+def stream_response(events, sse):
+    response = StreamingHttpResponse(
+        events,
+        content_type="text/event-stream" if sse else "application/x-ndjson"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # no proxy buffering (nginx)
+    return response
+
+
+@csrf_exempt
+def rank_stream(request):
+    """
+    Rank uploaded resumes in this request and stream the results.
+
+    Takes the same form fields as rank_resumes. The response is
+    NDJSON (or Server-Sent Events when the client accepts
+    text/event-stream) with one event per line:
+
+        {"event": "skipped", "files": ["notes.docx"]}
+        {"event": "progress", "processed": 3, "total": 40}
+        {"event": "result", "id": 0, "result": {...}}
+        {"event": "unprocessed", "files": ["late.pdf"]}
+        {"event": "ranking", "order": [4, 0, ...]}
+
+    Results arrive as soon as their batch is scored; the final
+    "ranking" event lists the result ids best first. Resumes the
+    RANKING_DEADLINE_SECONDS budget had no time for are listed in
+    "unprocessed". A failure mid-stream ends it with
+    {"event": "error", ...}.
+
+    Requests over the upload budget get a 413; when
+    RANKING_MAX_CONCURRENT rankings are already running, a 429
+    with Retry-After.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST required."}, status=405)
+
+    try:
+        check_content_length(request)
+    except AdmissionError as e:
+        return error_json(e)
+
+    if not ranking_limiter.try_acquire():
+        return error_json(Overloaded())
+
+    try:
+        form = read_stream_form(request)
+    except AdmissionError as e:
+        ranking_limiter.release()
+        return error_json(e)
+    except BaseException:
+        ranking_limiter.release()
+        raise
+
+    events = ClosingIterator(ranking_events(**form), on_close=ranking_limiter.release)
+    return stream_response(events, form["sse"])
+
+
+@csrf_exempt
+async def rank_stream_async(request):
+    """
+    ASGI version of rank_stream, with the same form and events.
+
+    Upload parsing and saving run on the upload I/O pool and the
+    pipeline on the shared ranking pool, so the event loop never
+    blocks. At most RANKING_MAX_CONCURRENT rankings run at once;
+    other requests wait for a slot and get a 429 with Retry-After
+    when none frees up in time. The body is only read once a slot
+    is held.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST required."}, status=405)
+
+    try:
+        check_content_length(request)
+        await ranking_limiter.acquire()
+    except (AdmissionError, Overloaded) as e:
+        return error_json(e)
+
+    try:
+        form = await run_io(read_stream_form, request)
+    except AdmissionError as e:
+        ranking_limiter.release()
+        return error_json(e)
+    except BaseException:
+        ranking_limiter.release()
+        raise
+
+    events = ExecutorStream(
+        lambda: ranking_events(**form),
+        get_pipeline_executor(),
+        on_close=ranking_limiter.release
+    )
+    return stream_response(events, form["sse"])
+
+
+def job_detail(request, job_id):
+    job = get_object_or_404(RankingJob, pk=job_id)
+
+    if job.status == RankingJob.STATUS_FAILED:
         messages.error(
             request,
             "An error occurred while analyzing resumes. Please try again."
         )
         return render(request, "index.html")
 
-    # -----------------------------
-    # 5. Render results
-    # -----------------------------
+    if job.status != RankingJob.STATUS_DONE:
+        return render(request, "job_status.html", {"job": job})
+
+    if job.unprocessed:
+        messages.warning(
+            request,
+            f"{len(job.unprocessed)} of {job.total} resumes were not processed "
+            "within the time limit and are not ranked."
+        )
+
+    return render(
+        request,
+        "results.html",
+        {
+            "results": job.results or [],
+            "job_description": job.job_description
+        }
+    )
+
+
+def job_status(request, job_id):
+    job = get_object_or_404(RankingJob, pk=job_id)
+
+    data = {
+        "job_id": str(job.pk),
+        "status": job.status,
+        "processed": job.processed,
+        "total": job.total,
+    }
+
+    if job.status == RankingJob.STATUS_DONE:
+        data["results"] = job.results or []
+        data["unprocessed"] = [os.path.basename(path) for path in job.unprocessed]
+    elif job.status == RankingJob.STATUS_FAILED:
+        data["error"] = job.error
+
+    return JsonResponse(data)
+
+
+def rank_corpus_view(request):
+    """
+    Rank stored resumes against a job description.
+    No uploads needed: resumes are scored from stored features.
+    An optional top_k limits full scoring to the ANN shortlist.
+
+    Shares the RANKING_MAX_CONCURRENT slots with the other ranking
+    views; when none is free the request gets a 503 with Retry-After.
+    """
+    if request.method != "POST":
+        return render(request, "index.html")
+
+    job_description = request.POST.get("job_description", "").strip()
+
+    if not job_description:
+        messages.error(request, "Job description is required.")
+        return render(request, "index.html")
+
+    try:
+        top_k = int(request.POST.get("top_k") or 0)
+    except ValueError:
+        top_k = 0
+
+    if not ranking_limiter.try_acquire():
+        return rejected(request, Overloaded(status=503))
+
+    try:
+        with trace("rank_corpus", top_k=top_k or None) as record:
+            ranked_results = rank_corpus(job_description, top_k=top_k or None)
+            record["fields"]["ranked"] = len(ranked_results)
+    finally:
+        ranking_limiter.release()
+
+    if "application/json" in request.headers.get("Accept", ""):
+        return JsonResponse({"results": ranked_results})
+
     return render(
         request,
         "results.html",
@@ -130,3 +130,33 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 # Default primary key field type
 # --------------------------------------------------
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# --------------------------------------------------
+# On-demand profiling of ranking jobs (cProfile + tracemalloc).
+# Staff trigger it per request with an "X-Profile: 1" header or
+# ?profile=1; PROFILING_SAMPLE_RATE profiles a random share of jobs.
+# --------------------------------------------------
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILES_DIR = Path(os.getenv("PROFILES_DIR", BASE_DIR / "profiles"))
+
+# --------------------------------------------------
+# Logging (per-request stage breakdowns are JSON lines
+# on the "core.metrics" logger)
+# --------------------------------------------------
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "plain": {"format": "%(asctime)s %(name)s %(levelname)s %(message)s"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "plain"},
+    },
+    "loggers": {
+        "core": {
+            "handlers": ["console"],
+            "level": os.getenv("CORE_LOG_LEVEL", "INFO"),
+        },
+    },
+}